@@ -0,0 +1,542 @@
+# Environments used to let bots play the game without showing it, one at
+# a time or many at once spread over several processes, for automated
+# playtesting and training.
+import multiprocessing
+import os
+import traceback
+from multiprocessing import shared_memory
+import numpy
+import game
+
+# Constants used for the rewards given to bots, for each skull collected,
+# each death and for going through the door.
+REWARD_SKULL = 1.0
+REWARD_DEATH = -1.0
+REWARD_DOOR = 10.0
+
+# Constants used for the episodes, including how many ticks an episode
+# lasts at most and how many different actions there are, one for each
+# combination of the input bits.
+EPISODE_TICKS = 3600
+ACTION_COUNT = 32
+
+# Constant used for the number of values in an observation, which are
+# the position and speed of the player, the score and the level.
+OBSERVATION_SIZE = 6
+
+# Constants used for the tile grid observations, including the layers
+# that can be shown, which are the layers of the tile map followed by
+# the layers that move, the layers whose sprites can be removed or put
+# back, and how many grid cells wide and high an observation is.
+TILE_CHANNELS = (
+    game.LAYER_NAME_PLATFORMS,
+    game.LAYER_NAME_LADDERS,
+    game.LAYER_NAME_DONT_TOUCH,
+    game.LAYER_NAME_COINS,
+    game.LAYER_NAME_DOOR,
+    game.LAYER_NAME_CHECKPOINTS,
+    game.LAYER_NAME_ENEMIES,
+    game.LAYER_NAME_BULLETS,
+    game.LAYER_NAME_MOVING_PLATFORMS,
+)
+MOVING_CHANNELS = (
+    game.LAYER_NAME_ENEMIES,
+    game.LAYER_NAME_BULLETS,
+    game.LAYER_NAME_MOVING_PLATFORMS,
+)
+CHANGING_CHANNELS = (
+    game.LAYER_NAME_COINS,
+    game.LAYER_NAME_CHECKPOINTS,
+)
+TILE_OBSERVATION_WIDTH = 32
+TILE_OBSERVATION_HEIGHT = 16
+
+
+class TileObserver:
+    """
+    Class used to get what is around the player as a grid of the level
+    without drawing anything, with one channel for each layer counting
+    the sprites of the layer whose center is in each cell. The grid of
+    the layers of the tile map is built once for each level and only
+    changed when skulls or checkpoints are taken or put back, while the
+    enemies, bullets and moving platforms are placed from their
+    positions each time, so an observation costs microseconds. Each
+    cell can cover a square of several tiles, and the top row of cells
+    comes first, like an image.
+    """
+
+    # __init__() function to store the size and layout of the
+    # observations, and the simulation they are taken from.
+    def __init__(self, simulation, width = TILE_OBSERVATION_WIDTH,
+                 height = TILE_OBSERVATION_HEIGHT, channels = TILE_CHANNELS,
+                 downsample = 1, channels_last = False):
+
+        self.simulation = simulation
+        self.width = width
+        self.height = height
+        self.channels = tuple(channels)
+        self.channels_last = channels_last
+        self.cell_size = game.GRID_PIXEL_SIZE * downsample
+
+        # Stores the index of each tile map and each moving channel, and
+        # for the channels whose sprites can change, the sprites that
+        # are in the grid.
+        self.tile_channels = [
+            (index, name) for index, name in enumerate(self.channels)
+            if name not in MOVING_CHANNELS]
+        self.moving_channels = [
+            (index, name) for index, name in enumerate(self.channels)
+            if name in MOVING_CHANNELS]
+        self.changing_sprites = {}
+
+        # Stores the scene the grid was built for, and the grid, which
+        # has its top row first and empty cells around the level so an
+        # observation near the edge never goes past the end of the grid,
+        # along with the row of the grid at the bottom of the level.
+        self.scene = None
+        self.grid = None
+        self.padding = max(width, height)
+        self.bottom_row = 0
+
+    @staticmethod
+    def observation_shape(width = TILE_OBSERVATION_WIDTH,
+                          height = TILE_OBSERVATION_HEIGHT,
+                          channels = TILE_CHANNELS, downsample = 1,
+                          channels_last = False):
+        """
+        Method used to get the shape of the observations made with the
+        given options.
+        """
+
+        if channels_last:
+            return (height, width, len(channels))
+        return (len(channels), height, width)
+
+    def layer_sprites(self, name):
+        """
+        Method used to get the sprites of a layer of the current scene,
+        or no sprites if the level doesn't have the layer.
+        """
+
+        if name in self.simulation.scene.name_mapping:
+            return self.simulation.scene[name]
+        return ()
+
+    def add_sprites(self, index, sprites, remove = False):
+        """
+        Method used to add the sprites to the cells of the grid channel
+        at the given index that have their center in them, or to remove
+        them.
+        """
+
+        if not sprites:
+            return
+        positions = numpy.array(
+            [(sprite.center_x, sprite.center_y) for sprite in sprites])
+        cells = (positions // self.cell_size).astype(int)
+        function = numpy.subtract if remove else numpy.add
+        function.at(self.grid[index], (self.bottom_row - cells[:, 1],
+                                       cells[:, 0] + self.padding), 1)
+
+    def build_grid(self):
+        """
+        Method used to build the grid of the layers of the tile map for
+        the current level.
+        """
+
+        tile_map = self.simulation.tile_map
+        self.scene = self.simulation.scene
+        columns = -(-tile_map.width * tile_map.tile_width
+                    * tile_map.scaling // self.cell_size)
+        rows = -(-tile_map.height * tile_map.tile_height
+                 * tile_map.scaling // self.cell_size)
+        self.grid = numpy.zeros(
+            (len(self.channels), int(rows) + self.padding * 2,
+             int(columns) + self.padding * 2), dtype = numpy.uint8)
+        self.bottom_row = int(rows) + self.padding - 1
+        self.changing_sprites = {}
+        for index, name in self.tile_channels:
+            sprites = list(self.layer_sprites(name))
+            self.add_sprites(index, sprites)
+            if name in CHANGING_CHANNELS:
+                self.changing_sprites[index] = sprites
+
+        # Stores the index of the first cell of each moving channel in an
+        # observation, as the moving sprites are all added together.
+        self.moving_offsets = numpy.array(
+            [index * self.width * self.height
+             for index, name in self.moving_channels], dtype = int)
+
+    def update(self):
+        """
+        Method used to bring the grid up to date with the current tick,
+        building it again for a new level, and taking out or putting back
+        the skulls and checkpoints that were taken or put back.
+        """
+
+        if self.simulation.scene is not self.scene:
+            self.build_grid()
+            return
+        for index, sprites in self.changing_sprites.items():
+            current = list(self.layer_sprites(self.channels[index]))
+            if current == sprites:
+                continue
+            kept = set(map(id, current))
+            added = set(map(id, sprites))
+            self.add_sprites(index, [sprite for sprite in sprites
+                                     if id(sprite) not in kept], True)
+            self.add_sprites(index, [sprite for sprite in current
+                                     if id(sprite) not in added])
+            self.changing_sprites[index] = current
+
+    def moving_positions(self, name):
+        """
+        Method used to get the x and y coordinates of the enemies that
+        are alive, the bullets that are flying or the moving platforms.
+        """
+
+        simulation = self.simulation
+        if name == game.LAYER_NAME_ENEMIES:
+            patrol = simulation.enemy_patrol
+            return patrol.x[patrol.alive], patrol.y[patrol.alive]
+        if name == game.LAYER_NAME_BULLETS:
+            pool = simulation.bullet_pool
+            return pool.x[pool.alive], pool.y[pool.alive]
+        sprites = self.layer_sprites(name)
+        return (numpy.array([sprite.center_x for sprite in sprites]),
+                numpy.array([sprite.center_y for sprite in sprites]))
+
+    def observe(self):
+        """
+        Method used to get the grid of the cells around the player, with
+        the player in the middle, after bringing the grid up to date.
+        """
+
+        self.update()
+        player = self.simulation.player_sprite
+        left = int(player.center_x // self.cell_size) - self.width // 2
+        top = (int(player.center_y // self.cell_size) - self.height // 2
+               + self.height - 1)
+        column = left + self.padding
+        row = self.bottom_row - top
+        observation = self.grid[:, row:row + self.height,
+                                column:column + self.width].copy()
+
+        # Adds the sprites that move to the cells of the observation,
+        # adding the sprites of every moving channel together.
+        if self.moving_channels:
+            positions = [self.moving_positions(name)
+                         for index, name in self.moving_channels]
+            x = numpy.concatenate([position[0] for position in positions])
+            y = numpy.concatenate([position[1] for position in positions])
+            offsets = numpy.repeat(
+                self.moving_offsets,
+                [len(position[0]) for position in positions])
+            columns = (x // self.cell_size).astype(int) - left
+            rows = top - (y // self.cell_size).astype(int)
+            inside = ((columns >= 0) & (columns < self.width)
+                      & (rows >= 0) & (rows < self.height))
+            numpy.add.at(observation.reshape(-1),
+                         (offsets + rows * self.width + columns)[inside], 1)
+
+        if self.channels_last:
+            return numpy.ascontiguousarray(observation.transpose(1, 2, 0))
+        return observation
+
+
+class GameEnvironment:
+    """
+    Class used to let a bot play one level of the game, in the style of
+    a Gym environment. An episode starts on the level and ends when the
+    player goes through the door or after a number of ticks. Each step
+    holds the keys of an action, which is a bit mask of the input
+    constants, for one or more ticks and returns what the bot can see,
+    its reward, whether the episode ended and what happened. What the
+    bot can see is the position and speed of the player, or the grid
+    around the player made by a TileObserver when tile options are
+    given.
+    """
+
+    # __init__() function to create the game simulation, without the
+    # parts that are only needed by a player, and load the level.
+    def __init__(self, level = 1, action_repeat = 1,
+                 episode_ticks = EPISODE_TICKS, tiles = None):
+
+        self.level = level
+        self.action_repeat = action_repeat
+        self.episode_ticks = episode_ticks
+        self.simulation = game.GameSimulation(level)
+        self.simulation.preload_next_level = False
+        self.simulation.record_snapshots = False
+        self.simulation.profiler.enabled = False
+        self.simulation.setup()
+        self.episode_start = self.simulation.tick
+        self.observer = None
+        if tiles is not None:
+            self.observer = TileObserver(self.simulation, **tiles)
+
+    def reset(self):
+        """
+        Method used to start a new episode and return the first
+        observation. The level is put back to how it was loaded, and only
+        loaded again if the player went through the door.
+        """
+
+        simulation = self.simulation
+        if simulation.level == self.level:
+            simulation.restart_level()
+        else:
+            simulation.level = self.level
+            simulation.setup()
+        self.episode_start = simulation.tick
+        return self.observe()
+
+    def observe(self):
+        """
+        Method used to get what the bot can see, as an array of the
+        position and speed of the player, the score and the level, or as
+        the grid around the player.
+        """
+
+        if self.observer is not None:
+            return self.observer.observe()
+        simulation = self.simulation
+        player = simulation.player_sprite
+        return numpy.array(
+            (player.center_x, player.center_y, player.change_x,
+             player.change_y, simulation.score, simulation.level),
+            dtype = numpy.float32)
+
+    def step(self, action):
+        """
+        Method used to hold the keys of an action for the next ticks,
+        returning the observation, the reward, whether the episode ended
+        and a dictionary of what happened.
+        """
+
+        simulation = self.simulation
+        reward = 0.0
+        done = False
+        events = []
+        for repeat in range(self.action_repeat):
+            tick_events = (simulation.set_input(int(action))
+                           + simulation.update())
+            events += tick_events
+
+            # Adds up the rewards of the events of this tick, and ends the
+            # episode as soon as the player goes through the door.
+            for name, x, y in tick_events:
+                if name == game.EVENT_COIN:
+                    reward += REWARD_SKULL
+                elif name == game.EVENT_DEATH:
+                    reward += REWARD_DEATH
+                elif name in (game.EVENT_NEXT_LEVEL,
+                              game.EVENT_GAME_COMPLETE):
+                    reward += REWARD_DOOR
+                    done = True
+            if done:
+                break
+
+        ticks = simulation.tick - self.episode_start
+        truncated = not done and ticks >= self.episode_ticks
+        info = {
+            "tick": ticks,
+            "events": [name for name, x, y in events],
+            "truncated": truncated,
+        }
+        return self.observe(), reward, done or truncated, info
+
+
+def observation_layout(tiles = None):
+    """
+    Function used to get the shape and type of the observations of an
+    environment made with the given tile options.
+    """
+
+    if tiles is not None:
+        return TileObserver.observation_shape(**tiles), numpy.uint8
+    return (OBSERVATION_SIZE,), numpy.float32
+
+
+def create_shared_array(shape, dtype):
+    """
+    Function used to create an array in a block of shared memory, which
+    other processes can open by the name of the block.
+    """
+
+    size = int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize
+    memory = shared_memory.SharedMemory(create = True, size = max(size, 1))
+    return memory, numpy.ndarray(shape, dtype, buffer = memory.buf)
+
+
+def open_shared_array(name, shape, dtype):
+    """
+    Function used to open an array created by create_shared_array in
+    another process.
+    """
+
+    memory = shared_memory.SharedMemory(name = name)
+    return memory, numpy.ndarray(shape, dtype, buffer = memory.buf)
+
+
+def run_environments(connection, first, last, buffers, options):
+    """
+    Function run by each process of a VectorEnvironment, which steps the
+    environments from first up to last whenever it is told to, reading
+    their actions from and writing their observations, rewards and
+    whether their episodes ended to the shared memory. An environment is
+    reset as soon as its episode ends.
+    """
+
+    # Opens a hidden window so the sprite lists can be created, and the
+    # shared arrays.
+    game.open_headless_window()
+    memories = []
+    arrays = []
+    for name, shape, dtype in buffers:
+        memory, array = open_shared_array(name, shape, dtype)
+        memories.append(memory)
+        arrays.append(array)
+    observations, rewards, dones, actions = arrays
+
+    try:
+        environments = [GameEnvironment(**options)
+                        for index in range(first, last)]
+        while True:
+            command = connection.recv()
+            if command == "close":
+                break
+            for index, environment in enumerate(environments, first):
+                if command == "reset":
+                    observations[index] = environment.reset()
+                    rewards[index] = 0
+                    dones[index] = False
+                else:
+                    observation, reward, done, info = environment.step(
+                        actions[index])
+                    if done:
+                        observation = environment.reset()
+                    observations[index] = observation
+                    rewards[index] = reward
+                    dones[index] = done
+            connection.send(None)
+
+    # Sends any error back to the main process, so it can be raised
+    # there instead of the main process waiting forever.
+    except Exception:
+        connection.send(traceback.format_exc())
+    finally:
+        del observations, rewards, dones, actions, arrays
+        for memory in memories:
+            memory.close()
+        connection.close()
+
+
+class VectorEnvironment:
+    """
+    Class used to step many game environments at once, spread as evenly
+    as possible over a number of processes. The actions, observations,
+    rewards and whether each episode ended are passed through shared
+    memory, so only a short message is sent to each process every step.
+    Environments are reset as soon as their episode ends, so the
+    observation returned for them is the first of the next episode.
+    """
+
+    # __init__() function to create the shared arrays and start the
+    # processes, which each load the level for their environments.
+    def __init__(self, count, processes = None, **options):
+
+        if processes is None:
+            processes = os.cpu_count() or 1
+        processes = max(1, min(processes, count))
+        self.count = count
+
+        # Creates the shared arrays.
+        self.memories = []
+        buffers = []
+        arrays = []
+        shape, dtype = observation_layout(options.get("tiles"))
+        for shape, dtype in (((count,) + shape, dtype),
+                             ((count,), numpy.float32),
+                             ((count,), numpy.bool_),
+                             ((count,), numpy.uint8)):
+            memory, array = create_shared_array(shape, dtype)
+            self.memories.append(memory)
+            buffers.append((memory.name, shape, dtype))
+            arrays.append(array)
+        self.observations, self.rewards, self.dones, self.actions = arrays
+
+        # Starts the processes, spawning them rather than forking so none
+        # of them shares the OpenGL state of this process.
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        for process_index in range(processes):
+            first = count * process_index // processes
+            last = count * (process_index + 1) // processes
+            connection, child_connection = context.Pipe()
+            process = context.Process(
+                target = run_environments, daemon = True,
+                args = (child_connection, first, last, buffers, options))
+            process.start()
+            child_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def send(self, command):
+        """
+        Method used to send a command to every process and wait for all
+        of them to finish it, raising any error one of them had.
+        """
+
+        for connection in self.connections:
+            connection.send(command)
+        errors = [connection.recv() for connection in self.connections]
+        for error in errors:
+            if error is not None:
+                self.close()
+                raise RuntimeError(f"An environment failed:\n{error}")
+
+    def reset(self):
+        """
+        Method used to start a new episode in every environment and
+        return their first observations.
+        """
+
+        self.send("reset")
+        return self.observations.copy()
+
+    def step(self, actions):
+        """
+        Method used to step every environment with its action, returning
+        the observations, rewards and whether each episode ended.
+        """
+
+        self.actions[:] = actions
+        self.send("step")
+        return (self.observations.copy(), self.rewards.copy(),
+                self.dones.copy())
+
+    def close(self):
+        """
+        Method used to stop the processes and free the shared memory,
+        if they haven't been already.
+        """
+
+        if not self.memories:
+            return
+        for connection, process in zip(self.connections, self.processes):
+            if process.is_alive():
+                try:
+                    connection.send("close")
+                except (BrokenPipeError, OSError):
+                    pass
+            process.join()
+            connection.close()
+        self.connections = []
+        self.processes = []
+        del self.observations, self.rewards, self.dones, self.actions
+        for memory in self.memories:
+            memory.close()
+            memory.unlink()
+        self.memories = []
@@ -1,8 +1,30 @@
 # Accesses the script from another Python file/module.
+import argparse
+import array
+import base64
+import concurrent.futures
+import csv
+import gc
+import gzip
+import hashlib
+import io
+import json
 import math
+import mmap
 import os
+import queue
+import struct
+import threading
+import time
+import xml.etree.ElementTree
+import zlib
+from collections import OrderedDict, deque
 import arcade
 import arcade.gui
+import numpy
+import PIL.Image
+import pyglet
+from pyglet import gl
 
 # Constants used to determine the screen size.
 SCREEN_WIDTH = 1110
@@ -21,12 +43,49 @@ SHOOT_SPEED = 15
 BULLET_SPEED = 30
 BULLET_DAMAGE = 5
 
+# Constants used to set how many bullets can be alive at once, and how 
+# many ticks a bullet that doesn't hit anything stays alive for.
+BULLET_POOL_SIZE = 512
+BULLET_LIFETIME = 120
+
 # Constants used to set the player movement speed, gravity and jump 
-# speed in pixels per frame.
+# speed in pixels per tick at the base tick rate.
 PLAYER_MOVEMENT_SPEED = 7
 GRAVITY = 1.2
 PLAYER_JUMP_SPEED = 15
 
+# Constants used to set how many ticks a second the game simulation is 
+# advanced by, which doesn't depend on how often the screen is drawn, 
+# and the tick rate the speeds, gravity and timers of the game, and the 
+# speeds in the Tiled maps, are given for. They are scaled to the tick 
+# rate, so the game plays at the same speed at any tick rate, such as 30 
+# ticks a second on slow computers. At most the given number of ticks 
+# are run for one frame, so a slow frame doesn't make the next frames 
+# slower as well, and the moving sprites are drawn between where they 
+# were on the last two ticks, unless they moved further than the given 
+# number of pixels, such as when the player respawns.
+TICK_RATE = 60
+BASE_TICK_RATE = 60
+MAX_TICKS_PER_FRAME = 5
+INTERPOLATE_SPRITES = True
+INTERPOLATION_SNAP_DISTANCE = 2 * SPRITE_PIXEL_SIZE
+
+# Constant used to advance the game simulation on a worker thread while 
+# the main thread draws the ticks before, from a copy of the moving 
+# layers made at the end of those ticks, so simulating and drawing can 
+# overlap. Levels that are streamed in chunks, or whose layers that 
+# never move aren't baked, are still advanced on the main thread.
+PIPELINE_SIMULATION = False
+
+# Constant used to choose the grid physics engine, which looks up the 
+# tiles around the player, instead of the Arcade Python Library one.
+USE_GRID_PHYSICS = True
+
+# Constant used to set how many ticks the path of a moving platform or 
+# an enemy is recorded for to find where it starts repeating, after 
+# which it is moved one tick at a time instead of looked up.
+MOTION_PERIOD_LIMIT = 3600
+
 # Constants used to determine the minimum margin in pixels to keep 
 # between the player character and the edge of the screen including the 
 # top, bottom, left, and right before it needs scrolling.
@@ -61,10 +120,827 @@ LAYER_NAME_DONT_TOUCH = "Don't Touch"
 LAYER_NAME_CHECKPOINTS = "Checkpoints"
 LAYER_NAME_DOOR = "Door"
 
-# Constant that stores the file directory to the assets used in the 
+# Constant used to store the layers of tiles that do something when the 
+# player touches them, in the order they are handled each tick.
+TRIGGER_LAYERS = (
+    LAYER_NAME_DOOR,
+    LAYER_NAME_DONT_TOUCH,
+    LAYER_NAME_COINS,
+    LAYER_NAME_CHECKPOINTS,
+)
+
+# Constants that store the file directory of the game, where the levels 
+# are, and the file directory to the assets used in the game.
+GAME_PATH = os.path.dirname(os.path.abspath(__file__))
+ASSET_PATH = f"{GAME_PATH}/assets"
+
+# Constants used to name the events that the game simulation reports 
+# after each tick, so the game view can play the right sound effect or 
+# change to the right view.
+EVENT_JUMP = "jump"
+EVENT_SHOOT = "shoot"
+EVENT_HIT = "hit"
+EVENT_DEATH = "death"
+EVENT_COIN = "coin"
+EVENT_NEXT_LEVEL = "next_level"
+EVENT_GAME_COMPLETE = "game_complete"
+
+# Constants used for the compiled level cache, including where the 
+# cache files are stored, the start of every cache file and its 
+# version, which should be increased whenever the cache format changes.
+LEVEL_CACHE_PATH = f"{GAME_PATH}/cache"
+LEVEL_CACHE_MAGIC = b"LVLC"
+LEVEL_CACHE_VERSION = 2
+LEVEL_CACHE_HEADER = struct.Struct("<4sHHQQI")
+
+# Constants used to stream the tiles of levels bigger than the given 
+# number of tiles in square chunks, so only the chunks near the player 
+# are turned into sprites and collision data. The chunks within the 
+# stream distance in pixels of the player are loaded, along with one 
+# chunk each tick from the ring of chunks around them, and once more 
+# than the chunk limit are loaded, the chunks the player left the 
+# longest time ago are removed one each tick. Only the layers that are 
+# covered in tiles are streamed, the coins, checkpoints, doors and don't 
+# touch tiles are always loaded as they are part of the state of the 
 # game.
-ASSET_PATH = "C:/Users/Tiger/Documents/game/DTP/assets/"
+STREAM_LEVEL_TILES = 50000
+STREAM_CHUNK_TILES = 8
+STREAM_DISTANCE = SCREEN_WIDTH
+STREAM_CHUNK_LIMIT = 64
+STREAMED_LAYER_NAMES = (
+    LAYER_NAME_BACKGROUND1,
+    LAYER_NAME_BACKGROUND2,
+    LAYER_NAME_BACKGROUND3,
+    LAYER_NAME_BACKGROUND4,
+    LAYER_NAME_PLATFORMS,
+    LAYER_NAME_FOREGROUND,
+)
+
+# Constant used to turn on loading the next level on a background thread 
+# while the current level is played, so reaching the door only has to 
+# swap the loaded level in.
+PRELOAD_NEXT_LEVEL = True
+
+# Constant used to limit how many seconds of each tick are spent 
+# creating the OpenGL parts of the next level once it has been loaded 
+# in the background.
+PRELOAD_TIME_BUDGET = 0.002
+
+# Constant used to turn on freezing every object in the game when a 
+# level loaded in the background is swapped in, so the garbage collector 
+# skips the objects of the level in its later checks instead of pausing 
+# the game to check them. Frozen objects are never freed by the garbage 
+# collector until a level is loaded straight away or behind the loading 
+# screen, including any unused objects that link to each other at the 
+# time, so it is off unless those checks cause pauses.
+FREEZE_LOADED_LEVELS = False
+
+# Constants used for the world snapshots recorded every tick so that 
+# the game can be rewound, including whether they are recorded, how 
+# many bytes of memory they can use, how often a full snapshot is 
+# stored instead of only what changed, and how many ticks are rewound 
+# each frame while the rewind key is held.
+RECORD_SNAPSHOTS = True
+SNAPSHOT_BUFFER_SIZE = 8 * 1024 * 1024
+SNAPSHOT_KEYFRAME_INTERVAL = 30
+REWIND_SPEED = 2
+
+# Constants used to list the attributes of the game simulation and of 
+# the player stored at the start of every snapshot of the world, in the 
+# order they are stored, along with the type each is restored as.
+SIMULATION_STATE_ATTRIBUTES = (
+    ("tick", int), ("score", int), ("death", int), ("can_shoot", bool), 
+    ("shoot_timer", int), ("jump_needs_reset", bool), 
+    ("check_level", int), ("game_complete", bool), 
+    ("checkpoint_index", int), ("jumps_since_ground", int), 
+    ("animation_time", float),
+)
+PLAYER_STATE_ATTRIBUTES = (
+    ("center_x", float), ("center_y", float), ("change_x", float), 
+    ("change_y", float), ("facing_direction", int), ("cur_texture", int), 
+    ("jumping", bool), ("climbing", bool), ("is_on_ladder", bool), 
+    ("can_jump", bool), ("texture_index", int),
+)
+
+# Constants used for the keys held during a tick, where each key sets 
+# its own bit, so the keys of a tick can be stored in one byte.
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_LEFT = 4
+INPUT_RIGHT = 8
+INPUT_SHOOT = 16
+
+# Constants used for the input recording files, including the start of 
+# every file and its version, which should be increased whenever the 
+# file format changes, the header that stores the level, the tick rate 
+# and how the recording ends, and each run of ticks with the same keys held.
+RECORDING_MAGIC = b"KEYS"
+RECORDING_VERSION = 3
+RECORDING_HEADER = struct.Struct("<4sHHHHIII")
+RECORDING_RUN = struct.Struct("<BH")
+
+# Constants used for the frame profiler, including whether it times the 
+# parts of every frame, how many frames of timings it keeps, the most 
+# parts of a frame it can time, how many of the latest frames the 
+# overlay summarises and how many frames it waits between updates.
+PROFILE_FRAMES = True
+PROFILER_FRAME_COUNT = 3600
+PROFILER_PHASE_LIMIT = 32
+PROFILER_OVERLAY_FRAMES = 120
+PROFILER_OVERLAY_INTERVAL = 30
+
+# Constants used for the text shown on top of the game, including its 
+# font, its size and how far the text is moved from its shadow.
+HUD_FONT_NAME = "Kenney Future"
+HUD_FONT_SIZE = 20
+HUD_SHADOW_OFFSET = 3
+
+# Constants used for the sound effects, including how many can play at 
+# once, how far outside the screen in pixels an event can happen and 
+# still be heard, and for each event, the sound file, its volume, its 
+# priority when all the voices are in use, and the fewest seconds 
+# between two plays of it.
+SOUND_VOICE_COUNT = 8
+SOUND_CULL_MARGIN = 64
+SOUND_EFFECTS = {
+    EVENT_DEATH: ("dead.wav", 1.0, 3, 0.0),
+    EVENT_COIN: ("coin.wav", 1.2, 2, 0.05),
+    EVENT_JUMP: ("jump.wav", 1.0, 2, 0.05),
+    EVENT_HIT: ("dead.wav", 1.0, 1, 0.05),
+    EVENT_SHOOT: ("shoot.wav", 0.1, 0, 0.1),
+}
+
+# Constants used for the background music, which is streamed from its 
+# file and loops.
+MUSIC_FILE = "background.mp3"
+MUSIC_VOLUME = 0.1
+
+# Constants used for the asset manager, including how many threads load 
+# assets in the background, and the characters whose animation sets are 
+# loaded before the game starts.
+ASSET_LOADER_THREADS = 2
+CHARACTER_NAMES = (
+    ("cloak", "hero"),
+    ("guardian", "guardian"),
+)
+
+# Constants used for the loading screen, including the size of its bar, 
+# the most seconds each frame waits for what is still loading, and how 
+# many seconds of each frame are spent creating the OpenGL parts of the 
+# level being loaded.
+LOADING_BAR_WIDTH = 400
+LOADING_BAR_HEIGHT = 20
+LOADING_WAIT_TIME = 0.05
+LOADING_TIME_BUDGET = 0.05
+
+# Constants used for the hit box cache, including the file it is stored 
+# in and its version, which should be increased whenever the way hit 
+# boxes are calculated changes.
+HIT_BOX_CACHE_NAME = f"{LEVEL_CACHE_PATH}/hit_boxes.json"
+HIT_BOX_CACHE_VERSION = 1
+
+# Constants used for the baked texture atlas, including where the atlas 
+# pages are stored, which asset folders and file names are packed into 
+# it, the size of each page and the space between images.
+ATLAS_PATH = f"{ASSET_PATH}/atlas"
+ATLAS_VERSION = 1
+ATLAS_SOURCE_FOLDERS = (
+    ("tiles/1", ""),
+    ("tiles/2", ""),
+    ("cloak", "hero_"),
+    ("guardian", "guardian_"),
+)
+ATLAS_PAGE_SIZE = 2048
+ATLAS_PADDING = 1
+
+# Constants used for the asset pack, which stores the files the game 
+# reads in one memory-mapped file, including where it is stored, its 
+# header and version, the extensions of the files packed from the 
+# assets folder, and the number of bytes the start of each file is 
+# rounded up to, so arrays can be read from the pack where they are.
+ASSET_PACK_NAME = f"{GAME_PATH}/assets.pack"
+ASSET_PACK_MAGIC = b"PACK"
+ASSET_PACK_VERSION = 1
+ASSET_PACK_HEADER = struct.Struct("<4sHHQ")
+ASSET_PACK_EXTENSIONS = (".png", ".wav", ".mp3", ".json")
+ASSET_PACK_ALIGNMENT = 16
+
+# Constants used for chunk-baked rendering of the layers that never 
+# move, including the layers that do move and are drawn as sprites, the 
+# size of each chunk in pixels and whether baking is turned on.
+DYNAMIC_LAYER_NAMES = (
+    LAYER_NAME_PLAYER,
+    LAYER_NAME_ENEMIES,
+    LAYER_NAME_BULLETS,
+    LAYER_NAME_MOVING_PLATFORMS,
+    LAYER_NAME_COINS,
+    LAYER_NAME_CHECKPOINTS,
+)
+CHUNK_PIXEL_SIZE = 1024
+BAKE_STATIC_LAYERS = True
+
+# Shaders used to draw a baked chunk texture with the projection of the 
+# camera.
+CHUNK_VERTEX_SHADER = """
+#version 330
+uniform Projection {
+    uniform mat4 matrix;
+} proj;
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 v_uv;
+void main() {
+    gl_Position = proj.matrix * vec4(in_vert, 0.0, 1.0);
+    v_uv = in_uv;
+}
+"""
+CHUNK_FRAGMENT_SHADER = """
+#version 330
+uniform sampler2D texture0;
+in vec2 v_uv;
+out vec4 f_color;
+void main() {
+    f_color = texture(texture0, v_uv);
+}
+"""
+
+# Constants used to read the flags Tiled stores in the top bits of a 
+# tile ID when a tile is flipped.
+FLIPPED_HORIZONTALLY_FLAG = 0x80000000
+FLIPPED_VERTICALLY_FLAG = 0x40000000
+FLIPPED_DIAGONALLY_FLAG = 0x20000000
+TILE_ID_MASK = 0x1FFFFFFF
+
+# Stores the layer specific options for the Tilemap, whether it should 
+# detect collisions or not.
+LAYER_OPTIONS = {
+    LAYER_NAME_PLATFORMS: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_MOVING_PLATFORMS: {
+        "use_spatial_hash": False,
+    },
+    LAYER_NAME_LADDERS: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_COINS: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_DONT_TOUCH: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_CHECKPOINTS: {
+        "use_spatial_hash": True,
+    },
+    LAYER_NAME_DOOR: {
+        "use_spatial_hash": True,
+    },
+}
+
+
+
+def atlas_key(file_name):
+    """
+    Function used to get the name a texture is stored under in the baked 
+    texture atlas, which is its file directory relative to the assets 
+    folder in lower case, so that a Tiled map referring to "Tiles" finds 
+    the images in "tiles".
+    """
+
+    path = os.path.relpath(os.path.abspath(file_name), ASSET_PATH)
+    return path.replace(os.sep, "/").lower()
+
+
+def flip_image(image, flipped_horizontally = False, 
+               flipped_vertically = False, flipped_diagonally = False):
+    """
+    Function used to flip an image in the same way as the Arcade Python 
+    Library does when it loads a flipped texture.
+    """
+
+    if flipped_diagonally:
+        image = image.transpose(PIL.Image.TRANSPOSE)
+    if flipped_horizontally:
+        image = image.transpose(PIL.Image.FLIP_LEFT_RIGHT)
+    if flipped_vertically:
+        image = image.transpose(PIL.Image.FLIP_TOP_BOTTOM)
+    return image
+
+
+def pack_key(file_name):
+    """
+    Function used to get the name a file is stored under in the asset 
+    pack, which is its file directory relative to the game folder in 
+    lower case, the same as the names in the baked texture atlas.
+    """
+
+    path = os.path.relpath(os.path.abspath(file_name), GAME_PATH)
+    return path.replace(os.sep, "/").lower()
+
+
+def build_asset_pack(pack_name = ASSET_PACK_NAME):
+    """
+    Function used to pack the files the game reads from the assets 
+    folder, including the baked atlas, along with the level cache of 
+    every level, compiled again from its Tiled map, into the asset pack. 
+    The pack starts with a header and an index storing where each file 
+    starts and its size, followed by the files one after another. 
+    Returns the number of files and bytes that were packed.
+    """
+
+    # Finds the files to pack in a fixed order, so the pack is the same 
+    # every time it is built. The source files of the images, such as 
+    # the Illustrator files of the views, are never read by the game.
+    file_names = {}
+    for directory, folders, names in os.walk(ASSET_PATH, followlinks = True):
+        folders.sort()
+        for name in sorted(names):
+            if name.lower().endswith(ASSET_PACK_EXTENSIONS):
+                file_name = os.path.join(directory, name)
+                file_names.setdefault(pack_key(file_name), file_name)
+    for name in sorted(os.listdir(GAME_PATH)):
+        if name.startswith("level_") and name.endswith(".tmx"):
+            level = int(name[len("level_"):-len(".tmx")])
+            compile_level(level_file_name(level), level_cache_name(level))
+            file_names[pack_key(level_cache_name(level))] = (
+                level_cache_name(level))
+
+    # Works out where each file starts, relative to the end of the 
+    # index, leaving space so each one starts on the alignment.
+    files = {}
+    offset = 0
+    for key, file_name in file_names.items():
+        size = os.path.getsize(file_name)
+        files[key] = [offset, size]
+        offset += size + (-size % ASSET_PACK_ALIGNMENT)
+    index_bytes = json.dumps(files, separators = (",", ":")).encode()
+    index_bytes += b" " * (-(ASSET_PACK_HEADER.size + len(index_bytes)) 
+                           % ASSET_PACK_ALIGNMENT)
+
+    # Writes the pack to a temporary file first and then renames it, so 
+    # a half written pack is never read.
+    temporary_name = f"{pack_name}.{os.getpid()}.tmp"
+    with open(temporary_name, "wb") as pack_file:
+        pack_file.write(ASSET_PACK_HEADER.pack(
+            ASSET_PACK_MAGIC, ASSET_PACK_VERSION, 0, len(index_bytes)))
+        pack_file.write(index_bytes)
+        for key, file_name in file_names.items():
+            with open(file_name, "rb") as source_file:
+                data = source_file.read()
+            pack_file.write(data)
+            pack_file.write(b"\0" * (-len(data) % ASSET_PACK_ALIGNMENT))
+    os.replace(temporary_name, pack_name)
+    return len(files), offset
+
+
+def bake_atlas(source_folders = ATLAS_SOURCE_FOLDERS, 
+               atlas_path = ATLAS_PATH, page_size = ATLAS_PAGE_SIZE):
+    """
+    Function used to pack the images in the given asset folders into a 
+    few large atlas pages and write a manifest storing where each image 
+    is, both in pixels and as texture coordinates. Images are packed 
+    into rows, tallest first, starting a new page when a page is full. 
+    Returns the number of images and pages that were written.
+    """
+
+    # Opens every image in the source folders, in a fixed order so the 
+    # atlas is the same every time it is baked.
+    images = []
+    for folder, prefix in source_folders:
+        directory = f"{ASSET_PATH}/{folder}"
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".png") and name.startswith(prefix):
+                file_name = f"{directory}/{name}"
+                image = PIL.Image.open(file_name).convert("RGBA")
+                images.append((atlas_key(file_name), image))
+    images.sort(key = lambda item: (-item[1].height, item[0]))
+
+    # Places the images into rows on each page, leaving one pixel 
+    # between images.
+    pages = []
+    textures = {}
+    x = y = row_height = 0
+    for key, image in images:
+        width, height = image.size
+        if x + width > page_size:
+            x = 0
+            y += row_height + ATLAS_PADDING
+            row_height = 0
+        if not pages or y + height > page_size:
+            pages.append(PIL.Image.new("RGBA", (page_size, page_size)))
+            x = y = row_height = 0
+        pages[-1].paste(image, (x, y))
+        textures[key] = [
+            len(pages) - 1, x, y, width, height,
+            x / page_size, y / page_size, 
+            (x + width) / page_size, (y + height) / page_size,
+        ]
+        x += width + ATLAS_PADDING
+        row_height = max(row_height, height)
+
+    # Saves the pages and the manifest.
+    os.makedirs(atlas_path, exist_ok = True)
+    page_names = []
+    for index, page in enumerate(pages):
+        page_names.append(f"page_{index}.png")
+        page.save(f"{atlas_path}/{page_names[-1]}")
+    manifest = {
+        "version": ATLAS_VERSION,
+        "page_size": page_size,
+        "pages": page_names,
+        "textures": textures,
+    }
+    with open(f"{atlas_path}/manifest.json", "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent = 1)
+    return len(images), len(pages)
+
+
+class AssetPack:
+    """
+    Class used to read the files of the game from the asset pack made by 
+    build_asset_pack. The pack is memory-mapped, so one file is opened 
+    for every asset instead of opening and checking each loose file, 
+    and only the parts of it that are read are loaded from the disk. 
+    Files that aren't in the pack are read from their loose files, so 
+    new assets can be used while developing without packing them.
+    """
+
+    # Stores the asset pack that has been loaded, whether loading the 
+    # pack should be tried at all, and the lock that stops the asset 
+    # loader threads from loading it twice or reading loose files while 
+    # another thread is loading it.
+    current = None
+    enabled = True
+    lock = threading.Lock()
+
+    # __init__() function to memory-map the pack and read its index.
+    def __init__(self, pack_name = ASSET_PACK_NAME):
+
+        with open(pack_name, "rb") as pack_file:
+            self.mapped = mmap.mmap(
+                pack_file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, version, _, index_size = ASSET_PACK_HEADER.unpack_from(
+            self.mapped)
+        self.valid = (magic == ASSET_PACK_MAGIC 
+                      and version == ASSET_PACK_VERSION)
+        self.files = {}
+        self.data_start = ASSET_PACK_HEADER.size + index_size
+        if self.valid:
+            self.files = json.loads(bytes(
+                self.mapped[ASSET_PACK_HEADER.size:self.data_start]))
+
+        # Dictionaries to store the images that were decoded and the 
+        # textures that were already created.
+        self.images = {}
+        self.textures = {}
+
+    @classmethod
+    def get(cls):
+        """
+        Method used to get the asset pack, loading it the first time, or 
+        None if there is no current pack or it is turned off.
+        """
+
+        if not cls.enabled:
+            return None
+        if cls.current is None:
+            with cls.lock:
+                if cls.current is None:
+                    pack = None
+                    if os.path.exists(ASSET_PACK_NAME):
+                        pack = cls()
+                    cls.current = pack if pack and pack.valid else False
+        return cls.current or None
+
+    def read(self, file_name):
+        """
+        Method used to get the contents of a file as a memory view of the 
+        pack, without copying it, or None if the file is not in the pack.
+        """
+
+        entry = self.files.get(pack_key(file_name))
+        if entry is None:
+            return None
+        offset, size = entry
+        start = self.data_start + offset
+        return memoryview(self.mapped)[start:start + size]
+
+    def get_texture(self, file_name, x = 0, y = 0, width = 0, height = 0, 
+                    flipped_horizontally = False, flipped_vertically = False, 
+                    flipped_diagonally = False):
+        """
+        Method used to create the texture for part of an image in the 
+        pack, cropped and flipped the same way as the Arcade Python 
+        Library does, or None if the image is not in the pack. Each image 
+        is only decoded once, however many textures are cut from it.
+        """
+
+        key = pack_key(file_name)
+        flips = (flipped_horizontally, flipped_vertically, flipped_diagonally)
+        texture_key = (key, x, y, width, height, flips)
+        texture = self.textures.get(texture_key)
+        if texture is not None:
+            return texture
+
+        image = self.images.get(key)
+        if image is None:
+            data = self.read(file_name)
+            if data is None:
+                return None
+            image = PIL.Image.open(io.BytesIO(data)).convert("RGBA")
+            self.images[key] = image
+        if x or y or width or height:
+            image = image.crop((x, y, x + (width or image.width - x), 
+                                y + (height or image.height - y)))
+        image = flip_image(image, flipped_horizontally, flipped_vertically, 
+                           flipped_diagonally)
+
+        texture = arcade.Texture(
+            f"pack:{key}-{x}-{y}-{width}-{height}-{flips}", image)
+        self.textures[texture_key] = texture
+        return texture
+
+
+def asset_exists(file_name):
+    """
+    Function used to check whether a file of the game is in the asset 
+    pack or exists as its own file.
+    """
+
+    asset_pack = AssetPack.get()
+    if asset_pack is not None and pack_key(file_name) in asset_pack.files:
+        return True
+    return os.path.exists(file_name)
+
+
+def open_asset_file(file_name):
+    """
+    Function used to open a file of the game for reading, from the asset 
+    pack when it is in it and otherwise from its own file.
+    """
+
+    asset_pack = AssetPack.get()
+    if asset_pack is not None:
+        data = asset_pack.read(file_name)
+        if data is not None:
+            return io.BytesIO(data)
+    return open(file_name, "rb")
+
+
+class PackedSound(arcade.Sound):
+    """
+    Class used to play a sound read from the asset pack, as the Arcade 
+    Python Library can only load a sound from its own file. The sound 
+    works in the same way once it has been loaded.
+    """
+
+    # __init__() function to load the sound from the contents of its 
+    # file, decoding it unless it is streamed.
+    def __init__(self, file_name, data, streaming = False):
+
+        self.file_name = file_name
+        self.source = pyglet.media.load(
+            file_name, file = io.BytesIO(data), streaming = streaming)
+        self.min_distance = 100000000
+
+
+def load_game_sound(file_name, streaming = False):
+    """
+    Function used to load a sound, from the asset pack when it is in it 
+    and otherwise from its own file using the Arcade Python Library.
+    """
+
+    asset_pack = AssetPack.get()
+    if asset_pack is not None:
+        data = asset_pack.read(file_name)
+        if data is not None:
+            return PackedSound(file_name, data, streaming)
+    return arcade.Sound(file_name, streaming)
+
+
+class BakedAtlas:
+    """
+    Class used to load textures from the atlas pages made by bake_atlas, 
+    so loading a texture opens one atlas page instead of its own image 
+    file. Each page is only opened once, the first time it is needed.
+    """
+
+    # Stores the atlas that has been loaded, whether loading the atlas 
+    # should be tried at all, and the lock that stops the asset loader 
+    # threads from loading it twice or loading loose images while 
+    # another thread is loading it.
+    current = None
+    enabled = True
+    lock = threading.Lock()
+
+    # __init__() function to read the manifest of the atlas.
+    def __init__(self, atlas_path = ATLAS_PATH):
+
+        with open_asset_file(f"{atlas_path}/manifest.json") as manifest_file:
+            manifest = json.load(manifest_file)
+        self.atlas_path = atlas_path
+        self.version = manifest["version"]
+        self.page_names = manifest["pages"]
+        self.entries = manifest["textures"]
+
+        # Dictionaries to store the opened pages and the textures that 
+        # were already created.
+        self.pages = {}
+        self.textures = {}
+
+    @classmethod
+    def get(cls):
+        """
+        Method used to get the baked atlas, loading it the first time, or 
+        None if there is no current atlas or it is turned off.
+        """
+
+        if not cls.enabled:
+            return None
+        if cls.current is None:
+            with cls.lock:
+                if cls.current is None:
+                    atlas = None
+                    if asset_exists(f"{ATLAS_PATH}/manifest.json"):
+                        atlas = cls()
+                    cls.current = (atlas if atlas 
+                                   and atlas.version == ATLAS_VERSION 
+                                   else False)
+        return cls.current or None
+
+    def get_texture(self, file_name, width = 0, height = 0, 
+                    flipped_horizontally = False, flipped_vertically = False, 
+                    flipped_diagonally = False):
+        """
+        Method used to create the texture for an image from the atlas, 
+        flipped the same way as the Arcade Python Library does, or None 
+        if the image is not in the atlas.
+        """
+
+        key = atlas_key(file_name)
+        flips = (flipped_horizontally, flipped_vertically, flipped_diagonally)
+        texture = self.textures.get((key, flips))
+        if texture is not None:
+            return texture
+
+        # Checks the image is in the atlas and, if only part of the image 
+        # is wanted, that the part is the whole image.
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        page, x, y, entry_width, entry_height = entry[:5]
+        if (width and width != entry_width) or (
+                height and height != entry_height):
+            return None
+
+        if page not in self.pages:
+            self.pages[page] = PIL.Image.open(open_asset_file(
+                f"{self.atlas_path}/{self.page_names[page]}")).convert("RGBA")
+        image = self.pages[page].crop(
+            (x, y, x + entry_width, y + entry_height))
+        image = flip_image(image, flipped_horizontally, flipped_vertically, 
+                           flipped_diagonally)
+
+        texture = arcade.Texture(f"atlas:{key}-{flips}", image)
+        self.textures[(key, flips)] = texture
+        return texture
+
+
+class HitBoxCache:
+    """
+    Class used to store the hit box of every texture by a hash of its 
+    image, in memory and in a file, so the hit box of an image is only 
+    calculated from its pixels the first time the game ever loads it, 
+    instead of on every launch and every level change.
+    """
+
+    # Stores the hit box cache that has been loaded, whether the hit box 
+    # cache should be used at all, and the lock that stops the threads 
+    # loading assets from reading the cache file twice.
+    current = None
+    enabled = True
+    lock = threading.Lock()
+
+    # __init__() function to read the hit boxes stored in the cache file, 
+    # starting with no hit boxes when the file is missing or was written 
+    # by a different version of the game.
+    def __init__(self, cache_name = HIT_BOX_CACHE_NAME):
+
+        self.cache_name = cache_name
+        self.hit_boxes = {}
+        self.changed = False
+        self.computed = 0
+
+        # Lock used so a level can be loaded on a background thread while 
+        # the hit boxes are saved or added to on the main thread.
+        self.lock = threading.Lock()
+        if os.path.exists(cache_name):
+            with open(cache_name) as cache_file:
+                contents = json.load(cache_file)
+            if contents.get("version") == HIT_BOX_CACHE_VERSION:
+                self.hit_boxes = contents["hit_boxes"]
+
+    @classmethod
+    def get(cls):
+        """
+        Method used to get the hit box cache, loading it the first time, 
+        or None if it is turned off.
+        """
+
+        if not cls.enabled:
+            return None
+        if cls.current is None:
+            with cls.lock:
+                if cls.current is None:
+                    cls.current = cls()
+        return cls.current
+
+    def apply(self, texture):
+        """
+        Method used to give a texture its hit box from the cache, 
+        calculating and storing it when the image has not been seen 
+        before. The Arcade Python Library calculates hit boxes the first 
+        time they are needed, so the result is stored on the texture the 
+        same way.
+        """
+
+        if texture._hit_box_points is not None:
+            return
+        image = texture.image
+        key = "/".join((
+            texture._hit_box_algorithm, str(texture._hit_box_detail), 
+            f"{image.width}x{image.height}", 
+            hashlib.blake2b(image.tobytes(), digest_size = 16).hexdigest()))
+        points = self.hit_boxes.get(key)
+        if points is None:
+            points = texture.hit_box_points
+            with self.lock:
+                self.hit_boxes[key] = points
+                self.changed = True
+                self.computed += 1
+        texture._hit_box_points = tuple(tuple(point) for point in points)
+
+    def save(self):
+        """
+        Method used to write the hit boxes to the cache file if any were 
+        added since it was loaded.
+        """
+
+        with self.lock:
+            if not self.changed:
+                return
+            os.makedirs(os.path.dirname(self.cache_name), exist_ok = True)
+            temporary_name = f"{self.cache_name}.{os.getpid()}.tmp"
+            with open(temporary_name, "w") as cache_file:
+                json.dump({"version": HIT_BOX_CACHE_VERSION, 
+                           "hit_boxes": self.hit_boxes}, 
+                          cache_file, separators = (",", ":"))
+            os.replace(temporary_name, self.cache_name)
+            self.changed = False
+
+
+def load_game_texture(file_name, x = 0, y = 0, width = 0, height = 0, 
+                      flipped_horizontally = False, flipped_vertically = False,
+                      flipped_diagonally = False):
+    """
+    Function used to load a texture, from the baked atlas when the image 
+    is in it, then from the asset pack, and otherwise from its own file 
+    using the Arcade Python Library.
+    """
+
+    atlas = BakedAtlas.get()
+    if atlas is not None and x == 0 and y == 0:
+        texture = atlas.get_texture(
+            file_name, width, height, flipped_horizontally, 
+            flipped_vertically, flipped_diagonally)
+        if texture is not None:
+            return texture
+    asset_pack = AssetPack.get()
+    if asset_pack is not None:
+        texture = asset_pack.get_texture(
+            file_name, x, y, width, height, flipped_horizontally, 
+            flipped_vertically, flipped_diagonally)
+        if texture is not None:
+            return texture
+    return arcade.load_texture(
+        file_name, x, y, width, height, 
+        flipped_horizontally = flipped_horizontally, 
+        flipped_vertically = flipped_vertically, 
+        flipped_diagonally = flipped_diagonally)
+
+
+def load_hit_box(texture):
+    """
+    Function used to get the hit box of a texture, from the hit box cache 
+    unless it is turned off. Textures that are given to a sprite when it 
+    is created need their hit box straight away, so this is called 
+    before creating those sprites.
+    """
 
+    hit_box_cache = HitBoxCache.get()
+    if hit_box_cache is not None:
+        hit_box_cache.apply(texture)
+    return texture.hit_box_points
 
 
 def load_texture_pair(filename):
@@ -78,11 +954,1027 @@ def load_texture_pair(filename):
     # creates a mirror image which essentially makes it face left and 
     # right.
     return [
-        arcade.load_texture(filename),
-        arcade.load_texture(filename, flipped_horizontally=True),
+        load_game_texture(filename),
+        load_game_texture(filename, flipped_horizontally=True),
     ]
 
 
+def level_file_name(level):
+    """
+    Function used to get the file directory of the Tiled map for a 
+    level.
+    """
+
+    return f"{GAME_PATH}/level_{level}.tmx"
+
+
+def level_cache_name(level):
+    """
+    Function used to get the file directory of the compiled cache for a 
+    level.
+    """
+
+    return f"{LEVEL_CACHE_PATH}/level_{level}.lvl"
+
+
+def read_tiled_properties(element):
+    """
+    Function used to read the custom properties of a Tiled map element, 
+    converting each value to the type it was given in Tiled.
+    """
+
+    properties = {}
+    properties_element = element.find("properties")
+    if properties_element is None:
+        return properties
+
+    for prop in properties_element.findall("property"):
+        value = prop.get("value")
+        if value is None:
+            value = prop.text or ""
+        prop_type = prop.get("type", "string")
+        if prop_type == "float":
+            value = float(value)
+        elif prop_type == "int":
+            value = int(value)
+        elif prop_type == "bool":
+            value = value == "true"
+        properties[prop.get("name")] = value
+    return properties
+
+
+def read_tiled_layer_data(data_element, width, height, source = None):
+    """
+    Function used to read the tile IDs of a Tiled tile layer, which may 
+    be stored as CSV or as base64 with optional compression. The tiles 
+    of a chunk of an infinite map are read from the chunk element given 
+    as the source, using the encoding of the layer data.
+    """
+
+    if source is None:
+        source = data_element
+    encoding = data_element.get("encoding")
+    if encoding == "csv":
+        return [int(gid) for gid in source.text.replace(
+            "\n", "").split(",") if gid.strip()]
+    if encoding == "base64":
+        raw = base64.b64decode(source.text.strip())
+        compression = data_element.get("compression")
+        if compression == "zlib":
+            raw = zlib.decompress(raw)
+        elif compression == "gzip":
+            raw = gzip.decompress(raw)
+        elif compression:
+            raise ValueError(f"Unsupported layer compression {compression}")
+        return list(struct.unpack(f"<{width * height}I", raw))
+
+    # Layers without an encoding store one element per tile.
+    return [int(tile.get("gid", 0)) for tile in source.findall("tile")]
+
+
+def read_tiled_chunks(layer):
+    """
+    Function used to read the chunks of a tile layer of an infinite 
+    Tiled map, as the column and row of the top left tile of each chunk, 
+    its width and height in tiles and its tile IDs.
+    """
+
+    data = layer.find("data")
+    chunks = []
+    for chunk in data.findall("chunk"):
+        chunk_width = int(chunk.get("width"))
+        chunk_height = int(chunk.get("height"))
+        chunks.append((int(chunk.get("x")), int(chunk.get("y")), 
+                       chunk_width, chunk_height, read_tiled_layer_data(
+                           data, chunk_width, chunk_height, chunk)))
+    return chunks
+
+
+def compile_level(map_name, cache_name):
+    """
+    Function used to compile a Tiled map into the level cache format. 
+    The cache starts with a header storing the size and modification 
+    time of the Tiled map, so it can be rebuilt when the map changes, 
+    followed by the map information and object records, and then the 
+    tile IDs of every tile layer as arrays that can be read straight 
+    from a memory-mapped file.
+    """
+
+    root = xml.etree.ElementTree.parse(map_name).getroot()
+    map_directory = os.path.dirname(map_name)
+    width = int(root.get("width"))
+    height = int(root.get("height"))
+    tile_width = int(root.get("tilewidth"))
+    tile_height = int(root.get("tileheight"))
+
+    # The tile layers of an infinite map are stored in chunks, which can 
+    # start at negative columns and rows. The map is given the size of 
+    # the area covered by the chunks of every layer, and the chunks and 
+    # the objects are moved so that area starts at the first column and 
+    # row, the same as a map that isn't infinite. The boundaries set in 
+    # the properties of the objects are measured from the edges of that 
+    # area as well.
+    first_column = first_row = 0
+    infinite = root.get("infinite") == "1"
+    if infinite:
+        layer_chunks = {layer: read_tiled_chunks(layer) 
+                        for layer in root.findall("layer")}
+        bounds = [(x, y, x + chunk_width, y + chunk_height) 
+                  for chunks in layer_chunks.values() 
+                  for x, y, chunk_width, chunk_height, gids in chunks]
+        if bounds:
+            first_column = min(bound[0] for bound in bounds)
+            first_row = min(bound[1] for bound in bounds)
+            width = max(bound[2] for bound in bounds) - first_column
+            height = max(bound[3] for bound in bounds) - first_row
+        else:
+            width = height = 0
+
+    # Resolves each tileset into a table that stores which image and 
+    # which part of the image every tile ID uses, so loading the cache 
+    # never needs to search through the tilesets.
+    images = []
+    image_index = {}
+    tilesets = []
+    for tileset in root.findall("tileset"):
+        first_gid = int(tileset.get("firstgid"))
+        tileset_directory = map_directory
+        if tileset.get("source"):
+            tileset_name = os.path.join(map_directory, tileset.get("source"))
+            tileset_directory = os.path.dirname(tileset_name)
+            tileset = xml.etree.ElementTree.parse(tileset_name).getroot()
+        tilesets.append((first_gid, tileset, tileset_directory))
+
+    def add_image(source, directory):
+        path = os.path.relpath(os.path.join(directory, source), map_directory)
+        if path not in image_index:
+            image_index[path] = len(images)
+            images.append(path)
+        return image_index[path]
+
+    tiles = {}
+    for first_gid, tileset, directory in tilesets:
+        image_width = int(tileset.get("tilewidth"))
+        image_height = int(tileset.get("tileheight"))
+        image = tileset.find("image")
+
+        # A tileset made from a single image is cut into tiles based on 
+        # the number of columns, the margin and the spacing.
+        if image is not None:
+            index = add_image(image.get("source"), directory)
+            columns = int(tileset.get("columns"))
+            margin = int(tileset.get("margin", 0))
+            spacing = int(tileset.get("spacing", 0))
+            for tile_id in range(int(tileset.get("tilecount"))):
+                image_x = margin + (tile_id % columns) * (
+                    image_width + spacing)
+                image_y = margin + (tile_id // columns) * (
+                    image_height + spacing)
+                tiles[first_gid + tile_id] = [
+                    index, image_x, image_y, image_width, image_height, 
+                    tile_id, {}]
+
+        # A collection of images stores a separate image for every tile.
+        for tile in tileset.findall("tile"):
+            tile_id = int(tile.get("id"))
+            tile_image = tile.find("image")
+            if tile_image is not None:
+                tiles[first_gid + tile_id] = [
+                    add_image(tile_image.get("source"), directory), 
+                    0, 0, int(tile_image.get("width")), 
+                    int(tile_image.get("height")), tile_id, {}]
+            if first_gid + tile_id in tiles:
+                tiles[first_gid + tile_id][6] = read_tiled_properties(tile)
+
+    # Reads the tile layers and object layers in the order they are 
+    # drawn in Tiled.
+    layers = []
+    arrays = []
+    used_gids = set()
+    data_size = 0
+    for layer in root:
+        if layer.tag == "layer":
+
+            # Copies each row of each chunk of an infinite map into the 
+            # rows of the layer, leaving the tiles outside of the chunks 
+            # empty.
+            if infinite:
+                gids = [0] * (width * height)
+                for x, y, chunk_width, chunk_height, chunk_gids in (
+                        layer_chunks[layer]):
+                    for chunk_row in range(chunk_height):
+                        start = ((y - first_row + chunk_row) * width 
+                                 + x - first_column)
+                        gids[start:start + chunk_width] = chunk_gids[
+                            chunk_row * chunk_width:
+                            (chunk_row + 1) * chunk_width]
+            else:
+                gids = read_tiled_layer_data(
+                    layer.find("data"), width, height)
+            used_gids.update(gid & TILE_ID_MASK for gid in gids if gid)
+            layers.append({
+                "name": layer.get("name"),
+                "kind": "tiles",
+                "opacity": float(layer.get("opacity", 1)),
+                "visible": layer.get("visible", "1") == "1",
+                "offset": data_size,
+                "properties": read_tiled_properties(layer),
+            })
+            arrays.append(struct.pack(f"<{len(gids)}I", *gids))
+            data_size += len(gids) * 4
+        elif layer.tag == "objectgroup":
+            objects = []
+            for my_object in layer.findall("object"):
+                gid = int(my_object.get("gid", 0))
+                if gid:
+                    used_gids.add(gid & TILE_ID_MASK)
+                if my_object.find("point") is not None:
+                    shape = "point"
+                elif my_object.find("polygon") is not None:
+                    shape = "polygon"
+                elif my_object.find("polyline") is not None:
+                    shape = "polyline"
+                elif my_object.find("ellipse") is not None:
+                    shape = "ellipse"
+                else:
+                    shape = "rectangle"
+                points = []
+                for tag in ("polygon", "polyline"):
+                    if my_object.find(tag) is not None:
+                        for point in my_object.find(tag).get(
+                                "points").split():
+                            x, y = point.split(",")
+                            points.append([float(x), float(y)])
+                objects.append({
+                    "gid": gid,
+                    "shape": shape,
+                    "x": float(my_object.get("x", 0)) 
+                         - first_column * tile_width,
+                    "y": float(my_object.get("y", 0)) 
+                         - first_row * tile_height,
+                    "width": float(my_object.get("width", 0)),
+                    "height": float(my_object.get("height", 0)),
+                    "rotation": float(my_object.get("rotation", 0)),
+                    "name": my_object.get("name"),
+                    "type": my_object.get("class", my_object.get("type")),
+                    "points": points,
+                    "properties": read_tiled_properties(my_object),
+                })
+            layers.append({
+                "name": layer.get("name"),
+                "kind": "objects",
+                "opacity": float(layer.get("opacity", 1)),
+                "visible": layer.get("visible", "1") == "1",
+                "objects": objects,
+            })
+
+    # Only the tiles that are used by the map are stored.
+    metadata = {
+        "width": width,
+        "height": height,
+        "tile_width": tile_width,
+        "tile_height": tile_height,
+        "images": images,
+        "tiles": {str(gid): tiles[gid] for gid in sorted(used_gids) 
+                  if gid in tiles},
+        "layers": layers,
+    }
+    metadata_bytes = json.dumps(metadata, separators = (",", ":")).encode()
+    metadata_bytes += b" " * (-len(metadata_bytes) % 4)
+
+    # Writes the cache to a temporary file first and then renames it, 
+    # so a half written cache is never read.
+    source = os.stat(map_name)
+    header = LEVEL_CACHE_HEADER.pack(
+        LEVEL_CACHE_MAGIC, LEVEL_CACHE_VERSION, 0, source.st_size, 
+        source.st_mtime_ns, len(metadata_bytes))
+    os.makedirs(os.path.dirname(cache_name), exist_ok = True)
+    temporary_name = f"{cache_name}.{os.getpid()}.tmp"
+    with open(temporary_name, "wb") as cache_file:
+        cache_file.write(header)
+        cache_file.write(metadata_bytes)
+        for layer_array in arrays:
+            cache_file.write(layer_array)
+    os.replace(temporary_name, cache_name)
+
+
+class LevelCache:
+    """
+    Class used to read a compiled level cache through a memory-mapped 
+    file, giving access to the map information, the object records and 
+    the tile ID array of every tile layer without parsing any XML.
+    """
+
+    # __init__() function to open and memory-map the cache file, unless 
+    # the contents of the cache are given, such as from the asset pack, 
+    # and read its header and map information.
+    def __init__(self, cache_name, map_name, data = None):
+
+        self.map_name = map_name
+        self.map_directory = os.path.dirname(map_name)
+        if data is None:
+            with open(cache_name, "rb") as cache_file:
+                data = mmap.mmap(
+                    cache_file.fileno(), 0, access = mmap.ACCESS_READ)
+        self.mapped = data
+
+        # Reads the header, and checks that the cache was compiled by 
+        # this version of the game from the current Tiled map.
+        (magic, version, _, self.source_size, self.source_mtime, 
+         metadata_size) = LEVEL_CACHE_HEADER.unpack_from(self.mapped)
+        self.valid = (magic == LEVEL_CACHE_MAGIC 
+                      and version == LEVEL_CACHE_VERSION)
+        if not self.valid:
+            return
+
+        start = LEVEL_CACHE_HEADER.size
+        metadata = json.loads(bytes(self.mapped[start:start + metadata_size]))
+        self.data_start = start + metadata_size
+        self.width = metadata["width"]
+        self.height = metadata["height"]
+        self.tile_width = metadata["tile_width"]
+        self.tile_height = metadata["tile_height"]
+        self.images = metadata["images"]
+        self.tiles = {int(gid): tile 
+                      for gid, tile in metadata["tiles"].items()}
+        self.layers = metadata["layers"]
+
+    def is_current(self):
+        """
+        Method used to check whether the cache still matches the Tiled 
+        map it was compiled from.
+        """
+
+        if not self.valid:
+            return False
+        source = os.stat(self.map_name)
+        return (source.st_size == self.source_size 
+                and source.st_mtime_ns == self.source_mtime)
+
+    def layer_data(self, layer):
+        """
+        Method used to get the tile IDs of a tile layer, read straight 
+        from the memory-mapped file.
+        """
+
+        start = self.data_start + layer["offset"]
+        count = self.width * self.height
+        return memoryview(self.mapped)[start:start + count * 4].cast("I")
+
+    def close(self):
+        """
+        Method used to close the memory-mapped file, unless the cache was 
+        read from the asset pack, which stays open.
+        """
+
+        if isinstance(self.mapped, mmap.mmap):
+            self.mapped.close()
+
+
+def load_level_cache(level):
+    """
+    Function used to load the compiled cache of a level, from the asset 
+    pack when it is in it, and otherwise from its file, compiling it 
+    first when it is missing or older than the Tiled map.
+    """
+
+    map_name = level_file_name(level)
+    cache_name = level_cache_name(level)
+
+    # The level caches in the asset pack were compiled when the pack was 
+    # built, so they are used unless the Tiled map is there and has 
+    # changed since then, which happens while editing the level.
+    asset_pack = AssetPack.get()
+    if asset_pack is not None:
+        data = asset_pack.read(cache_name)
+        if data is not None:
+            level_cache = LevelCache(cache_name, map_name, data)
+            if not os.path.exists(map_name) or level_cache.is_current():
+                return level_cache
+    if os.path.exists(cache_name):
+        level_cache = LevelCache(cache_name, map_name)
+        if level_cache.is_current():
+            return level_cache
+        level_cache.close()
+    compile_level(map_name, cache_name)
+    return LevelCache(cache_name, map_name)
+
+
+class LevelMap:
+    """
+    Class used to turn a compiled level cache into the sprite lists and 
+    object lists of a level, in the same way as the TileMap class from 
+    the Arcade Python Library, so that it can be used to create a Scene. 
+    The tile layers of a streamed map start empty, and their sprites are 
+    created a chunk at a time by its chunk streamer.
+    """
+
+    # __init__() function to create the sprites for every layer of the 
+    # level cache, using the layer specific options for the sprite 
+    # lists. Lazy sprite lists don't use OpenGL until they are first 
+    # drawn, so the map can be created on a background thread. Maps with 
+    # more tiles than the stream limit are streamed unless told whether 
+    # to stream or not.
+    def __init__(self, level_cache, scaling = 1, layer_options = None, 
+                 lazy = False, stream = None):
+
+        # Stores the size of the map and its tiles, same as the TileMap.
+        self.width = level_cache.width
+        self.height = level_cache.height
+        self.tile_width = level_cache.tile_width
+        self.tile_height = level_cache.tile_height
+        self.scaling = scaling
+        self.level_cache = level_cache
+        self.lazy = lazy
+
+        # Dictionaries to store the SpriteLists and objects for each 
+        # layer, in the order they are drawn.
+        self.sprite_lists = OrderedDict()
+        self.object_lists = OrderedDict()
+
+        # Dictionary to store the texture for each tile ID.
+        self.textures = {}
+
+        # Stores the chunk streamer of a streamed map, and the streamed 
+        # layers along with their sprite lists.
+        if stream is None:
+            stream = self.width * self.height > STREAM_LEVEL_TILES
+        self.streamer = None
+        streamed_layers = []
+
+        for layer in level_cache.layers:
+            options = (layer_options or {}).get(layer["name"], {})
+            use_spatial_hash = options.get("use_spatial_hash")
+            if layer["kind"] == "tiles":
+                streamed = stream and layer["name"] in STREAMED_LAYER_NAMES
+                sprite_list = self.create_tile_layer(
+                    layer, use_spatial_hash, not streamed)
+                self.sprite_lists[layer["name"]] = sprite_list
+                if streamed:
+                    streamed_layers.append((layer, sprite_list))
+            else:
+                self.create_object_layer(layer, use_spatial_hash)
+        if stream:
+            self.streamer = ChunkStreamer(self, streamed_layers)
+
+    def get_cartesian(self, x, y):
+        """
+        Method used to get the tile coordinates of a position in pixels.
+        """
+
+        x = math.floor(x / (self.tile_width * self.scaling))
+        y = math.floor(y / (self.tile_height * self.scaling))
+        return x, y
+
+    def create_tile_sprite(self, gid):
+        """
+        Method used to create the sprite for a tile ID, including the 
+        directions it is flipped in.
+        """
+
+        image, image_x, image_y, width, height, tile_id, properties = (
+            self.level_cache.tiles[gid & TILE_ID_MASK])
+
+        # Loads the texture the first time a tile ID is used, and shares 
+        # it between every sprite using the same tile ID.
+        texture = self.textures.get(gid)
+        if texture is None:
+            texture = load_game_texture(
+                os.path.join(self.level_cache.map_directory, 
+                             self.level_cache.images[image]),
+                image_x,
+                image_y,
+                width,
+                height,
+                flipped_horizontally = bool(gid & FLIPPED_HORIZONTALLY_FLAG),
+                flipped_vertically = bool(gid & FLIPPED_VERTICALLY_FLAG),
+                flipped_diagonally = bool(gid & FLIPPED_DIAGONALLY_FLAG),
+            )
+            load_hit_box(texture)
+            self.textures[gid] = texture
+
+        sprite = arcade.Sprite(texture = texture, scale = self.scaling)
+        sprite.properties.update(properties)
+        sprite.properties["tile_id"] = tile_id
+        return sprite
+
+    def create_tile_layer(self, layer, use_spatial_hash, fill = True):
+        """
+        Method used to create the sprite list for a tile layer, filled 
+        with the sprites of every tile of the layer unless it is 
+        streamed.
+        """
+
+        sprite_list = arcade.SpriteList(use_spatial_hash = use_spatial_hash, 
+                                        lazy = self.lazy)
+        if fill:
+            sprite_list.extend(self.create_tile_sprites(
+                layer, 0, self.height, 0, self.width))
+        sprite_list.visible = layer["visible"]
+        if layer["properties"]:
+            sprite_list.properties = layer["properties"]
+        return sprite_list
+
+    def create_tile_sprites(self, layer, first_row, last_row, 
+                            first_column, last_column):
+        """
+        Method used to create the sprites for the tiles of a tile layer 
+        between the given rows and columns, counting rows from the top 
+        of the map like Tiled, placing each sprite based on its row and 
+        column.
+        """
+
+        tile_width = self.tile_width * self.scaling
+        tile_height = self.tile_height * self.scaling
+        data = self.level_cache.layer_data(layer)
+        alpha = int(layer["opacity"] * 255)
+
+        sprites = []
+        for row in range(first_row, last_row):
+            start = row * self.width
+            for column, gid in enumerate(
+                    data[start + first_column:start + last_column], 
+                    first_column):
+                if gid == 0:
+                    continue
+                sprite = self.create_tile_sprite(gid)
+                sprite.center_x = column * tile_width + sprite.width / 2
+                sprite.center_y = ((self.height - row - 1) * tile_height 
+                                   + sprite.height / 2)
+                if layer["opacity"]:
+                    sprite.alpha = alpha
+                sprites.append(sprite)
+        return sprites
+
+    def create_object_layer(self, layer, use_spatial_hash):
+        """
+        Method used to create the sprites for the tile objects of an 
+        object layer and the shapes for the other objects, such as the 
+        points where enemies are placed.
+        """
+
+        sprite_list = None
+        objects = []
+        map_height = self.height * self.tile_height
+
+        for my_object in layer["objects"]:
+            x = my_object["x"]
+            y = my_object["y"]
+            properties = my_object["properties"]
+
+            # Tile objects become sprites, placed and resized the same 
+            # way as in the TileMap, with the moving platform properties 
+            # applied to the sprite.
+            if my_object["gid"]:
+                if sprite_list is None:
+                    sprite_list = arcade.SpriteList(
+                        use_spatial_hash = use_spatial_hash, lazy = self.lazy)
+                sprite = self.create_tile_sprite(my_object["gid"])
+                width = sprite.width = my_object["width"] * self.scaling
+                height = sprite.height = my_object["height"] * self.scaling
+                angle = math.degrees(-math.radians(my_object["rotation"]))
+                center_x, center_y = arcade.rotate_point(
+                    width / 2, height / 2, 0, 0, angle)
+                sprite.position = (x * self.scaling + center_x, 
+                                   (map_height - y) * self.scaling + center_y)
+                sprite.angle = angle
+                if layer["opacity"]:
+                    sprite.alpha = int(layer["opacity"] * 255)
+                for name in ("change_x", "change_y", "boundary_bottom", 
+                             "boundary_top", "boundary_left", 
+                             "boundary_right"):
+                    if name in properties:
+                        setattr(sprite, name, float(properties[name]))
+                sprite.properties.update(properties)
+                if my_object["type"]:
+                    sprite.properties["type"] = my_object["type"]
+                if my_object["name"]:
+                    sprite.properties["name"] = my_object["name"]
+                sprite_list.visible = layer["visible"]
+                sprite_list.append(sprite)
+                continue
+
+            # Other objects are stored as shapes in pixels, with the y 
+            # axis pointing up like the rest of the game.
+            if (my_object["shape"] == "point" or (
+                    my_object["shape"] == "rectangle" 
+                    and not my_object["width"] and not my_object["height"])):
+                shape = [x * self.scaling, (map_height - y) * self.scaling]
+            elif my_object["shape"] == "rectangle":
+                right = x + my_object["width"]
+                bottom = y + my_object["height"]
+                shape = [[x, -y], [right, -y], [right, -bottom], 
+                         [x, -bottom]]
+            elif my_object["shape"] in ("polygon", "polyline"):
+                shape = [(point_x + x, map_height - (point_y + y)) 
+                         for point_x, point_y in my_object["points"]]
+                if shape[0] == shape[-1]:
+                    shape.pop()
+            else:
+                continue
+            objects.append(arcade.TiledObject(
+                shape, properties, my_object["name"], my_object["type"]))
+
+        if sprite_list:
+            self.sprite_lists[layer["name"]] = sprite_list
+        if objects:
+            self.object_lists[layer["name"]] = objects
+
+
+class ChunkStreamer:
+    """
+    Class used to stream the streamed tile layers of a level map in 
+    square chunks of tiles. Each update, the chunks near the player that 
+    aren't loaded yet have the sprites of their tiles created and added 
+    to the sprite lists. The loaded chunks are kept in the order they 
+    were last near the player, and once more chunks are loaded than the 
+    limit, the ones the player left the longest time ago have their 
+    sprites removed, so the number of tile sprites stays the same no 
+    matter how large the level is.
+    """
+
+    # __init__() function to store the streamed layers and work out how 
+    # many chunks the map is split into.
+    def __init__(self, level_map, layers, chunk_tiles = STREAM_CHUNK_TILES, 
+                 chunk_limit = STREAM_CHUNK_LIMIT, 
+                 distance = STREAM_DISTANCE):
+
+        self.level_map = level_map
+        self.layers = layers
+        self.chunk_tiles = chunk_tiles
+        self.chunk_limit = chunk_limit
+        self.distance = distance
+        self.chunk_width = chunk_tiles * level_map.tile_width * (
+            level_map.scaling)
+        self.chunk_height = chunk_tiles * level_map.tile_height * (
+            level_map.scaling)
+        self.columns = math.ceil(level_map.width / chunk_tiles)
+        self.rows = math.ceil(level_map.height / chunk_tiles)
+
+        # Dictionary storing the sprites of each loaded chunk by layer 
+        # name, in the order the chunks were last needed, and the chunks 
+        # that were needed on the last update.
+        self.chunks = OrderedDict()
+        self.nearby = []
+
+        # Lists of the chunks loaded and removed on the last update, 
+        # along with their sprites, and the total number of each.
+        self.loaded = []
+        self.evicted = []
+        self.load_count = 0
+        self.evict_count = 0
+
+    def chunks_near(self, x, y, distance):
+        """
+        Method used to get the chunks within a distance of a position, 
+        counting rows of chunks from the bottom of the map. 
+        """
+
+        first_column = max(int((x - distance) // self.chunk_width), 0)
+        last_column = min(int((x + distance) // self.chunk_width), 
+                          self.columns - 1)
+        first_row = max(int((y - distance) // self.chunk_height), 0)
+        last_row = min(int((y + distance) // self.chunk_height), 
+                       self.rows - 1)
+        return [(column, row) 
+                for row in range(first_row, last_row + 1) 
+                for column in range(first_column, last_column + 1)]
+
+    def update(self, x, y, chunks = ()):
+        """
+        Method used to load the chunks near the given position, along 
+        with any other chunks given, that aren't loaded, and remove the 
+        chunks used the longest time ago when there are too many. 
+        Returns whether any chunks were loaded or removed. 
+        """
+
+        self.loaded = []
+        self.evicted = []
+        nearby = self.chunks_near(x, y, self.distance)
+        nearby += [chunk for chunk in chunks if chunk not in nearby]
+        if nearby != self.nearby:
+            self.nearby = nearby
+            for chunk in nearby:
+                if chunk in self.chunks:
+                    self.chunks.move_to_end(chunk)
+                else:
+                    self.load(chunk)
+
+        # Loading every chunk only once it is needed would load a whole 
+        # row or column of chunks in a single tick whenever the player 
+        # crosses into a new chunk, so while there is room, one chunk 
+        # from the ring just outside the stream distance is loaded each 
+        # tick, and the player walking normally never has to wait for 
+        # one. 
+        if len(self.chunks) < self.chunk_limit:
+            for chunk in self.chunks_near(
+                    x, y, self.distance + max(self.chunk_width, 
+                                              self.chunk_height)):
+                if chunk not in self.chunks:
+                    self.load(chunk)
+                    break
+
+        # Removing the sprites of a chunk is just as slow as creating 
+        # them, so only one chunk is removed each tick, the one used the 
+        # longest time ago that isn't needed. The chunks that are needed 
+        # are never removed, even when there are more of them than the 
+        # limit. 
+        if len(self.chunks) > self.chunk_limit:
+            nearby = set(nearby)
+            for chunk in self.chunks:
+                if chunk not in nearby:
+                    sprites = self.chunks.pop(chunk)
+                    self.unload_chunk(sprites)
+                    self.evicted.append((chunk, sprites))
+                    break
+        self.load_count += len(self.loaded)
+        self.evict_count += len(self.evicted)
+        return bool(self.loaded or self.evicted)
+
+    def load(self, chunk):
+        """
+        Method used to load a chunk and remember it as the one used 
+        last. 
+        """
+
+        self.chunks[chunk] = self.load_chunk(chunk)
+        self.loaded.append((chunk, self.chunks[chunk]))
+
+    def load_chunk(self, chunk):
+        """
+        Method used to create the sprites of the tiles of a chunk in 
+        every streamed layer and add them to the sprite lists, returning 
+        the sprites by layer name.
+        """
+
+        column, row = chunk
+        height = self.level_map.height
+        first_column = column * self.chunk_tiles
+        last_column = min(first_column + self.chunk_tiles, 
+                          self.level_map.width)
+        last_row = height - row * self.chunk_tiles
+        first_row = max(last_row - self.chunk_tiles, 0)
+        sprites = {}
+        for layer, sprite_list in self.layers:
+            layer_sprites = self.level_map.create_tile_sprites(
+                layer, first_row, last_row, first_column, last_column)
+            sprite_list.extend(layer_sprites)
+            sprites[layer["name"]] = layer_sprites
+        return sprites
+
+    def unload_chunk(self, sprites):
+        """
+        Method used to remove the sprites of a chunk from the sprite 
+        lists. Removing a sprite from a sprite list with a spatial hash 
+        in Arcade Python Library leaves the sprite in the spatial hash's 
+        dictionary of the cells each sprite is in, which would keep every 
+        sprite that was ever streamed, so it is removed from there too.
+        """
+
+        for layer, sprite_list in self.layers:
+            spatial_hash = sprite_list.spatial_hash
+            for sprite in sprites.get(layer["name"], ()):
+                sprite.remove_from_sprite_lists()
+                if spatial_hash is not None:
+                    spatial_hash.buckets_for_sprite.pop(sprite, None)
+
+    def chunks_under(self, x, y, margin):
+        """
+        Method used to get the chunks within the margin of any of the 
+        positions in the given arrays, such as the chunks the bullets 
+        can hit a tile in by the next tick.
+        """
+
+        if not len(x):
+            return []
+        chunks = set()
+        for column in (numpy.floor((x - margin) / self.chunk_width), 
+                       numpy.floor((x + margin) / self.chunk_width)):
+            for row in (numpy.floor((y - margin) / self.chunk_height), 
+                        numpy.floor((y + margin) / self.chunk_height)):
+                chunks.update(zip(column.astype(int).tolist(), 
+                                  row.astype(int).tolist()))
+        return [(column, row) for column, row in sorted(chunks) 
+                if 0 <= column < self.columns and 0 <= row < self.rows]
+
+
+def load_level_map(level, layer_options = None, use_level_cache = True, 
+                   lazy = False, stream = None):
+    """
+    Function used to load the map for a level, either from its compiled 
+    level cache or by parsing the Tiled map with the Arcade Python 
+    Library. Only the level cache can make lazy sprite lists and stream 
+    large levels in chunks.
+    """
+
+    if use_level_cache:
+        return LevelMap(load_level_cache(level), TILE_SCALING, layer_options, 
+                        lazy, stream)
+    return arcade.load_tilemap(level_file_name(level), TILE_SCALING, 
+                               layer_options)
+
+
+class AnimationSet:
+    """
+    Class used to store the textures and hit box of a character, loaded 
+    and mirrored once and then shared by every sprite of that character. 
+    The textures are stored in tuples so that sprites can't change them.
+    """
+
+    # Dictionary storing the animation set of each character that has 
+    # been loaded, by its folder and file name.
+    registry = {}
+
+    # __init__() function to load the idle, jump, fall, walking and 
+    # climbing textures of a character, and the hit box of its first 
+    # idle texture.
+    def __init__(self, name_folder, name_file):
+
+        main_path = f"{ASSET_PATH}/{name_folder}/{name_file}"
+        self.idle_texture_pair = tuple(
+            load_texture_pair(f"{main_path}_idle.png"))
+        self.jump_texture_pair = tuple(
+            load_texture_pair(f"{main_path}_jump.png"))
+        self.fall_texture_pair = tuple(
+            load_texture_pair(f"{main_path}_fall.png"))
+        self.walk_textures = tuple(
+            tuple(load_texture_pair(f"{main_path}_walk{i}.png")) 
+            for i in range(8))
+        self.climbing_textures = tuple(
+            load_game_texture(f"{main_path}_climb{i}.png") 
+            for i in range(2))
+        self.hit_box_points = tuple(
+            load_hit_box(self.idle_texture_pair[0]))
+
+        # Tuple storing every texture of the character, and the position 
+        # of each texture in it, so which texture a sprite shows can be 
+        # stored as a number.
+        self.textures = (self.idle_texture_pair + self.jump_texture_pair 
+                         + self.fall_texture_pair 
+                         + sum(self.walk_textures, ()) 
+                         + self.climbing_textures)
+        self.texture_indices = {id(texture): i 
+                                for i, texture in enumerate(self.textures)}
+
+    @classmethod
+    def get(cls, name_folder, name_file):
+        """
+        Method used to get the animation set of a character, loading it 
+        through the asset manager the first time it is needed, which 
+        may have already started loading it in the background.
+        """
+
+        key = (name_folder, name_file)
+        if key not in cls.registry:
+            cls.registry[key] = AssetManager.get().request_animation_set(
+                name_folder, name_file).result()
+        return cls.registry[key]
+
+
+class AssetManager:
+    """
+    Class used to load the textures, sounds and animation sets of the 
+    game once and share them between every view and every new game. An 
+    asset is asked for by its name along with the function that loads 
+    it, and starts loading on a background thread, so the views ask for 
+    the assets they need ahead of time and only wait for one if it 
+    hasn't finished loading by the time it is used. Reading images and 
+    decoding sounds doesn't need OpenGL, so it can be done off the main 
+    thread.
+    """
+
+    # Stores the asset manager that has been created, and whether assets 
+    # should be loaded in the background at all, as otherwise each one is 
+    # loaded straight away when it is asked for.
+    current = None
+    background_loading = True
+
+    # __init__() function to create the threads assets are loaded by.
+    def __init__(self, thread_count = ASSET_LOADER_THREADS):
+
+        self.executor = None
+        if thread_count:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                thread_count, thread_name_prefix = "Asset loader")
+
+        # Dictionaries to store the future of every asset asked for by 
+        # its name, which holds the asset once it has loaded, and the 
+        # seconds each asset took to load. The lock stops two threads 
+        # asking for the same asset from loading it twice.
+        self.assets = {}
+        self.load_times = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """
+        Method used to get the asset manager, creating it the first 
+        time.
+        """
+
+        if cls.current is None:
+            cls.current = cls(
+                ASSET_LOADER_THREADS if cls.background_loading else 0)
+        return cls.current
+
+    def request(self, name, loader, *arguments):
+        """
+        Method used to start loading an asset by calling the loader with 
+        the arguments, unless it has already been asked for, returning 
+        the future that holds the asset once it has loaded.
+        """
+
+        with self.lock:
+            future = self.assets.get(name)
+            if future is None:
+                if self.executor is not None:
+                    future = self.executor.submit(
+                        self.load_asset, name, loader, arguments)
+                else:
+                    future = concurrent.futures.Future()
+                    try:
+                        future.set_result(
+                            self.load_asset(name, loader, arguments))
+                    except Exception as error:
+                        future.set_exception(error)
+                self.assets[name] = future
+        return future
+
+    def load_asset(self, name, loader, arguments):
+        """
+        Method used to load an asset, timing how long it takes.
+        """
+
+        start = time.perf_counter()
+        asset = loader(*arguments)
+        self.load_times[name] = time.perf_counter() - start
+        return asset
+
+    def request_texture(self, file_name):
+        """
+        Method used to start loading a texture from a file in the assets 
+        folder.
+        """
+
+        return self.request(f"texture:{file_name}", load_game_texture, 
+                            f"{ASSET_PATH}/{file_name}")
+
+    def texture(self, file_name):
+        """
+        Method used to get a texture from a file in the assets folder, 
+        waiting for it if it is still loading.
+        """
+
+        return self.request_texture(file_name).result()
+
+    def request_sound(self, file_name, streaming = False):
+        """
+        Method used to start loading a sound from the sound folder, 
+        which is decoded unless it is streamed from its file.
+        """
+
+        return self.request(f"sound:{file_name}", load_game_sound, 
+                            f"{ASSET_PATH}/sound/{file_name}", streaming)
+
+    def sound(self, file_name, streaming = False):
+        """
+        Method used to get a sound from the sound folder, waiting for it 
+        if it is still loading.
+        """
+
+        return self.request_sound(file_name, streaming).result()
+
+    def request_animation_set(self, name_folder, name_file):
+        """
+        Method used to start loading the animation set of a character.
+        """
+
+        return self.request(f"animation set:{name_folder}/{name_file}", 
+                            AnimationSet, name_folder, name_file)
+
+    def request_game_assets(self):
+        """
+        Method used to start loading the assets every game needs, which 
+        are the bullet, the sound effects, the music, the animation sets 
+        of the characters and the image of the end of game screen, 
+        returning their futures.
+        """
+
+        # The hit box cache is read here on the calling thread, so the 
+        # threads loading the animation sets all use the one cache 
+        # instead of waiting on each other to read it.
+        HitBoxCache.get()
+        futures = [self.request_texture("bullet/bullet.png")]
+        futures += [self.request_sound(file_name) 
+                    for file_name, volume, priority, cooldown in 
+                    SOUND_EFFECTS.values()]
+        futures.append(self.request_sound(MUSIC_FILE, streaming = True))
+        futures += [self.request_animation_set(name_folder, name_file) 
+                    for name_folder, name_file in CHARACTER_NAMES]
+        futures.append(self.request_texture("views/endgame.png"))
+        return futures
+
+
 class Entity(arcade.Sprite):
     """
     Class used to store methods that handles operations for the textures 
@@ -110,40 +2002,36 @@ class Entity(arcade.Sprite):
         self.cur_texture = 0
         self.scale = CHARACTER_SCALING
 
-        # Constant used to store the file directory for the sprite 
-        # assets.
-        main_path = f"{ASSET_PATH}/{name_folder}/{name_file}"
-
-        # Constant used to store the file directory for different 
-        # textures for the sprites including where the idle, jump, 
-        # and fall textures will be.
-        self.idle_texture_pair = load_texture_pair(f"{main_path}_idle.png")
-        self.jump_texture_pair = load_texture_pair(f"{main_path}_jump.png")
-        self.fall_texture_pair = load_texture_pair(f"{main_path}_fall.png")
-
-        # List to store the different walking textures for the sprites 
-        # ingame and for loop to cycle through the different walking 
-        # textures and add them to the list.
-        self.walk_textures = []
-        for i in range(8):
-            texture = load_texture_pair(f"{main_path}_walk{i}.png")
-            self.walk_textures.append(texture)
-
-        # List to store the different climbing textures for the sprites 
-        # ingame and adds the different textures into the list, using 
-        # Arcade Python Library it is loading in the textures.
-        self.climbing_textures = []
-        texture = arcade.load_texture(f"{main_path}_climb0.png")
-        self.climbing_textures.append(texture)
-        texture = arcade.load_texture(f"{main_path}_climb1.png")
-        self.climbing_textures.append(texture)
+        # Gets the shared animation set for the sprite's character, 
+        # which stores the idle, jump, fall, walking and climbing 
+        # textures, and only loads them the first time.
+        animations = AnimationSet.get(name_folder, name_file)
+        self.animations = animations
+        self.idle_texture_pair = animations.idle_texture_pair
+        self.jump_texture_pair = animations.jump_texture_pair
+        self.fall_texture_pair = animations.fall_texture_pair
+        self.walk_textures = animations.walk_textures
+        self.climbing_textures = animations.climbing_textures
 
         # This sets the initial texture for the sprites when the game 
         # begins.
         self.texture = self.idle_texture_pair[0]
 
         # This sets the hit box for the sprites.
-        self.set_hit_box(self.texture.hit_box_points)
+        self.set_hit_box(animations.hit_box_points)
+
+    @property
+    def texture_index(self):
+        """
+        Property used to get the place of the sprite's texture in the 
+        textures of its animation set, or to set its texture from it.
+        """
+
+        return self.animations.texture_indices[id(self.texture)]
+
+    @texture_index.setter
+    def texture_index(self, index):
+        self.texture = self.animations.textures[index]
 
 
 class Enemy(Entity):
@@ -245,10 +2133,11 @@ class PlayerCharacter(Entity):
         super().__init__("cloak", "hero")
 
         # Variables to track whether the player sprite is jumping, 
-        # climbing or on a ladder.
+        # climbing, on a ladder or able to jump.
         self.jumping = False
         self.climbing = False
         self.is_on_ladder = False
+        self.can_jump = False
 
     def update_animation(self, delta_time: float = 1 / 60):
         """
@@ -317,25 +2206,126 @@ class PlayerCharacter(Entity):
             self.walk_textures[self.cur_texture][self.facing_direction])
 
 
-class MainMenu(arcade.View):
+class LoadingView(arcade.View):
     """
-    Class used to store methods that manages the menu view/start screen.
+    Class used to show the loading screen while the assets and the level 
+    the next view needs are loaded in the background, drawing a bar of 
+    how much has loaded, and to show the next view once everything has 
+    loaded.
     """
 
-    # Used to initialize one variable for the UIManager for the view. 
-    # The view class does not control the size of the window so there 
-    # are no parameters needed in the super and only shows the view 
-    # based on the window. 
-    def __init__(self): 
+    # __init__() function to store the function that creates the next 
+    # view, the futures of the assets it needs and the loader of its 
+    # level if it has one.
+    def __init__(self, create_view, assets = (), level_loader = None):
 
-        super().__init__() 
+        super().__init__()
+        self.create_view = create_view
+        self.assets = list(assets)
+        self.level_loader = level_loader
+
+        # Stores the text showing how much has loaded, laid out once and 
+        # only laid out again when the number changes.
+        self.hud = HeadsUpDisplay()
+        self.hud.add_text("loading", SCREEN_WIDTH / 2 - 100, 
+                          SCREEN_HEIGHT / 2 + LOADING_BAR_HEIGHT * 2, 
+                          "Loading {}%")
+
+    def progress(self):
+        """
+        Method used to get how much of the next view has loaded, from 0 
+        to 1, counting each asset as one part, and the level as two parts, 
+        one for loading it and one for creating its OpenGL parts.
+        """
 
-        # Setting the background image for the view. Basically loading
-        # whatever image is in the that file directory using the Arcade
-        # Python Library.
-        self.texture = arcade.load_texture(f"{ASSET_PATH}/views/start.png") 
+        done = sum(1 for future in self.assets if future.done())
+        total = len(self.assets)
+        level_loader = self.level_loader
+        if level_loader is not None:
+            done += level_loader.is_ready() + level_loader.is_prepared()
+            total += 2
+        return done / total if total else 1.0
 
-        # Creating a UI manager to handle the UI of the view using the 
+    def is_loaded(self):
+        """
+        Method used to check whether everything the next view needs has 
+        loaded, or failed to load, in which case the next view raises 
+        the error when it uses it.
+        """
+
+        if not all(future.done() for future in self.assets):
+            return False
+        level_loader = self.level_loader
+        return level_loader is None or level_loader.is_prepared() or (
+            level_loader.is_ready() and level_loader.error is not None)
+
+    def on_update(self, delta_time):
+        """
+        Method used to create the OpenGL parts of the level once it has 
+        loaded, a little each frame, and to show the next view once 
+        everything has loaded.
+        """
+
+        # Waits for up to most of a frame for what is still loading, as 
+        # drawing the same bar again straight away would only take time 
+        # away from the threads loading it.
+        pending = [future for future in self.assets if not future.done()]
+        level_loader = self.level_loader
+        if pending:
+            concurrent.futures.wait(
+                pending, LOADING_WAIT_TIME, 
+                return_when = concurrent.futures.FIRST_COMPLETED)
+        elif level_loader is not None and not level_loader.is_ready():
+            level_loader.thread.join(LOADING_WAIT_TIME)
+        elif level_loader is not None:
+            level_loader.prepare(LOADING_TIME_BUDGET)
+        if self.is_loaded():
+            self.window.show_view(self.create_view())
+
+    def on_draw(self):
+        """
+        on_draw() method to draw the loading screen.
+        """
+
+        arcade.start_render()
+        progress = self.progress()
+        left = (SCREEN_WIDTH - LOADING_BAR_WIDTH) / 2
+        bottom = (SCREEN_HEIGHT - LOADING_BAR_HEIGHT) / 2
+        arcade.draw_lrtb_rectangle_filled(
+            left, left + LOADING_BAR_WIDTH * progress, 
+            bottom + LOADING_BAR_HEIGHT, bottom, arcade.color.WHITE)
+        arcade.draw_lrtb_rectangle_outline(
+            left, left + LOADING_BAR_WIDTH, bottom + LOADING_BAR_HEIGHT, 
+            bottom, arcade.color.WHITE, 2)
+        self.hud.set_value("loading", int(progress * 100))
+        self.hud.draw(self.window.ctx)
+
+
+class MainMenu(arcade.View):
+    """
+    Class used to store methods that manages the menu view/start screen.
+    """
+
+    # Used to initialize one variable for the UIManager for the view. 
+    # The view class does not control the size of the window so there 
+    # are no parameters needed in the super and only shows the view 
+    # based on the window. 
+    def __init__(self): 
+
+        super().__init__() 
+
+        # Setting the background image for the view, which the asset 
+        # manager loads once and keeps for every time the view is shown.
+        assets = AssetManager.get()
+        self.texture = assets.texture("views/start.png")
+
+        # Starts loading the image of the instruction screen and the 
+        # assets of the game in the background while the menu is shown, 
+        # so they are ready by the time the player starts the game.
+        assets.request_texture("views/instruction.png")
+        assets.request_game_assets()
+
+        # Creating a UI manager to handle the UI of the view using the 
         # Arcade Python Library and activating it.
         self.uimanager = arcade.gui.UIManager()
         self.uimanager.enable()
@@ -404,11 +2394,9 @@ class InstructionView(arcade.View):
 
         super().__init__() 
 
-        # Setting the background image for the view. Basically loading
-        # whatever image is in the that file directory using the Arcade
-        # Python Library.
-        self.texture = (
-            arcade.load_texture(f"{ASSET_PATH}/views/instruction.png")) 
+        # Setting the background image for the view, which the asset 
+        # manager loads once and keeps for every time the view is shown.
+        self.texture = AssetManager.get().texture("views/instruction.png")
 
         # Creating a UI manager to handle the UI of the view using the 
         # Arcade Python Library and activating it
@@ -440,11 +2428,10 @@ class InstructionView(arcade.View):
         they click on the start button.
         """
 
-        # Shows the InstructionView screen using the Arcade Python 
-        # Library by creating a variable which stores the 
-        # InstructionView class and displaying it.
+        # Shows the loading screen for the game using the Arcade Python 
+        # Library, which shows the game once its level has loaded.
         game_view = GameView()
-        self.window.show_view(game_view)
+        self.window.show_view(game_view.loading_view())
 
     def on_draw(self): 
         """ 
@@ -478,11 +2465,9 @@ class EndGame(arcade.View):
 
         super().__init__() 
 
-        # Setting the background image for the view. Basically loading
-        # whatever image is in the that file directory using the Arcade
-        # Python Library.
-        self.texture = (
-            arcade.load_texture(f"{ASSET_PATH}/views/endgame.png"))
+        # Setting the background image for the view, which the asset 
+        # manager loads once and keeps for every time the view is shown.
+        self.texture = AssetManager.get().texture("views/endgame.png")
 
         # Creating a UI manager to handle the UI of the view using the 
         # Arcade Python Library and activating it.
@@ -529,10 +2514,10 @@ class EndGame(arcade.View):
         button.
         """
 
-        # Shows the game using the Arcade Python Library by creating a 
-        # variable which stores the game class and displaying it.
+        # Shows the loading screen for a new game using the Arcade 
+        # Python Library, which shows the game once its level has loaded.
         game_view = GameView()
-        self.window.show_view(game_view)
+        self.window.show_view(game_view.loading_view())
 
     def quit_on_buttonclick(self, event):
         """
@@ -563,369 +2548,3828 @@ class EndGame(arcade.View):
     
 
 
-class GameView(arcade.View):
+class BakedStaticLayers:
     """
-    Class used to store methods that manages the main game. Methods 
-    include updating game state, processing user input, and drawing 
-    items on the screen.
+    Class used to draw the layers of a scene that never move from large 
+    chunk textures. The layers are drawn into the chunk textures a few 
+    at a time, with any chunk that needs to be drawn before it has been 
+    baked baked straight away, and each frame only the chunks that can 
+    be seen by the camera are drawn, with the layers that move drawn 
+    between them in the same order as the scene.
     """
 
-    # Game initializer which handles actions that should only be taken 
-    # when the game first starts.
-    def __init__(self):
+    # __init__() function to work out which chunk textures the layers of 
+    # the scene need, using the OpenGL context of the window.
+    def __init__(self, ctx, scene, chunk_size = CHUNK_PIXEL_SIZE):
+
+        self.ctx = ctx
+        self.scene = scene
+        self.chunk_size = chunk_size
+
+        # Program used to draw a chunk texture, which uses the same 
+        # projection as the sprite lists so it follows the camera.
+        self.program = ctx.program(
+            vertex_shader = CHUNK_VERTEX_SHADER, 
+            fragment_shader = CHUNK_FRAGMENT_SHADER)
+
+        # List to store the drawing passes in order, each one either the 
+        # name of a layer that moves, or the layers that don't move along 
+        # with a dictionary of their chunks, which is None for a chunk 
+        # that hasn't been baked yet. The runs of layers are kept by the 
+        # sprite lists in them, so layers added to the scene later don't 
+        # mean the chunks are baked again.
+        self.passes = []
+        self.runs = {}
+        self.pending = []
+        self.layer_count = 0
+        self.chunk_count = 0
+        self.update_passes()
+
+    def update_passes(self):
+        """
+        Method used to group the layers of the scene into runs of layers 
+        that don't move, finding the chunks of each new run.
+        """
 
-        super().__init__()
+        names = {id(sprite_list): name 
+                 for name, sprite_list in self.scene.name_mapping.items()}
+        self.passes = []
+        static_run = []
+        for sprite_list in self.scene.sprite_lists:
+            name = names[id(sprite_list)]
+            if name in DYNAMIC_LAYER_NAMES:
+                if static_run:
+                    self.passes.append(self.get_run(static_run))
+                    static_run = []
+                self.passes.append(name)
+            else:
+                static_run.append(sprite_list)
+        if static_run:
+            self.passes.append(self.get_run(static_run))
+        self.layer_count = len(self.scene.sprite_lists)
+
+    def get_run(self, sprite_lists):
+        """
+        Method used to get a run of layers along with its chunks, finding 
+        which chunks the sprites in the layers overlap the first time.
+        """
 
-        # Method returns the pathname to the path of the program and 
-        # sets it to start with the program.
-        file_path = os.path.dirname(os.path.abspath(__file__))
-        os.chdir(file_path)
+        key = tuple(id(sprite_list) for sprite_list in sprite_lists)
+        if key in self.runs:
+            return self.runs[key]
+        size = self.chunk_size
+        used_chunks = set()
+        for sprite_list in sprite_lists:
+            if not sprite_list.visible:
+                continue
+            for sprite in sprite_list:
+                for column in range(int(sprite.left // size), 
+                                    int(sprite.right // size) + 1):
+                    for row in range(int(sprite.bottom // size), 
+                                     int(sprite.top // size) + 1):
+                        used_chunks.add((column, row))
+        run = (sprite_lists, dict.fromkeys(sorted(used_chunks)))
+        self.runs[key] = run
+        self.pending.extend((run, chunk) for chunk in reversed(run[1]))
+        return run
+
+    def bake_chunk(self, run, chunk):
+        """
+        Method used to draw a run of layers into the texture of one 
+        chunk.
+        """
 
+        # Draws the layers into the chunk using a projection that only 
+        # covers that chunk. The colour is blended as normal but the 
+        # alpha is added up, so the chunk stores premultiplied colour 
+        # and can be drawn over the lower layers later with the same 
+        # result as drawing the sprites one by one. The projection 
+        # matrix is put back afterwards, as a chunk can be baked while a 
+        # camera is in use.
+        sprite_lists, chunks = run
+        column, row = chunk
+        size = self.chunk_size
+        previous_projection = self.ctx.projection_2d_matrix
+        previous_viewport = self.ctx.viewport
+        texture = self.ctx.texture((size, size), components = 4, 
+                                   filter = (self.ctx.NEAREST, self.ctx.NEAREST))
+        framebuffer = self.ctx.framebuffer(color_attachments = [texture])
+        with framebuffer.activate():
+            framebuffer.clear()
+            self.ctx.viewport = (0, 0, size, size)
+            self.ctx.projection_2d = (
+                column * size, (column + 1) * size, 
+                row * size, (row + 1) * size)
+            self.ctx.enable(self.ctx.BLEND)
+            gl.glBlendFuncSeparate(
+                gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA, 
+                gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
+            for sprite_list in sprite_lists:
+                sprite_list.draw()
+        self.ctx.blend_func = self.ctx.BLEND_DEFAULT
+        self.ctx.projection_2d_matrix = previous_projection
+        self.ctx.viewport = previous_viewport
+        chunks[chunk] = (texture, self.create_quad(column, row))
+        self.chunk_count += 1
+        return chunks[chunk]
+
+    def bake_pending(self, time_budget = PRELOAD_TIME_BUDGET):
+        """
+        Method used to bake the chunks that haven't been baked yet, 
+        stopping once the time budget in seconds is used up, or baking 
+        all of them if there is no time budget. Returns whether every 
+        chunk has been baked.
+        """
 
-        # Used to track if a key is pressed and its current state.
-        self.left_pressed = False
-        self.right_pressed = False
-        self.up_pressed = False
-        self.down_pressed = False
-        self.shoot_pressed = False
-        self.jump_needs_reset = False
+        if time_budget is not None:
+            end_time = time.perf_counter() + time_budget
+        while self.pending:
+            run, chunk = self.pending.pop()
+            if run[1][chunk] is None:
+                self.bake_chunk(run, chunk)
+            if time_budget is not None and time.perf_counter() >= end_time:
+                break
+        return not self.pending
+
+    def create_quad(self, column, row):
+        """
+        Method used to create the rectangle a chunk texture is drawn on, 
+        in the same position as the part of the map it covers.
+        """
 
-        # Stores our TileMap object.
-        self.tile_map = None
+        left = column * self.chunk_size
+        bottom = row * self.chunk_size
+        right = left + self.chunk_size
+        top = bottom + self.chunk_size
+        data = array.array("f", [
+            left, top, 0.0, 1.0,
+            left, bottom, 0.0, 0.0,
+            right, top, 1.0, 1.0,
+            right, bottom, 1.0, 0.0,
+        ])
+        return self.ctx.geometry(
+            [arcade.gl.BufferDescription(
+                self.ctx.buffer(data = data), "2f 2f", ["in_vert", "in_uv"])],
+            mode = self.ctx.TRIANGLE_STRIP)
+
+    def draw(self, camera, layers = None):
+        """
+        Method used to draw the scene, drawing the chunks that can be 
+        seen by the camera and the layers that move in order, from the 
+        given sprite lists of the layers that move if there are any 
+        instead of the scene.
+        """
 
-        # Stores our Scene Object.
-        self.scene = None
+        # Works out which chunks can be seen by the camera.
+        size = self.chunk_size
+        left, bottom = camera.position
+        first_column = int(left // size)
+        last_column = int((left + camera.viewport_width * camera.scale) 
+                          // size)
+        first_row = int(bottom // size)
+        last_row = int((bottom + camera.viewport_height * camera.scale) 
+                       // size)
+
+        # Groups the layers again if layers were added to the scene.
+        if len(self.scene.sprite_lists) != self.layer_count:
+            self.update_passes()
+
+        for drawing_pass in self.passes:
+            if isinstance(drawing_pass, str):
+                if layers is not None:
+                    layers[drawing_pass].draw()
+                else:
+                    self.scene[drawing_pass].draw()
+                continue
+
+            # Bakes the chunks that can be seen but haven't been baked 
+            # yet, then draws them. The chunk textures store 
+            # premultiplied colour, so they are drawn with the matching 
+            # blend function.
+            chunks = drawing_pass[1]
+            visible_chunks = []
+            for column in range(first_column, last_column + 1):
+                for row in range(first_row, last_row + 1):
+                    if (column, row) not in chunks:
+                        continue
+                    chunk = chunks[column, row]
+                    if chunk is None:
+                        chunk = self.bake_chunk(drawing_pass, (column, row))
+                    visible_chunks.append(chunk)
+            self.ctx.enable(self.ctx.BLEND)
+            self.ctx.blend_func = (self.ctx.ONE, 
+                                   self.ctx.ONE_MINUS_SRC_ALPHA)
+            for texture, quad in visible_chunks:
+                texture.use(0)
+                quad.render(self.program)
+            self.ctx.blend_func = self.ctx.BLEND_DEFAULT
+
+
+class GridPhysicsEngine:
+    """
+    Class used as a platformer physics engine for levels built on a tile 
+    grid. It moves the player and resolves collisions in the same steps 
+    as the Arcade Python Library platformer physics engine, but finds 
+    the walls and ladders the player touches by looking up the grid 
+    cells under the player instead of querying the sprite lists, and 
+    stores whether the player is on the ground or a ladder until the 
+    next update, as those are checked several times each tick.
+    """
 
-        # Stores our player sprite.
-        self.player_sprite = None
+    # __init__() function to store the player and the layers it 
+    # interacts with, and build the grid cells of the walls and ladders.
+    def __init__(self, player_sprite, platforms = None, 
+                 gravity_constant = 0.5, ladders = None, walls = None, 
+                 cell_size = GRID_PIXEL_SIZE):
 
-        # Stores the physics engine, used to manage movement and 
-        # collisions.
-        self.physics_engine = None
+        self.player_sprite = player_sprite
+        self.platforms = platforms if platforms is not None else []
+        self.gravity_constant = gravity_constant
+        self.cell_size = cell_size
 
-        # Stores our camera which is used for scrolling the screen.
-        self.camera = None
+        # Dictionaries storing the results of checking for the ground 
+        # and ladders, by the position they were checked from.
+        self.ground_contacts = {}
+        self.ladder_contacts = {}
 
-        # Stores our camera which is used to draw GUI elements.
-        self.gui_camera = None
+        self.wall_cells = self.build_cells(walls)
+        self.ladder_cells = self.build_cells(ladders)
 
-        # Stores our score and keeps track of it.
-        self.score = 0
+        # Stores the moving platforms this engine moves each tick, which 
+        # are only the ones whose position can't be looked up by tick.
+        self.moving_platforms = self.platforms
 
-        # Stores our deaths and keeps track of it.
-        self.death = 0
+    def build_cells(self, sprites):
+        """
+        Method used to build a dictionary storing, for each grid cell, 
+        the sprites whose hit box overlaps the cell along with the edges 
+        of their hit box. Sprites without a hit box are left out as they 
+        can never be touched.
+        """
 
-        # Stores our level and keeps track of it.
-        self.level = 1
+        cells = {}
+        if sprites is None:
+            return cells
+        self.add_sprites(cells, sprites)
+        return cells
 
-        # Stores our checkpoints and keeps track of it.
-        self.checkpoint = None
+    def add_sprites(self, cells, sprites):
+        """
+        Method used to add sprites to the grid cells their hit box 
+        overlaps, such as the walls of a chunk of a streamed level that 
+        has just been loaded.
+        """
 
-        # Stores our shooting mechanics.
-        self.can_shoot = False
-        self.shoot_timer = 0
+        for sprite in sprites:
+            if not sprite.get_hit_box():
+                continue
+            entry = (sprite, sprite.left, sprite.right, 
+                     sprite.bottom, sprite.top)
+            for column in range(int(entry[1] // self.cell_size), 
+                                int(entry[2] // self.cell_size) + 1):
+                for row in range(int(entry[3] // self.cell_size), 
+                                 int(entry[4] // self.cell_size) + 1):
+                    cells.setdefault((column, row), []).append(entry)
+        self.ground_contacts.clear()
+        self.ladder_contacts.clear()
+
+    def remove_sprites(self, cells, sprites):
+        """
+        Method used to remove sprites from the grid cells, such as the 
+        walls of a chunk of a streamed level that has been removed, 
+        forgetting the cells left empty.
+        """
 
-        # Stores the sound effects for the game.
-        self.collect_coin_sound = arcade.load_sound(
-            f"{ASSET_PATH}/sound/coin.wav")
-        self.jump_sound = arcade.load_sound(f"{ASSET_PATH}/sound/jump.wav")
-        self.game_over = arcade.load_sound(f"{ASSET_PATH}/sound/dead.wav")
-        self.shoot_sound = arcade.load_sound(f"{ASSET_PATH}/sound/shoot.wav")
-        self.hit_sound = arcade.load_sound(f"{ASSET_PATH}/sound/dead.wav")
-        self.background_music = arcade.Sound(
-            f"{ASSET_PATH}/sound/background.mp3", streaming = True)
-    
-    def setup(self):
+        removed = {sprite for sprite in sprites if sprite.get_hit_box()}
+        for sprite in removed:
+            for column in range(int(sprite.left // self.cell_size), 
+                                int(sprite.right // self.cell_size) + 1):
+                for row in range(int(sprite.bottom // self.cell_size), 
+                                 int(sprite.top // self.cell_size) + 1):
+                    entries = [entry for entry in cells.get((column, row), ()) 
+                               if entry[0] not in removed]
+                    if entries:
+                        cells[column, row] = entries
+                    else:
+                        cells.pop((column, row), None)
+        self.ground_contacts.clear()
+        self.ladder_contacts.clear()
+
+    def find_collisions(self, cells, include_platforms = True):
         """
-        Sets up the game to begin playing and stores things that may 
-        need to be repeated throughout the game without restarting the 
-        program.
+        Method used to get the sprites in the given grid cells, and the 
+        moving platforms, that the player is touching. Only the sprites 
+        whose hit box edges overlap the player's are checked exactly 
+        using Arcade Python Library.
         """
 
-        # Set up the background music for the game, the volume and 
-        # loops it.
-        background_music_volume = 0.1
-        self.current_player = self.background_music.play(
-            background_music_volume, loop=True)
+        player = self.player_sprite
+        points = player.get_adjusted_hit_box()
+        left = min(point[0] for point in points)
+        right = max(point[0] for point in points)
+        bottom = min(point[1] for point in points)
+        top = max(point[1] for point in points)
+
+        hit_list = []
+        for column in range(int(left // self.cell_size), 
+                            int(right // self.cell_size) + 1):
+            for row in range(int(bottom // self.cell_size), 
+                             int(top // self.cell_size) + 1):
+                for sprite, sprite_left, sprite_right, sprite_bottom, \
+                        sprite_top in cells.get((column, row), ()):
+                    if (left < sprite_right and right > sprite_left 
+                            and bottom < sprite_top and top > sprite_bottom 
+                            and sprite not in hit_list 
+                            and arcade.check_for_collision(player, sprite)):
+                        hit_list.append(sprite)
+
+        if include_platforms:
+            for platform in self.platforms:
+                if arcade.check_for_collision(player, platform):
+                    hit_list.append(platform)
+        return hit_list
+
+    def is_on_ladder(self):
+        """
+        Method used to check if the player is touching a ladder.
+        """
 
-        # Set up the cameras for the game using Arcade Python Library
-        # by passing in the desired width and heights for them.
-        self.camera = arcade.Camera(self.window.width, self.window.height)
-        self.gui_camera = arcade.Camera(self.window.width, self.window.height)
+        position = (self.player_sprite.center_x, self.player_sprite.center_y)
+        if position not in self.ladder_contacts:
+            self.ladder_contacts[position] = bool(
+                self.find_collisions(self.ladder_cells, False))
+        return self.ladder_contacts[position]
 
-        # Set up the level for the game by providing the file directory.
-        map_name = f"C:/Users/Tiger/Documents/game/DTP/level_{self.level}.tmx"
-
-        # Stores the layer specific options for the Tilemap, whether it 
-        # should detect collisions or not.
-        layer_options = {
-            LAYER_NAME_PLATFORMS: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_MOVING_PLATFORMS: {
-                "use_spatial_hash": False,
-            },
-            LAYER_NAME_LADDERS: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_COINS: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_DONT_TOUCH: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_CHECKPOINTS: {
-                "use_spatial_hash": True,
-            },
-            LAYER_NAME_DOOR: {
-                "use_spatial_hash": True,
-            },
-        }
-        
-        # Set up and load in the TileMap for the game, using Arcade 
-        # Python Library, by passing in our map, scaling and layer 
-        # specific options.
-        self.tile_map = arcade.load_tilemap(map_name, TILE_SCALING, 
-                                            layer_options)
+    def can_jump(self, y_distance = 5):
+        """
+        Method used to check if there is a wall or moving platform under 
+        the player, by checking for collisions with the player moved down 
+        by the given distance.
+        """
 
-        # Initiates new scene using the TileMap, which will add all 
-        # layers in the same order as in the TileMap using Arcade Python
-        # Library.
-        self.scene = arcade.Scene.from_tilemap(self.tile_map)
+        player = self.player_sprite
+        position = (player.center_x, player.center_y - y_distance)
+        player.center_y -= y_distance
+        if position not in self.ground_contacts:
+            self.ground_contacts[position] = bool(
+                self.find_collisions(self.wall_cells))
+        player.center_y += y_distance
+        return self.ground_contacts[position]
 
-        # Stores and keeps track of the score.
-        self.score = 0
+    def circular_check(self):
+        """
+        Method used to move the player out of the walls it starts a tick 
+        inside of, trying positions further and further away.
+        """
 
-        # Draws the Foreground layer after the player, meaning it 
-        # will appear in front of the Player. Setting this after will 
-        # also mean it appears in front of the other layers in the 
-        # TileMap, using Arcade Python Library using the player and
-        # foreground layer as the argument.
-        self.scene.add_sprite_list_after("Player", LAYER_NAME_FOREGROUND)
+        player = self.player_sprite
+        original_x = player.center_x
+        original_y = player.center_y
+        vary = 1
+        while True:
+            for x, y in ((original_x, original_y + vary), 
+                         (original_x, original_y - vary), 
+                         (original_x + vary, original_y), 
+                         (original_x - vary, original_y), 
+                         (original_x + vary, original_y + vary), 
+                         (original_x + vary, original_y - vary), 
+                         (original_x - vary, original_y + vary), 
+                         (original_x - vary, original_y - vary)):
+                player.center_x = x
+                player.center_y = y
+                if not self.find_collisions(self.wall_cells):
+                    return
+            vary *= 2
+
+    def move_player(self):
+        """
+        Method used to move the player by its speed, first along the y 
+        axis and then along the x axis, stopping it at the walls and 
+        moving platforms it hits and letting it walk up small steps. 
+        Returns the list of sprites the player hit.
+        """
 
-        # Tracks shooting mechanics.
-        self.can_shoot = True
-        self.shoot_timer = 0
+        player = self.player_sprite
+        if self.find_collisions(self.wall_cells):
+            self.circular_check()
+        original_x = player.center_x
+        original_y = player.center_y
+
+        # Moves the player along the y axis. Moving up into a wall moves 
+        # the player back down until it is clear, and landing on a wall 
+        # or moving platform lifts the player onto it and carries it 
+        # along with a moving platform.
+        player.center_y += player.change_y
+        hit_list = self.find_collisions(self.wall_cells)
+        complete_hit_list = list(hit_list)
+        if hit_list:
+            if player.change_y > 0:
+                while self.find_collisions(self.wall_cells):
+                    player.center_y -= 1
+            elif player.change_y < 0:
+                for item in hit_list:
+                    while arcade.check_for_collision(player, item):
+                        player.center_y += 0.25
+                    if item.change_x != 0:
+                        player.center_x += item.change_x
+            player.change_y = min(0.0, hit_list[0].change_y)
+        player.center_y = round(player.center_y, 2)
+
+        # Moves the player along the x axis, searching for the furthest 
+        # it can move without hitting anything, and lifting it up when 
+        # that lets it move further.
+        if player.change_x:
+            almost_original_y = player.center_y
+            direction = math.copysign(1, player.change_x)
+            cur_x_change = abs(player.change_x)
+            upper_bound = cur_x_change
+            lower_bound = 0
+            cur_y_change = 0
+            exit_loop = False
+            while not exit_loop:
+                player.center_x = original_x + cur_x_change * direction
+                collision_check = self.find_collisions(self.wall_cells)
+                for sprite in collision_check:
+                    if sprite not in complete_hit_list:
+                        complete_hit_list.append(sprite)
+
+                if collision_check:
+                    cur_y_change = cur_x_change
+                    player.center_y = original_y + cur_y_change
+                    collision_check = self.find_collisions(self.wall_cells)
+                    if collision_check:
+                        cur_y_change -= cur_x_change
+                    else:
+                        while not collision_check and cur_y_change > 0:
+                            cur_y_change -= 1
+                            player.center_y = almost_original_y + cur_y_change
+                            collision_check = self.find_collisions(
+                                self.wall_cells)
+                        cur_y_change += 1
+                        collision_check = []
+
+                    if collision_check:
+                        upper_bound = cur_x_change - 1
+                        if upper_bound - lower_bound <= 0:
+                            cur_x_change = lower_bound
+                            exit_loop = True
+                        else:
+                            cur_x_change = (upper_bound + lower_bound) // 2
+                    else:
+                        exit_loop = True
+                else:
+                    lower_bound = cur_x_change
+                    if upper_bound - lower_bound <= 0:
+                        exit_loop = True
+                    else:
+                        cur_x_change = ((upper_bound + lower_bound) // 2 
+                                        + (upper_bound + lower_bound) % 2)
 
-        # Set up the player sprite placing it at the x and y coordinates 
-        # and adding it to the player sprite list to be added to the 
-        # game scene using Arcade Python Library.
-        self.player_sprite = PlayerCharacter()
-        self.player_sprite.center_x = PLAYER_START_X
-        self.player_sprite.center_y = PLAYER_START_Y
-        self.scene.add_sprite(LAYER_NAME_PLAYER, self.player_sprite)
+            player.center_x = original_x + cur_x_change * direction
+            player.center_y = almost_original_y + cur_y_change
 
-        # Stores the enemy layer from the TileMap.
-        enemies_layer = self.tile_map.object_lists[LAYER_NAME_ENEMIES]
+        return complete_hit_list
 
-        # Set up the enemies in the game using a for loop.
-        for my_object in enemies_layer:
+    def move_platforms(self):
+        """
+        Method used to move the moving platforms by their speed, turning 
+        them around at their boundaries.
+        """
 
-            # Stores the cartesian coordinates for the enemy.
-            cartesian = self.tile_map.get_cartesian(
-                my_object.shape[0], my_object.shape[1]
-            )
+        for platform in self.moving_platforms:
+            self.move_platform(platform)
 
-            # Stores the enemy type.
-            enemy_type = my_object.properties["type"]
+    @staticmethod
+    def move_platform(platform):
+        """
+        Method used to move a moving platform by its speed, turning it 
+        around at its boundaries, the same way as the Arcade Python 
+        Library physics engine does.
+        """
 
-            # Checks the enemy type and assigns the appropriate enemy 
-            # type class which determines its health.
-            if enemy_type == "guardian":
-                enemy = GuardianEnemy()
-            
-            # Calculates and stores the enemy center x and y 
-            # coordinates.
-            enemy.center_x = math.floor(
-                cartesian[0] * TILE_SCALING * self.tile_map.tile_width
-            )
-            enemy.center_y = math.floor(
-                (cartesian[1] + 1) * (self.tile_map.tile_height * TILE_SCALING)
-            )
+        if platform.change_x != 0 or platform.change_y != 0:
+            if (platform.boundary_left 
+                    and platform.left <= platform.boundary_left):
+                platform.left = platform.boundary_left
+                if platform.change_x < 0:
+                    platform.change_x *= -1
+            if (platform.boundary_right 
+                    and platform.right >= platform.boundary_right):
+                platform.right = platform.boundary_right
+                if platform.change_x > 0:
+                    platform.change_x *= -1
+            platform.center_x += platform.change_x
+
+            if (platform.boundary_top is not None 
+                    and platform.top >= platform.boundary_top):
+                platform.top = platform.boundary_top
+                if platform.change_y > 0:
+                    platform.change_y *= -1
+            if (platform.boundary_bottom is not None 
+                    and platform.bottom <= platform.boundary_bottom):
+                platform.bottom = platform.boundary_bottom
+                if platform.change_y < 0:
+                    platform.change_y *= -1
+            platform.center_y += platform.change_y
+
+    def update(self):
+        """
+        Method used to apply gravity, move the player and the moving 
+        platforms, and forget the ground and ladder checks from the 
+        previous tick. Returns the list of sprites the player hit.
+        """
 
-            # Stores the different properties and movement of the enemy 
-            # including its boundary left, right, and change in x 
-            # coordinates.
-            if "boundary_left" in my_object.properties:
-                enemy.boundary_left = my_object.properties["boundary_left"]
-            if "boundary_right" in my_object.properties:
-                enemy.boundary_right = my_object.properties["boundary_right"]
-            if "change_x" in my_object.properties:
-                enemy.change_x = my_object.properties["change_x"]
-            
-            # Adding the enemy to the game scene using Arcade Python
-            # Library.
-            self.scene.add_sprite(LAYER_NAME_ENEMIES, enemy)
+        self.ground_contacts.clear()
+        self.ladder_contacts.clear()
+        if not self.is_on_ladder():
+            self.player_sprite.change_y -= self.gravity_constant
+        hit_list = self.move_player()
+        self.move_platforms()
+        self.ground_contacts.clear()
+        self.ladder_contacts.clear()
+        return hit_list
 
-        # Add bullet spritelist to game Scene using Arcade Python 
-        # Library.
-        self.scene.add_sprite_list(LAYER_NAME_BULLETS)
 
-        # Creating the physics engine. It allows basic movement, 
-        # provides a gravity force and also allows the player to jump 
-        # and climb ladders. Using the Arcade Python Library we pass
-        # in the player sprite and the layers it will be interacting 
-        # with such as moving platforms, platforms where the player
-        # can't move through and ladder which the player is able to 
-        # climb.
-        self.physics_engine = arcade.PhysicsEnginePlatformer(
-            self.player_sprite,
-            platforms=self.scene[LAYER_NAME_MOVING_PLATFORMS],
-            gravity_constant=GRAVITY,
-            ladders=self.scene[LAYER_NAME_LADDERS],
-            walls=self.scene[LAYER_NAME_PLATFORMS]
-        )
+class PeriodicMotion:
+    """
+    Class used to store the paths of things that move back and forth 
+    between their boundaries, such as moving platforms and enemies, so 
+    where each one is on any tick can be looked up instead of moving it 
+    one tick at a time. Each path is recorded by moving the thing the 
+    same way as every tick until it gets back to a state it was already 
+    in, after which its path repeats forever, so the looked up values 
+    are exactly the same as moving it every tick. Things whose path 
+    doesn't repeat within a limit are marked as not periodic, and have 
+    to keep being moved one tick at a time.
+    """
 
+    # __init__() function to create the lists the paths are recorded to, 
+    # and store the tick the paths start on.
+    def __init__(self, start_tick = 0):
 
-    def on_show(self):
+        self.start_tick = start_tick
+        self.paths = []
+        self.repeat_starts = []
+        self.periods = []
+        self.periodic = []
+        self.rows = None
+
+        # Stores the tick the rows were last looked up for and the rows, 
+        # as they are looked up more than once on the same tick.
+        self.last_tick = None
+        self.last_rows = None
+
+    def record(self, first_row, state, step, limit = MOTION_PERIOD_LIMIT):
         """
-        Shows and calls on the setup for the game. 
+        Method used to record the path of one more thing, from the row 
+        of values stored for its first tick, its state, and a function 
+        that moves it by a tick and returns the row of values stored for 
+        the tick and its new state.
         """
 
-        self.setup()
+        path = [first_row]
+        seen = {state: 0}
+        for tick in range(1, limit + 1):
+            row, state = step()
+            path.append(row)
+            if state in seen:
+                self.repeat_starts.append(seen[state])
+                self.periods.append(tick - seen[state])
+                self.periodic.append(True)
+                break
+            seen[state] = tick
+        else:
+            self.repeat_starts.append(0)
+            self.periods.append(1)
+            self.periodic.append(False)
+        self.paths.append(path)
 
-    def on_draw(self):
+    def finish(self):
         """
-        Renders and draws the screen, used to draw everything displayed 
-        in the game.
+        Method used to store the recorded paths in arrays once every 
+        path has been recorded.
         """
 
-        # Activates the camera for the game.
-        self.camera.use()
+        lengths = [len(path) for path in self.paths]
+        self.offsets = numpy.cumsum([0] + lengths[:-1]).astype(int)
+        self.repeat_starts = numpy.array(self.repeat_starts, dtype = int)
+        self.periods = numpy.array(self.periods, dtype = int)
+        self.periodic = numpy.array(self.periodic, dtype = bool)
+        self.rows = numpy.array(
+            [row for path in self.paths for row in path], dtype = float)
+        self.paths = None
+        return self
+
+    def at(self, tick):
+        """
+        Method used to get the row of values of every path on a tick, 
+        which can be any tick from the start tick onwards. The rows of 
+        paths that aren't periodic are only right up to the limit.
+        """
 
-        # Draws the game scene.
-        self.scene.draw()
+        ticks = max(tick - self.start_tick, 0)
+        if ticks == self.last_tick:
+            return self.last_rows
+        repeat_starts = self.repeat_starts
+        indices = numpy.where(
+            ticks > repeat_starts, 
+            repeat_starts + 1 + (ticks - repeat_starts - 1) % self.periods, 
+            ticks)
+        if not self.periodic.all():
+            indices = numpy.minimum(indices, MOTION_PERIOD_LIMIT)
+        self.last_tick = ticks
+        self.last_rows = self.rows[self.offsets + indices]
+        return self.last_rows
+
+
+class PlatformMotion(PeriodicMotion):
+    """
+    Class used to look up the position of every moving platform on a 
+    tick. Each tick the moving platforms are moved twice, once by the 
+    physics engine, which turns them around at their boundaries, and 
+    once more by their speed, so the position after each of the two 
+    moves is stored. The platforms whose path doesn't repeat are still 
+    moved one tick at a time.
+    """
 
-        # Activates the GUI camera for the game.
-        self.gui_camera.use()
+    # __init__() function to record the path of every moving platform, 
+    # by moving it tick by tick and putting it back afterwards.
+    def __init__(self, platforms, start_tick = 0):
+
+        super().__init__(start_tick)
+        self.sprites = list(platforms)
+        for platform in self.sprites:
+            state = (platform.center_x, platform.center_y, 
+                     platform.change_x, platform.change_y)
+
+            def step(platform = platform):
+                GridPhysicsEngine.move_platform(platform)
+                middle = (platform.center_x, platform.center_y)
+                platform.update()
+                state = (platform.center_x, platform.center_y, 
+                         platform.change_x, platform.change_y)
+                return middle + state, state
+
+            self.record(state[:2] + state, state, step)
+            platform.position = state[:2]
+            platform.change_x, platform.change_y = state[2:]
+        self.finish()
+        self.stepped = [platform for platform, periodic 
+                        in zip(self.sprites, self.periodic) if not periodic]
+
+    def move(self, tick, middle = False):
+        """
+        Method used to move the moving platforms to where they are on a 
+        tick, either after the physics engine moved them or after they 
+        moved by their speed as well. The platforms whose path doesn't 
+        repeat are only moved by their speed, as the physics engine 
+        moves them itself.
+        """
 
-        # Draws the score text on the screen, and keeps it stationary 
-        # on the screen, scrolling with the viewport, also with a shadow
-        # effect and custom font Arcade Python Library.
-        score_text = f"Skulls: {self.score}/3"
-        arcade.draw_text(
-            score_text,
-            10,
-            10,
-            arcade.csscolor.BLACK,
-            20,
-            font_name = "Kenney Future"
-        )
-        arcade.draw_text(
-            score_text,
-            13,
-            13,
-            arcade.csscolor.WHITE,
-            20,
-            font_name = "Kenney Future"
-        )
+        if not self.sprites:
+            return
+        rows = self.at(tick)
+        columns = (0, 1) if middle else (2, 3)
+        for platform, periodic, row in zip(self.sprites, self.periodic, 
+                                           rows.tolist()):
+            if periodic:
+                platform.position = (row[columns[0]], row[columns[1]])
+                platform.change_x = row[4]
+                platform.change_y = row[5]
+            elif not middle:
+                platform.update()
+
+
+class EnemyPatrol:
+    """
+    Class used to store the position, speed, patrol boundaries and 
+    health of every enemy in a level in arrays, so that all of the 
+    enemies can be moved and turned around at their boundaries together 
+    each tick, instead of one sprite at a time. The path of every enemy 
+    is recorded when the patrol is created, so where each enemy is on a 
+    tick is looked up rather than worked out from the previous tick.
+    """
 
-        # Draws the death text on the screen, and keeps it stationary 
-        # on the screen, scrolling with the viewport, also with a shadow
-        # effect and custom font using Arcade Python Library.
-        death_text = f"Deaths: {self.death}"
-        arcade.draw_text(
-            death_text,
-            10,
-            50,
-            arcade.csscolor.BLACK,
-            20,
-            font_name = "Kenney Future"
-        )
-        arcade.draw_text(
-            death_text,
-            13,
-            53,
-            arcade.csscolor.WHITE,
-            20,
-            font_name = "Kenney Future"
-        )
+    # __init__() function to copy the state of the enemy sprites into 
+    # arrays, in the same order as the enemy sprite list, from the tick 
+    # the enemies start moving on.
+    def __init__(self, enemies, start_tick = 0):
+
+        self.sprites = list(enemies)
+        self.indices = {enemy: i for i, enemy in enumerate(self.sprites)}
+        self.x = numpy.array([enemy.center_x for enemy in self.sprites], 
+                             dtype = float)
+        self.y = numpy.array([enemy.center_y for enemy in self.sprites], 
+                             dtype = float)
+        self.change_x = numpy.array(
+            [enemy.change_x for enemy in self.sprites], dtype = float)
+        self.health = numpy.array(
+            [enemy.health for enemy in self.sprites], dtype = float)
+        self.alive = numpy.ones(len(self.sprites), dtype = bool)
+
+        # Stores the boundaries, where a boundary that isn't set, or is 
+        # set to 0, is never checked.
+        self.boundary_left = numpy.array(
+            [enemy.boundary_left or 0 for enemy in self.sprites], 
+            dtype = float)
+        self.boundary_right = numpy.array(
+            [enemy.boundary_right or 0 for enemy in self.sprites], 
+            dtype = float)
+        self.has_boundary_left = self.boundary_left != 0
+        self.has_boundary_right = self.boundary_right != 0
+
+        # Stores the edges of each enemy hit box relative to its center, 
+        # which don't change as the enemies never rotate or resize.
+        edges = numpy.zeros((len(self.sprites), 4))
+        for i, enemy in enumerate(self.sprites):
+            points = enemy.get_hit_box()
+            if points:
+                x_points = [point[0] * enemy.scale for point in points]
+                y_points = [point[1] * enemy.scale for point in points]
+                edges[i] = (min(x_points), max(x_points), 
+                            min(y_points), max(y_points))
+        (self.hit_box_left, self.hit_box_right, 
+         self.hit_box_bottom, self.hit_box_top) = edges.T
+
+        # Records the path of every enemy, storing its position and 
+        # speed on each tick.
+        self.motion = PeriodicMotion(start_tick)
+        for i in range(len(self.sprites)):
+            self.record_path(i)
+        self.motion.finish()
+
+    def record_path(self, i):
+        """
+        Method used to record the path of an enemy by moving it the same 
+        way as update does, without moving the enemy itself.
+        """
 
-    def process_keychange(self):
+        x = float(self.x[i])
+        change_x = float(self.change_x[i])
+        hit_box_left = float(self.hit_box_left[i])
+        hit_box_right = float(self.hit_box_right[i])
+        boundary_left = float(self.boundary_left[i])
+        boundary_right = float(self.boundary_right[i])
+        has_boundary_left = bool(self.has_boundary_left[i])
+        has_boundary_right = bool(self.has_boundary_right[i])
+
+        def step():
+            nonlocal x, change_x
+            x += change_x
+            if (has_boundary_right and x + hit_box_right > boundary_right 
+                    and change_x > 0):
+                change_x *= -1
+            if (has_boundary_left and x + hit_box_left < boundary_left 
+                    and change_x < 0):
+                change_x *= -1
+            return (x, change_x), (x, change_x)
+
+        self.motion.record((x, change_x), (x, change_x), step)
+
+    def update(self, tick):
         """
-        Processes the key changes when the user presses different keys.
+        Method used to move every enemy that is alive to where it is on 
+        the given tick, which also reverses the direction of travel of 
+        the enemies that have gone past their boundaries, then move the 
+        enemy sprites to their new positions. The enemies whose path 
+        doesn't repeat are moved from where they were on the last tick.
         """
 
-        # Processes when the user presses the up key.
-        if self.up_pressed and not self.down_pressed:
+        alive = self.alive
+        previous_change_x = self.change_x.copy()
+        looked_up = alive & self.motion.periodic
+        if looked_up.any():
+            rows = self.motion.at(tick)
+            self.x[looked_up] = rows[looked_up, 0]
+            self.change_x[looked_up] = rows[looked_up, 1]
+
+        # Checks the right boundary first and then the left boundary 
+        # using the updated direction, the same as checking each enemy.
+        stepped = alive & ~self.motion.periodic
+        if stepped.any():
+            self.x[stepped] += self.change_x[stepped]
+            turn_left = (stepped & self.has_boundary_right 
+                         & (self.x + self.hit_box_right 
+                            > self.boundary_right) 
+                         & (self.change_x > 0))
+            self.change_x[turn_left] *= -1
+            turn_right = (stepped & self.has_boundary_left 
+                          & (self.x + self.hit_box_left 
+                             < self.boundary_left) 
+                          & (self.change_x < 0))
+            self.change_x[turn_right] *= -1
+        turned = numpy.flatnonzero(self.change_x != previous_change_x)
+        for index in turned.tolist():
+            self.sprites[index].change_x = float(self.change_x[index])
+
+        # Moves the sprites of the enemies that are moving.
+        indices = numpy.flatnonzero(alive & (self.change_x != 0))
+        for index, x in zip(indices.tolist(), self.x[indices].tolist()):
+            self.sprites[index].center_x = x
+
+    def bounds(self):
+        """
+        Method used to get the enemies that are alive along with an array 
+        of their hit box edges, stored as left, right, bottom and top.
+        """
 
-            # If the player is on a ladder while pressing up it changes 
-            # the y coordinate of the player making them move up the 
-            # ladder according to the movement speed using Arcade Python 
-            # Library.
-            if self.physics_engine.is_on_ladder():
-                self.player_sprite.change_y = PLAYER_MOVEMENT_SPEED
+        indices = numpy.flatnonzero(self.alive)
+        bounds = numpy.stack(
+            (self.x[indices] + self.hit_box_left[indices], 
+             self.x[indices] + self.hit_box_right[indices], 
+             self.y[indices] + self.hit_box_bottom[indices], 
+             self.y[indices] + self.hit_box_top[indices]), axis = 1)
+        return [self.sprites[index] for index in indices.tolist()], bounds
 
-            # If the player is not on a ladder and there is a platform 
-            # beneath the player, if they press up it changes the y 
-            # coordinate of the player making them jump, according to 
-            # the jump speed and resets the jump while also playing the 
-            # jump sound effect using Arcade Python Library.
-            elif (
-                self.physics_engine.can_jump(y_distance=10)
-                and not self.jump_needs_reset
-            ):
-                self.player_sprite.change_y = PLAYER_JUMP_SPEED
-                self.jump_needs_reset = True
-                arcade.play_sound(self.jump_sound)
+    def collisions(self, sprite):
+        """
+        Method used to get the enemies that are alive and hit the given 
+        sprite, only checking the enemies whose hit box edges overlap the 
+        sprite's using Arcade Python Library.
+        """
 
-        # Processes when the user presses the down key.
-        elif self.down_pressed and not self.up_pressed:
+        indices = numpy.flatnonzero(
+            self.alive 
+            & (self.x + self.hit_box_left < sprite.right) 
+            & (self.x + self.hit_box_right > sprite.left) 
+            & (self.y + self.hit_box_bottom < sprite.top) 
+            & (self.y + self.hit_box_top > sprite.bottom))
+        return [self.sprites[index] for index in indices.tolist() 
+                if arcade.check_for_collision(sprite, self.sprites[index])]
 
-            # If the player is on a ladder while pressing down it 
-            # changes the y coordinate of the player making them move 
-            # down the ladder according to the movement speed using 
-            # Arcade Python Library.
-            if self.physics_engine.is_on_ladder():
-                self.player_sprite.change_y = -PLAYER_MOVEMENT_SPEED
+    def damage(self, enemy, amount):
+        """
+        Method used to reduce the health of an enemy, marking it as no 
+        longer alive when it has no health left, and returning the 
+        health it has left.
+        """
 
-        # Process when the user does not press the up or down keys when 
-        # on a ladder there will be no movement using Arcade Python 
-        # Library.
-        if self.physics_engine.is_on_ladder():
-            if not self.up_pressed and not self.down_pressed:
-                self.player_sprite.change_y = 0
-            elif self.up_pressed and self.down_pressed:
-                self.player_sprite.change_y = 0
+        index = self.indices[enemy]
+        self.health[index] -= amount
+        enemy.health = float(self.health[index])
+        if enemy.health <= 0:
+            self.alive[index] = False
+        return enemy.health
 
-        # Process when the user presses right key.
-        if self.right_pressed and not self.left_pressed:
+
+class BulletPool:
+    """
+    Class used to store every bullet the player can fire in a pool that 
+    is created once, with the bullet positions stored in arrays so that 
+    all of the bullets can be moved, recycled and checked for collisions 
+    together each tick, instead of one sprite at a time.
+    """
+
+    # __init__() function to create the bullet sprites, which all share 
+    # the same texture, and the arrays storing the state of each bullet. 
+    # Only the sprites of the bullets that are alive are kept in the 
+    # bullet layer, as hiding a sprite in Arcade Python Library still 
+    # draws it, just without any colour.
+    def __init__(self, size = BULLET_POOL_SIZE):
+
+        self.size = size
+        texture = AssetManager.get().texture("bullet/bullet.png")
+        load_hit_box(texture)
+        self.sprites = []
+        for i in range(size):
+            bullet = arcade.Sprite(scale = SPRITE_SCALING_LASER, 
+                                   texture = texture)
+            self.sprites.append(bullet)
+
+        # Stores the edges of the bullet hit box relative to its center, 
+        # used to find which tiles and enemies each bullet overlaps.
+        bullet = self.sprites[0]
+        self.hit_box_left = bullet.left
+        self.hit_box_right = bullet.right
+        self.hit_box_bottom = bullet.bottom
+        self.hit_box_top = bullet.top
+
+        # Arrays storing the position, speed, age and state of each 
+        # bullet, where a bullet that isn't alive is free to be fired.
+        self.x = numpy.zeros(size)
+        self.y = numpy.zeros(size)
+        self.change_x = numpy.zeros(size)
+        self.age = numpy.zeros(size, dtype = numpy.int32)
+        self.alive = numpy.zeros(size, dtype = bool)
+
+        # Stores how many ticks a bullet that doesn't hit anything stays 
+        # alive for.
+        self.lifetime = BULLET_LIFETIME
+
+        # Stores the sprite list the bullets are drawn from, and the 
+        # platform tile grid of the current level.
+        self.sprite_list = None
+        self.map_width = 0
+        self.cell_width = GRID_PIXEL_SIZE
+        self.cell_height = GRID_PIXEL_SIZE
+        self.tile_bounds = numpy.full((0, 0, 4), numpy.nan)
+        self.tile_sprites = {}
+
+    def attach(self, sprite_list, platforms, tile_map, tile_grid = None):
+        """
+        Method used to move every bullet into the bullet layer of a newly 
+        loaded level, and store the grid of platform tiles made by 
+        build_tile_grid for the level.
+        """
+
+        # Frees the bullets of the previous level, which removes them 
+        # from its sprite list, and fires bullets into the new one.
+        self.release(numpy.flatnonzero(self.alive))
+        self.sprite_list = sprite_list
+
+        # Stores the tile grid of the level, building it now unless it was 
+        # built while the level was loaded.
+        self.cell_width = tile_map.tile_width * tile_map.scaling
+        self.cell_height = tile_map.tile_height * tile_map.scaling
+        self.map_width = tile_map.width * self.cell_width
+        if tile_grid is None:
+            tile_grid = self.build_tile_grid(platforms, tile_map)
+        self.tile_bounds, self.tile_sprites = tile_grid
+
+    @staticmethod
+    def build_tile_grid(platforms, tile_map):
+        """
+        Method used to build a grid storing the hit box edges of the 
+        platform tile in each cell of a level, along with the tile 
+        sprites by cell.
+        """
+
+        # Each platform tile sits inside a single cell. Cells without a 
+        # platform store NaN edges, which never overlap a bullet.
+        tile_bounds = numpy.full((tile_map.height, tile_map.width, 4), 
+                                 numpy.nan)
+        tile_sprites = {}
+        BulletPool.place_tiles(
+            tile_bounds, tile_sprites, platforms, 
+            tile_map.tile_width * tile_map.scaling, 
+            tile_map.tile_height * tile_map.scaling)
+        return tile_bounds, tile_sprites
+
+    @staticmethod
+    def place_tiles(tile_bounds, tile_sprites, tiles, cell_width, 
+                    cell_height):
+        """
+        Method used to store the hit box edges and the sprites of 
+        platform tiles in the cells of a tile grid they sit in.
+        """
+
+        rows, columns = tile_bounds.shape[:2]
+        for tile in tiles:
+            if not tile.get_hit_box():
+                continue
+            column = int(tile.center_x // cell_width)
+            row = int(tile.center_y // cell_height)
+            if 0 <= row < rows and 0 <= column < columns:
+                tile_bounds[row, column] = (
+                    tile.left, tile.right, tile.bottom, tile.top)
+                tile_sprites[row, column] = tile
+
+    def add_tiles(self, tiles):
+        """
+        Method used to add platform tiles to the tile grid, such as the 
+        platforms of a chunk of a streamed level that has been loaded.
+        """
+
+        self.place_tiles(self.tile_bounds, self.tile_sprites, tiles, 
+                         self.cell_width, self.cell_height)
+
+    def remove_tiles(self, tiles):
+        """
+        Method used to remove platform tiles from the tile grid, such as 
+        the platforms of a chunk of a streamed level that has been 
+        removed.
+        """
+
+        for tile in tiles:
+            cell = (int(tile.center_y // self.cell_height), 
+                    int(tile.center_x // self.cell_width))
+            if self.tile_sprites.get(cell) is tile:
+                del self.tile_sprites[cell]
+                self.tile_bounds[cell] = numpy.nan
+
+    def fire(self, x, y, change_x):
+        """
+        Method used to fire a free bullet from the given position, 
+        reusing the oldest bullet when every bullet is already alive.
+        """
+
+        free = numpy.flatnonzero(~self.alive)
+        if len(free):
+            index = int(free[0])
+        else:
+            index = int(numpy.argmax(self.age))
+        bullet = self.sprites[index]
+        if not self.alive[index]:
+            self.sprite_list.append(bullet)
+        self.x[index] = x
+        self.y[index] = y
+        self.change_x[index] = change_x
+        self.age[index] = 0
+        self.alive[index] = True
+        bullet.position = (x, y)
+        return index
+
+    def release(self, indices):
+        """
+        Method used to free bullets so that they can be fired again, 
+        removing their sprites from the bullet layer.
+        """
+
+        for index in indices:
+            if self.alive[index]:
+                self.sprite_list.remove(self.sprites[index])
+        self.alive[indices] = False
+
+    def update(self):
+        """
+        Method used to move every bullet that is alive, freeing bullets 
+        that are too old or have left the level, and moving the bullet 
+        sprites to their new positions.
+        """
+
+        alive = self.alive
+        self.x[alive] += self.change_x[alive]
+        self.age[alive] += 1
+        expired = alive & ((self.age > self.lifetime) 
+                           | (self.x < 0) | (self.x > self.map_width))
+        self.release(numpy.flatnonzero(expired))
+
+        indices = numpy.flatnonzero(self.alive)
+        for index, x, y in zip(indices.tolist(), 
+                               self.x[indices].tolist(), 
+                               self.y[indices].tolist()):
+            self.sprites[index].position = (x, y)
+
+    def collisions(self, enemies, enemy_bounds, moving_platforms):
+        """
+        Method used to find the bullets that hit an enemy, a platform or 
+        a moving platform. The hit box edges of every bullet are checked 
+        against the enemies, moving platforms and the tile grid at once, 
+        and only the bullets that overlap something are checked exactly 
+        using Arcade Python Library. Yields the index of each bullet that 
+        hit something along with the sprites it hit, in the same order 
+        as checking the enemies, platforms and moving platforms lists. 
+        The enemies are given along with an array of their hit box edges, 
+        and enemies removed from the scene while iterating are not hit 
+        again.
+        """
+
+        indices = numpy.flatnonzero(self.alive)
+        if not len(indices):
+            return
+
+        # Stores the hit box edges of every bullet that is alive.
+        left = self.x[indices] + self.hit_box_left
+        right = self.x[indices] + self.hit_box_right
+        bottom = self.y[indices] + self.hit_box_bottom
+        top = self.y[indices] + self.hit_box_top
+
+        def overlapping(bounds):
+            return ((left[:, None] < bounds[:, 1]) 
+                    & (right[:, None] > bounds[:, 0]) 
+                    & (bottom[:, None] < bounds[:, 3]) 
+                    & (top[:, None] > bounds[:, 2]))
+
+        enemy_overlaps = overlapping(enemy_bounds.reshape(-1, 4))
+        moving_overlaps = overlapping(numpy.array(
+            [(sprite.left, sprite.right, sprite.bottom, sprite.top) 
+             for sprite in moving_platforms]).reshape(-1, 4))
+
+        # A bullet is smaller than a cell, so it can only overlap the 
+        # cells under its four corners.
+        rows, columns = self.tile_bounds.shape[:2]
+        cell_columns = (numpy.floor(left / self.cell_width), 
+                        numpy.floor(right / self.cell_width))
+        cell_rows = (numpy.floor(bottom / self.cell_height), 
+                     numpy.floor(top / self.cell_height))
+        tile_overlaps = []
+        for cell_row in cell_rows:
+            for cell_column in cell_columns:
+                inside = ((cell_row >= 0) & (cell_row < rows) 
+                          & (cell_column >= 0) & (cell_column < columns))
+                row = numpy.where(inside, cell_row, 0).astype(int)
+                column = numpy.where(inside, cell_column, 0).astype(int)
+                bounds = self.tile_bounds[row, column]
+                tile_overlaps.append(
+                    (row, column, inside 
+                     & (left < bounds[:, 1]) & (right > bounds[:, 0]) 
+                     & (bottom < bounds[:, 3]) & (top > bounds[:, 2])))
+        any_tile = numpy.any([overlap for _, _, overlap in tile_overlaps], 
+                             axis = 0)
+        candidates = (enemy_overlaps.any(axis = 1) 
+                      | moving_overlaps.any(axis = 1) | any_tile)
+
+        # Checks the bullets that overlap something using their exact 
+        # hit boxes.
+        for position in numpy.flatnonzero(candidates).tolist():
+            bullet = self.sprites[indices[position]]
+            possible = [enemies[i] for i in 
+                        numpy.flatnonzero(enemy_overlaps[position])]
+            tiles = {(int(row[position]), int(column[position])) 
+                     for row, column, overlap in tile_overlaps 
+                     if overlap[position]}
+            possible.extend(self.tile_sprites[cell] for cell in tiles)
+            possible.extend(moving_platforms[i] for i in 
+                            numpy.flatnonzero(moving_overlaps[position]))
+            hit_list = [sprite for sprite in possible 
+                        if sprite.sprite_lists 
+                        and arcade.check_for_collision(bullet, sprite)]
+            if hit_list:
+                yield int(indices[position]), hit_list
+
+
+class TriggerIndex:
+    """
+    Class used to find the coins, checkpoints, doors and don't touch 
+    tiles the player is touching with one lookup each tick. The trigger 
+    tiles never move, so the edges and hit box of each one are worked 
+    out once when the level loads and stored in the grid cells they 
+    overlap. Only the triggers whose hit box edges overlap the player's 
+    are checked exactly using Arcade Python Library, giving the same 
+    results as checking the player against each trigger layer. The 
+    triggers the player started and stopped touching since the last 
+    lookup are stored as well.
+    """
+
+    # __init__() function to store every trigger of the given layers in 
+    # the grid cells its hit box overlaps.
+    def __init__(self, scene, layer_names = TRIGGER_LAYERS, 
+                 cell_size = GRID_PIXEL_SIZE):
+
+        # Each trigger is stored as the name of its layer, the sprite, 
+        # the sprite list of the layer, its hit box edges and its hit 
+        # box, in the order of the layers and of the sprites in them.
+        self.cell_size = cell_size
+        self.triggers = []
+        self.cells = {}
+        for layer_name in layer_names:
+            sprite_list = scene[layer_name]
+            for sprite in sprite_list:
+                if not sprite.get_hit_box():
+                    continue
+                trigger = (len(self.triggers), layer_name, sprite, 
+                           sprite_list, sprite.left, sprite.right, 
+                           sprite.bottom, sprite.top, 
+                           sprite.get_adjusted_hit_box())
+                self.triggers.append(trigger)
+                for column in range(int(sprite.left // cell_size), 
+                                    int(sprite.right // cell_size) + 1):
+                    for row in range(int(sprite.bottom // cell_size), 
+                                     int(sprite.top // cell_size) + 1):
+                        self.cells.setdefault(
+                            (column, row), []).append(trigger)
+
+        # Lists storing the triggers touched on the last lookup, and the 
+        # ones that were started and stopped being touched on it.
+        self.touching = []
+        self.entered = []
+        self.exited = []
+
+    def update(self, sprite):
+        """
+        Method used to find the triggers the sprite is touching, in the 
+        order they are stored, and the ones it started and stopped 
+        touching since the last lookup. A trigger that has been removed 
+        from its layer, such as a collected coin, isn't touched.
+        """
+
+        points = sprite.get_adjusted_hit_box()
+        left = min(point[0] for point in points)
+        right = max(point[0] for point in points)
+        bottom = min(point[1] for point in points)
+        top = max(point[1] for point in points)
+
+        touching = []
+        for column in range(int(left // self.cell_size), 
+                            int(right // self.cell_size) + 1):
+            for row in range(int(bottom // self.cell_size), 
+                             int(top // self.cell_size) + 1):
+                for trigger in self.cells.get((column, row), ()):
+                    (index, layer_name, trigger_sprite, sprite_list, 
+                     trigger_left, trigger_right, trigger_bottom, 
+                     trigger_top, trigger_points) = trigger
+                    if (left < trigger_right and right > trigger_left 
+                            and bottom < trigger_top 
+                            and top > trigger_bottom 
+                            and trigger not in touching 
+                            and sprite_list in trigger_sprite.sprite_lists 
+                            and arcade.are_polygons_intersecting(
+                                points, trigger_points)):
+                        touching.append(trigger)
+        touching.sort()
+
+        self.entered = [trigger for trigger in touching 
+                        if trigger not in self.touching]
+        self.exited = [trigger for trigger in self.touching 
+                       if trigger not in touching]
+        self.touching = touching
+        return touching
+
+    def reset(self, sprite):
+        """
+        Method used to look up the triggers the sprite is touching after 
+        it has been put somewhere else without playing, such as when the 
+        game is rewound, without any being started or stopped being 
+        touched.
+        """
+
+        self.update(sprite)
+        self.entered = []
+        self.exited = []
+
+
+class LevelLoader:
+    """
+    Class used to load the parts of a level that don't need OpenGL, 
+    which are the TileMap, the scene, the player, the enemies and the 
+    physics engine. A level can either be loaded straight away or on a 
+    background thread while the previous level is played, in which case 
+    its sprite lists are lazy and only use OpenGL once the level has 
+    been swapped in on the main thread.
+    """
+
+    # __init__() function to store which level to load and how, and the 
+    # tick rate the speeds of the level are scaled to.
+    def __init__(self, level, use_level_cache = True, 
+                 use_grid_physics = USE_GRID_PHYSICS, lazy = False, 
+                 tick_rate = TICK_RATE):
+
+        self.level = level
+        self.use_level_cache = use_level_cache
+        self.use_grid_physics = use_grid_physics
+        self.lazy = lazy
+        self.tick_scale = BASE_TICK_RATE / tick_rate
+
+        # Stores the parts of the level once they are loaded.
+        self.tile_map = None
+        self.streamer = None
+        self.scene = None
+        self.player_sprite = None
+        self.players = None
+        self.enemies = None
+        self.enemy_patrol = None
+        self.platform_motion = None
+        self.physics_engine = None
+        self.tile_grid = None
+        self.trigger_index = None
+
+        # Stores the steps left to create the OpenGL parts of the level 
+        # on the main thread, and whether they are all done.
+        self.steps = None
+        self.prepared = False
+
+        # Stores the background thread and any error it raised, so the 
+        # error can be raised again on the main thread.
+        self.thread = None
+        self.error = None
+
+    def load(self):
+        """
+        Method used to load the level on the current thread.
+        """
+
+        # Set up and load in the TileMap for the game by passing in our 
+        # level and the layer specific options, reading it from the 
+        # compiled level cache unless the Tiled map should be parsed 
+        # with the Arcade Python Library.
+        self.tile_map = load_level_map(self.level, LAYER_OPTIONS, 
+                                       self.use_level_cache, self.lazy)
+        self.streamer = getattr(self.tile_map, "streamer", None)
+
+        # Initiates new scene using the TileMap, which will add all 
+        # layers in the same order as in the TileMap using Arcade Python
+        # Library. The sprite lists are added to the scene directly, as 
+        # adding them through the scene would swap the empty ones for new 
+        # sprite lists, and the streamed layers start empty.
+        self.scene = arcade.Scene()
+        for name, sprite_list in self.tile_map.sprite_lists.items():
+            self.scene.name_mapping[name] = sprite_list
+            self.scene.sprite_lists.append(sprite_list)
+
+        # Set up the player sprite placing it at the x and y coordinates 
+        # and adding it to the player sprite list to be added to the 
+        # game scene using Arcade Python Library.
+        self.player_sprite = PlayerCharacter()
+        self.player_sprite.center_x = PLAYER_START_X
+        self.player_sprite.center_y = PLAYER_START_Y
+        self.players = arcade.SpriteList(lazy = self.lazy)
+        self.players.append(self.player_sprite)
+
+        # Loads the chunks of a streamed level around where the player 
+        # starts.
+        if self.streamer is not None:
+            self.streamer.update(PLAYER_START_X, PLAYER_START_Y)
+
+        # Draws the Foreground layer after the player, meaning it 
+        # will appear in front of the Player. Setting this after will 
+        # also mean it appears in front of the other layers in the 
+        # TileMap, using Arcade Python Library using the player and
+        # foreground layer as the argument.
+        self.scene.add_sprite_list_after(
+            LAYER_NAME_PLAYER, LAYER_NAME_FOREGROUND, 
+            sprite_list = self.players)
+
+        # Sprite list to store the enemies of the level.
+        self.enemies = arcade.SpriteList(lazy = self.lazy)
+
+        # Stores the enemy layer from the TileMap.
+        enemies_layer = self.tile_map.object_lists[LAYER_NAME_ENEMIES]
+
+        # Set up the enemies in the game using a for loop.
+        for my_object in enemies_layer:
+
+            # Stores the cartesian coordinates for the enemy.
+            cartesian = self.tile_map.get_cartesian(
+                my_object.shape[0], my_object.shape[1]
+            )
+
+            # Stores the enemy type.
+            enemy_type = my_object.properties["type"]
+
+            # Checks the enemy type and assigns the appropriate enemy 
+            # type class which determines its health.
+            if enemy_type == "guardian":
+                enemy = GuardianEnemy()
+            
+            # Calculates and stores the enemy center x and y 
+            # coordinates.
+            enemy.center_x = math.floor(
+                cartesian[0] * TILE_SCALING * self.tile_map.tile_width
+            )
+            enemy.center_y = math.floor(
+                (cartesian[1] + 1) * (self.tile_map.tile_height * TILE_SCALING)
+            )
+
+            # Stores the different properties and movement of the enemy 
+            # including its boundary left, right, and change in x 
+            # coordinates.
+            if "boundary_left" in my_object.properties:
+                enemy.boundary_left = my_object.properties["boundary_left"]
+            if "boundary_right" in my_object.properties:
+                enemy.boundary_right = my_object.properties["boundary_right"]
+            if "change_x" in my_object.properties:
+                enemy.change_x = (my_object.properties["change_x"] 
+                                  * self.tick_scale)
+            
+            # Adding the enemy to the enemy sprite list using Arcade 
+            # Python Library.
+            self.enemies.append(enemy)
+
+        # Stores the state of the enemies in arrays so they can all be 
+        # moved together.
+        self.enemy_patrol = EnemyPatrol(self.enemies)
+
+        # Creating the physics engine. It allows basic movement, 
+        # provides a gravity force and also allows the player to jump 
+        # and climb ladders. Using the Arcade Python Library we pass
+        # in the player sprite and the layers it will be interacting 
+        # with such as moving platforms, platforms where the player
+        # can't move through and ladder which the player is able to 
+        # climb. The grid physics engine takes the same layers.
+        if self.use_grid_physics:
+            physics_engine_class = GridPhysicsEngine
+        else:
+            physics_engine_class = arcade.PhysicsEnginePlatformer
+        self.physics_engine = physics_engine_class(
+            self.player_sprite,
+            platforms=self.scene[LAYER_NAME_MOVING_PLATFORMS],
+            gravity_constant=GRAVITY * self.tick_scale ** 2,
+            ladders=self.scene[LAYER_NAME_LADDERS],
+            walls=self.scene[LAYER_NAME_PLATFORMS]
+        )
+
+        # Scales the speeds of the moving platforms set in the Tiled map 
+        # to the tick rate.
+        if self.tick_scale != 1:
+            for platform in self.scene[LAYER_NAME_MOVING_PLATFORMS]:
+                platform.change_x *= self.tick_scale
+                platform.change_y *= self.tick_scale
+
+        # Records the paths of the moving platforms, so where they are 
+        # on each tick is looked up instead of the grid physics engine 
+        # moving them, except for those whose path doesn't repeat.
+        self.platform_motion = PlatformMotion(
+            self.scene[LAYER_NAME_MOVING_PLATFORMS])
+        if self.use_grid_physics:
+            self.physics_engine.moving_platforms = self.platform_motion.stepped
+
+        # Builds the grid of platform tiles the bullets collide with.
+        self.tile_grid = BulletPool.build_tile_grid(
+            self.scene[LAYER_NAME_PLATFORMS], self.tile_map)
+
+        # Builds the index of the coins, checkpoints, doors and don't 
+        # touch tiles the player can touch.
+        self.trigger_index = TriggerIndex(self.scene)
+
+        # Saves the hit boxes of any images that were loaded for the 
+        # first time, so they don't need to be calculated again.
+        hit_box_cache = HitBoxCache.get()
+        if hit_box_cache is not None:
+            hit_box_cache.save()
+        return self
+
+    def start(self):
+        """
+        Method used to start loading the level on a background thread.
+        """
+
+        self.thread = threading.Thread(
+            target = self.run, name = f"Level {self.level} loader", 
+            daemon = True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        """
+        Method used by the background thread to load the level, storing 
+        the error if loading it failed.
+        """
+
+        try:
+            self.load()
+        except Exception as error:
+            self.error = error
+
+    def is_ready(self):
+        """
+        Method used to check whether the background thread has finished 
+        loading the level.
+        """
+
+        return self.thread is None or not self.thread.is_alive()
+
+    def prepare(self, time_budget = PRELOAD_TIME_BUDGET):
+        """
+        Method used on the main thread to create the OpenGL parts of a 
+        level loaded in the background a little at a time, stopping once 
+        the time budget is used up, so they don't all need to be created 
+        when the level is swapped in.
+        """
+
+        if not self.is_ready() or self.error is not None:
+            return
+        if self.steps is None:
+            self.steps = self.prepare_steps()
+        end_time = time.perf_counter() + time_budget
+        for step in self.steps:
+            if time.perf_counter() >= end_time:
+                break
+
+    def prepare_steps(self):
+        """
+        Method used to create the OpenGL parts of the level one step at a 
+        time, first adding each texture of the level to the texture atlas 
+        and then creating the buffers of each sprite list.
+        """
+
+        atlas = arcade.get_window().ctx.default_atlas
+        sprite_lists = list(self.tile_map.sprite_lists.values())
+        sprite_lists += [self.players, self.enemies]
+        for sprite_list in sprite_lists:
+            textures = {id(sprite.texture): sprite.texture 
+                        for sprite in sprite_list}
+            yield
+            for texture in textures.values():
+                if not atlas.has_texture(texture):
+                    atlas.add(texture)
+                    yield
+        for sprite_list in sprite_lists:
+            sprite_list.initialize()
+            yield
+        self.prepared = True
+
+    def is_prepared(self):
+        """
+        Method used to check whether the level has been loaded and its 
+        OpenGL parts have all been created.
+        """
+
+        return self.prepared
+
+    def result(self):
+        """
+        Method used to get the loaded level, waiting for the background 
+        thread if it has not finished yet.
+        """
+
+        if self.thread is not None:
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self
+
+
+class SnapshotBuffer:
+    """
+    Class used to store a snapshot of the world for every tick in a ring 
+    buffer with a fixed amount of memory, overwriting the oldest 
+    snapshots once it is full. Every few ticks a full snapshot is stored 
+    as a keyframe, and the snapshots in between only store what changed 
+    since the keyframe, compressed, so most snapshots are tiny.
+    """
+
+    # __init__() function to create the memory for the snapshots, and 
+    # the list of the snapshots stored in it, oldest first.
+    def __init__(self, size = SNAPSHOT_BUFFER_SIZE, 
+                 keyframe_interval = SNAPSHOT_KEYFRAME_INTERVAL):
+
+        self.buffer = bytearray(size)
+        self.keyframe_interval = keyframe_interval
+
+        # Each record stores the tick of a snapshot, where it starts in 
+        # the buffer, its length and the tick of its keyframe.
+        self.records = deque()
+        self.write_position = 0
+
+        # Stores the latest keyframe, which new snapshots are compared 
+        # against.
+        self.keyframe = None
+        self.keyframe_tick = None
+
+    def clear(self):
+        """
+        Method used to forget every snapshot.
+        """
+
+        self.records.clear()
+        self.write_position = 0
+        self.keyframe = None
+        self.keyframe_tick = None
+
+    def oldest_tick(self):
+        """
+        Method used to get the tick of the oldest snapshot, or None if 
+        there are no snapshots.
+        """
+
+        return self.records[0][0] if self.records else None
+
+    def newest_tick(self):
+        """
+        Method used to get the tick of the newest snapshot, or None if 
+        there are no snapshots.
+        """
+
+        return self.records[-1][0] if self.records else None
+
+    def record(self, tick, state):
+        """
+        Method used to store the snapshot of a tick, which is an array 
+        of numbers, after the snapshot of the previous tick.
+        """
+
+        # Forgets the snapshots of this tick and later ones if there 
+        # are any, such as when a level is loaded during a tick.
+        if self.records and self.records[-1][0] >= tick:
+            self.truncate(tick - 1)
+
+        # Stores a keyframe every few ticks, or when the snapshot has a 
+        # different size to the keyframe, and otherwise the bits that 
+        # changed since the keyframe, which are mostly zero.
+        if (self.keyframe is None or len(state) != len(self.keyframe) 
+                or tick - self.keyframe_tick >= self.keyframe_interval):
+            self.keyframe = state.copy()
+            self.keyframe_tick = tick
+            data = state.tobytes()
+        else:
+            data = numpy.bitwise_xor(
+                state.view(numpy.uint64), 
+                self.keyframe.view(numpy.uint64)).tobytes()
+        data = zlib.compress(data, 1)
+        if len(data) > len(self.buffer):
+            raise ValueError("Snapshot is larger than the snapshot buffer")
+
+        # Writes the snapshot after the previous one, going back to the 
+        # start of the buffer when it doesn't fit before the end, in 
+        # which case the snapshots left between here and the end are the 
+        # oldest ones and are forgotten.
+        records = self.records
+        start = self.write_position
+        if start + len(data) > len(self.buffer):
+            while records and records[0][1] >= start:
+                records.popleft()
+            start = 0
+        end = start + len(data)
+
+        # Forgets the oldest snapshots that are overwritten, and any 
+        # snapshots whose keyframe was overwritten.
+        while records and (records[0][1] < end 
+                           and start < records[0][1] + records[0][2]):
+            records.popleft()
+        while records and records[0][0] != records[0][3]:
+            records.popleft()
+
+        self.buffer[start:end] = data
+        self.write_position = end
+        records.append((tick, start, len(data), self.keyframe_tick))
+
+    def decode(self, record):
+        """
+        Method used to decompress the data stored for a snapshot.
+        """
+
+        tick, start, length, keyframe_tick = record
+        return zlib.decompress(self.buffer[start:start + length])
+
+    def restore(self, tick):
+        """
+        Method used to get the snapshot of a tick as an array of 
+        numbers, or None if it is no longer stored.
+        """
+
+        if not self.records or not (
+                self.oldest_tick() <= tick <= self.newest_tick()):
+            return None
+        record = self.records[tick - self.oldest_tick()]
+        keyframe_record = self.records[record[3] - self.oldest_tick()]
+        keyframe = numpy.frombuffer(self.decode(keyframe_record))
+        if record is keyframe_record:
+            return keyframe.copy()
+        changes = numpy.frombuffer(self.decode(record), dtype = numpy.uint64)
+        return numpy.bitwise_xor(
+            keyframe.view(numpy.uint64), changes).view(numpy.float64)
+
+    def truncate(self, tick):
+        """
+        Method used to forget every snapshot after a tick, so the 
+        snapshots can be recorded again from that tick after rewinding.
+        """
+
+        while self.records and self.records[-1][0] > tick:
+            self.records.pop()
+        if self.records:
+            self.write_position = self.records[-1][1] + self.records[-1][2]
+        else:
+            self.write_position = 0
+        self.keyframe = None
+        self.keyframe_tick = None
+
+
+class InputRecording:
+    """
+    Class used to store the keys held during every tick of a game from 
+    the start of a level, so it can be played back and end up exactly 
+    the same way. The keys of each tick are stored as one bit mask, and 
+    saved to a file as runs of ticks with the same keys held, along with 
+    a checksum of the state of the world at the end of the recording.
+    """
+
+    # __init__() function to create an empty recording of a level, 
+    # starting at the given tick of the game simulation.
+    def __init__(self, level = 1, use_grid_physics = USE_GRID_PHYSICS, 
+                 start_tick = 0, tick_rate = TICK_RATE):
+
+        self.level = level
+        self.use_grid_physics = use_grid_physics
+        self.start_tick = start_tick
+        self.tick_rate = tick_rate
+        self.inputs = bytearray()
+        self.checksum = None
+
+    def record(self, keys):
+        """
+        Method used to store the keys held during the next tick.
+        """
+
+        self.inputs.append(keys)
+
+    def truncate(self, tick):
+        """
+        Method used to forget the keys of the ticks after a tick, such 
+        as when the game is rewound to it.
+        """
+
+        del self.inputs[max(tick - self.start_tick, 0):]
+
+    def keys_at(self, tick):
+        """
+        Method used to get the keys held during the tick after a tick, 
+        or None once the recording has run out.
+        """
+
+        index = tick - self.start_tick
+        if 0 <= index < len(self.inputs):
+            return self.inputs[index]
+        return None
+
+    def create_simulation(self):
+        """
+        Method used to create and set up a game simulation in the same 
+        way as the one that was recorded, ready to be played back.
+        """
+
+        simulation = GameSimulation(
+            self.level, use_grid_physics = self.use_grid_physics, 
+            tick_rate = self.tick_rate)
+        simulation.setup()
+        simulation.tick = self.start_tick
+        return simulation
+
+    def matches(self, simulation):
+        """
+        Method used to check whether a game simulation that played back 
+        the recording ended in the same state as the recorded one.
+        """
+
+        return simulation.state_checksum() == self.checksum
+
+    def save(self, file_name, simulation):
+        """
+        Method used to save the recording to a file, along with the 
+        checksum of the game simulation it was recorded from.
+        """
+
+        self.checksum = simulation.state_checksum()
+
+        # Turns the keys into runs of ticks with the same keys held.
+        runs = bytearray()
+        run_count = 0
+        position = 0
+        while position < len(self.inputs):
+            keys = self.inputs[position]
+            end = position + 1
+            while (end < len(self.inputs) and self.inputs[end] == keys 
+                   and end - position < 0xFFFF):
+                end += 1
+            runs += RECORDING_RUN.pack(keys, end - position)
+            run_count += 1
+            position = end
+
+        with open(file_name, "wb") as recording_file:
+            recording_file.write(RECORDING_HEADER.pack(
+                RECORDING_MAGIC, RECORDING_VERSION, self.level, 
+                int(self.use_grid_physics), self.tick_rate, self.start_tick, 
+                run_count, self.checksum))
+            recording_file.write(runs)
+
+    @classmethod
+    def load(cls, file_name):
+        """
+        Method used to load a recording saved to a file.
+        """
+
+        with open(file_name, "rb") as recording_file:
+            data = recording_file.read()
+        (magic, version, level, use_grid_physics, tick_rate, start_tick, 
+         run_count, checksum) = RECORDING_HEADER.unpack_from(data)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{file_name} is not an input recording made "
+                             "by this version of the game")
+
+        recording = cls(level, bool(use_grid_physics), start_tick, 
+                        tick_rate)
+        recording.checksum = checksum
+        for keys, length in RECORDING_RUN.iter_unpack(
+                data[RECORDING_HEADER.size:][:run_count * RECORDING_RUN.size]):
+            recording.inputs += bytes((keys,)) * length
+        return recording
+
+
+class FrameProfiler:
+    """
+    Class used to time each part of every frame, such as the physics, 
+    the collisions and drawing, keeping the timings of the latest frames 
+    in a ring buffer so spikes such as level changes can be found, and 
+    summarising them as percentiles for each part. Each part is timed by 
+    calling lap() once it is done, which adds the time since the 
+    previous lap to that part.
+    """
+
+    # __init__() function to create the profiler, which only creates 
+    # the memory for the timings once the first frame has ended.
+    def __init__(self, enabled = PROFILE_FRAMES, 
+                 frame_count = PROFILER_FRAME_COUNT):
+
+        self.enabled = enabled
+        self.frame_count = frame_count
+
+        # Stores the column of each part of the frame in the order they 
+        # were first timed, the seconds spent on each part so far during 
+        # the current frame, and the parts timed on other threads, which 
+        # aren't counted in the time of the whole frame.
+        self.phases = {}
+        self.times = [0.0] * PROFILER_PHASE_LIMIT
+        self.last_time = time.perf_counter()
+        self.other_thread_phases = set()
+
+        # Stores the timings and the tick of the latest frames, and how 
+        # many frames have ended.
+        self.samples = None
+        self.ticks = None
+        self.frames = 0
+
+    def reset(self):
+        """
+        Method used to forget every timing and start timing a new frame 
+        from now.
+        """
+
+        self.times = [0.0] * PROFILER_PHASE_LIMIT
+        self.last_time = time.perf_counter()
+        self.frames = 0
+
+    def lap(self, phase):
+        """
+        Method used to add the time since the previous lap to a part of 
+        the frame.
+        """
+
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.times[self.phase_index(phase)] += now - self.last_time
+        self.last_time = now
+
+    def add(self, phase, seconds):
+        """
+        Method used to add time spent on another thread to a part of the 
+        frame, such as advancing the game simulation on a worker thread. 
+        That time overlaps the parts timed by lap(), so it isn't counted 
+        in the time of the whole frame.
+        """
+
+        if not self.enabled:
+            return
+        self.times[self.phase_index(phase)] += seconds
+        self.other_thread_phases.add(phase)
+
+    def phase_index(self, phase):
+        """
+        Method used to get the column of a part of the frame, giving it 
+        the next column the first time it is timed.
+        """
+
+        index = self.phases.get(phase)
+        if index is None:
+            if len(self.phases) == PROFILER_PHASE_LIMIT:
+                raise ValueError("The frame profiler can't time more than "
+                                 f"{PROFILER_PHASE_LIMIT} parts of a frame")
+            index = self.phases[phase] = len(self.phases)
+        return index
+
+    def end_frame(self, tick = 0):
+        """
+        Method used to store the timings of the current frame and start 
+        a new one, adding the time since the last lap as idle time, 
+        which is the time spent outside of the game such as waiting for 
+        the screen.
+        """
+
+        if not self.enabled:
+            return
+        self.lap("idle")
+        if self.samples is None:
+            self.samples = numpy.zeros(
+                (self.frame_count, PROFILER_PHASE_LIMIT))
+            self.ticks = numpy.zeros(self.frame_count, dtype = numpy.int64)
+        row = self.frames % self.frame_count
+        self.samples[row] = self.times
+        self.ticks[row] = tick
+        self.frames += 1
+        self.times = [0.0] * PROFILER_PHASE_LIMIT
+
+    def recent(self, frame_count = None):
+        """
+        Method used to get the timings of the latest frames in 
+        milliseconds, oldest first, with a column for each part of the 
+        frame, along with the tick of each frame.
+        """
+
+        stored = min(self.frames, self.frame_count)
+        if frame_count is not None:
+            stored = min(stored, frame_count)
+        if stored == 0:
+            return numpy.zeros((0, len(self.phases))), numpy.zeros(0)
+        rows = numpy.arange(self.frames - stored, self.frames) % (
+            self.frame_count)
+        return (self.samples[rows, :len(self.phases)] * 1000, 
+                self.ticks[rows])
+
+    def summary(self, frame_count = None):
+        """
+        Method used to get the mean, the 50th, 95th and 99th percentile 
+        and the worst time in milliseconds of each part of the latest 
+        frames and of the whole frame, along with the tick of the worst 
+        time.
+        """
+
+        samples, ticks = self.recent(frame_count)
+        if len(samples) == 0:
+            return {}
+        frame_columns = [column for phase, column in self.phases.items() 
+                         if phase not in self.other_thread_phases]
+        samples = numpy.column_stack(
+            (samples, samples[:, frame_columns].sum(axis = 1)))
+        p50, p95, p99 = numpy.percentile(samples, (50, 95, 99), axis = 0)
+        worst = samples.argmax(axis = 0)
+        summary = {}
+        for column, phase in enumerate(list(self.phases) + ["frame"]):
+            summary[phase] = {
+                "mean": float(samples[:, column].mean()),
+                "p50": float(p50[column]),
+                "p95": float(p95[column]),
+                "p99": float(p99[column]),
+                "max": float(samples[worst[column], column]),
+                "max_tick": int(ticks[worst[column]]),
+            }
+        return summary
+
+    def save(self, file_name):
+        """
+        Method used to save the summary of every stored frame to a CSV 
+        file with a row for each part of the frame, or to a JSON file 
+        along with the timings of every stored frame.
+        """
+
+        summary = self.summary()
+        if file_name.endswith(".json"):
+            samples, ticks = self.recent()
+            with open(file_name, "w") as profile_file:
+                json.dump({
+                    "frames": min(self.frames, self.frame_count),
+                    "phases": list(self.phases),
+                    "summary": summary,
+                    "ticks": ticks.tolist(),
+                    "samples": numpy.round(samples, 4).tolist(),
+                }, profile_file)
+            return
+
+        fields = ("mean", "p50", "p95", "p99", "max", "max_tick")
+        with open(file_name, "w", newline = "") as profile_file:
+            writer = csv.writer(profile_file)
+            writer.writerow(("phase",) + fields)
+            for phase, times in summary.items():
+                writer.writerow([phase] + [
+                    round(times[field], 4) for field in fields])
+
+
+class GameSimulation:
+    """
+    Class used to store the game logic of the main game, separate from 
+    drawing, cameras and audio. Methods include setting up a level, 
+    processing the key states and advancing the game by one tick, which 
+    means the game can be run without showing it, such as by bots, soak 
+    tests and performance tests.
+    """
+
+    # Simulation initializer which handles the state that should only be 
+    # set when the simulation is first created.
+    def __init__(self, level = 1, use_level_cache = True, 
+                 use_grid_physics = USE_GRID_PHYSICS, tick_rate = TICK_RATE):
+
+        # Stores how many ticks a second the simulation is advanced by, 
+        # and the speeds and timers of the player and the bullets scaled 
+        # to it. The animations are stepped at the base tick rate, so the 
+        # ticks since the last step are counted in base ticks.
+        self.tick_rate = tick_rate
+        self.tick_scale = BASE_TICK_RATE / tick_rate
+        self.movement_speed = PLAYER_MOVEMENT_SPEED * self.tick_scale
+        self.jump_speed = PLAYER_JUMP_SPEED * self.tick_scale
+        self.bullet_speed = BULLET_SPEED * self.tick_scale
+        self.shoot_ticks = max(round(SHOOT_SPEED / self.tick_scale), 1)
+        self.animation_time = 0
+
+        # Used to track if a key is pressed and its current state.
+        self.left_pressed = False
+        self.right_pressed = False
+        self.up_pressed = False
+        self.down_pressed = False
+        self.shoot_pressed = False
+        self.jump_needs_reset = False
+
+        # Stores our TileMap object, and the chunk streamer of a level 
+        # that is streamed in chunks.
+        self.tile_map = None
+        self.streamer = None
+
+        # Stores our Scene Object.
+        self.scene = None
+
+        # Stores our player sprite.
+        self.player_sprite = None
+
+        # Stores the physics engine, used to manage movement and 
+        # collisions, and whether it is the grid physics engine.
+        self.physics_engine = None
+        self.use_grid_physics = use_grid_physics
+
+        # Stores the paths of the moving platforms, used to look up where 
+        # they are on each tick.
+        self.platform_motion = None
+
+        # Stores the index of the trigger tiles, used to find the coins, 
+        # checkpoints, doors and don't touch tiles the player touches.
+        self.trigger_index = None
+
+        # Stores our score and keeps track of it.
+        self.score = 0
+
+        # Stores our deaths and keeps track of it.
+        self.death = 0
+
+        # Stores our level and keeps track of it, and whether levels are 
+        # loaded from the compiled level cache.
+        self.level = level
+        self.use_level_cache = use_level_cache
+
+        # Stores whether the next level is loaded in the background while 
+        # a level is played, and the loader doing it.
+        self.preload_next_level = PRELOAD_NEXT_LEVEL
+        self.level_loader = None
+
+        # Stores our checkpoints and keeps track of it.
+        self.checkpoint = None
+        self.check_level = level
+
+        # Stores our shooting mechanics, and the pool of bullets that 
+        # are reused every time the player shoots.
+        self.can_shoot = False
+        self.shoot_timer = 0
+        self.bullet_pool = BulletPool()
+        self.bullet_pool.lifetime = round(BULLET_LIFETIME / self.tick_scale)
+
+        # Stores how many ticks the simulation has been advanced by and 
+        # whether the player has finished the last level.
+        self.tick = 0
+        self.game_complete = False
+
+        # Stores the events that happened during the current tick, such 
+        # as jumping or collecting a coin, so that whoever runs the 
+        # simulation can react to them, for example by playing a sound.
+        self.events = []
+
+        # Stores the snapshots of the world recorded every tick so the 
+        # level can be rewound, whether they are recorded, and the 
+        # snapshot of the start of the level so it can be restarted. 
+        # The coins and checkpoints the level started with are stored 
+        # so the snapshots can record which ones are left.
+        self.record_snapshots = RECORD_SNAPSHOTS
+        self.snapshots = SnapshotBuffer()
+        self.start_state = None
+        self.start_checkpoint = None
+        self.level_coins = []
+        self.level_checkpoints = []
+        self.checkpoint_indices = {}
+
+        # Stores the frame profiler, which times each part of a tick, 
+        # and the profiler the parts of each tick are timed with, which 
+        # is a different one while the ticks are advanced on a worker 
+        # thread so the two threads don't time their parts together.
+        self.profiler = FrameProfiler()
+        self.tick_profiler = self.profiler
+
+        # Stores the function used to set up the next level on the main 
+        # thread when the simulation is advanced on a worker thread, as 
+        # setting up a level creates OpenGL objects, or None when it is 
+        # advanced on the main thread.
+        self.call_on_main_thread = None
+
+    def setup(self):
+        """
+        Sets up the current level to begin playing, swapping in the 
+        level that was loaded in the background if there is one, and 
+        otherwise loading the TileMap, the scene, the player, the 
+        enemies and the physics engine straight away.
+        """
+
+        # Takes the level loaded in the background if it is the current 
+        # level, waiting for it if it has not finished, and otherwise 
+        # loads the level now.
+        level_loader = self.level_loader
+        self.level_loader = None
+        preloaded = (level_loader is not None 
+                     and level_loader.thread is not None 
+                     and level_loader.level == self.level)
+        if preloaded:
+            level_loader.result()
+        else:
+            self.collect_frozen_objects()
+            level_loader = LevelLoader(
+                self.level, self.use_level_cache, self.use_grid_physics, 
+                tick_rate = self.tick_rate).load()
+
+        # Swaps in the loaded level.
+        previous_scene = self.scene
+        self.tile_map = level_loader.tile_map
+        self.streamer = level_loader.streamer
+        self.scene = level_loader.scene
+        self.player_sprite = level_loader.player_sprite
+        self.enemy_patrol = level_loader.enemy_patrol
+        self.platform_motion = level_loader.platform_motion
+        self.trigger_index = level_loader.trigger_index
+        self.physics_engine = level_loader.physics_engine
+
+        # Starts the paths of the enemies and the moving platforms from 
+        # the current tick.
+        self.enemy_patrol.motion.start_tick = self.tick
+        self.platform_motion.start_tick = self.tick
+
+        # Stores and keeps track of the score.
+        self.score = 0
+
+        # Tracks shooting mechanics.
+        self.can_shoot = True
+        self.shoot_timer = 0
+
+        # Adding the enemies to the game scene using Arcade Python
+        # Library.
+        self.scene.add_sprite_list(LAYER_NAME_ENEMIES, 
+                                   sprite_list = level_loader.enemies)
+
+        # Add bullet spritelist to game Scene using Arcade Python 
+        # Library, and move the bullet pool into it.
+        self.scene.add_sprite_list(LAYER_NAME_BULLETS)
+        self.bullet_pool.attach(self.scene[LAYER_NAME_BULLETS], 
+                                self.scene[LAYER_NAME_PLATFORMS], 
+                                self.tile_map, level_loader.tile_grid)
+
+        # Removes the links from the sprites of the previous level back 
+        # to its sprite lists, so the previous level is freed as soon as 
+        # it is no longer used without waiting for the garbage collector. 
+        # The bullets have already been moved out of it.
+        if previous_scene is not None:
+            for sprite_list in previous_scene.sprite_lists:
+                for sprite in sprite_list:
+                    sprite.sprite_lists.remove(sprite_list)
+
+        # Creates the OpenGL parts of the sprite lists of a level that 
+        # was loaded in the background, which can only be done on the 
+        # main thread.
+        for sprite_list in self.scene.sprite_lists:
+            sprite_list.initialize()
+
+        # Freezes the objects of a level that was loaded in the 
+        # background if turned on, once the previous level has been 
+        # unlinked so that it isn't frozen along with it.
+        if preloaded and FREEZE_LOADED_LEVELS:
+            gc.freeze()
+
+        # Stores the coins and checkpoints of the level, and the 
+        # snapshot of the start of the level, forgetting the snapshots 
+        # of the previous level.
+        self.level_coins = list(self.scene[LAYER_NAME_COINS])
+        self.level_checkpoints = list(self.scene[LAYER_NAME_CHECKPOINTS])
+        self.checkpoint_indices = {
+            checkpoint: i 
+            for i, checkpoint in enumerate(self.level_checkpoints)}
+        self.start_checkpoint = self.checkpoint
+        self.start_state = self.capture_state()
+        self.snapshots.clear()
+        if self.record_snapshots:
+            self.snapshots.record(self.tick, self.start_state)
+
+        # Creates the loader of the next level, which starts loading it 
+        # in the background at the end of the next tick while this level 
+        # is played.
+        if self.preload_next_level and self.use_level_cache and self.level < 3:
+            self.level_loader = LevelLoader(
+                self.level + 1, self.use_level_cache, self.use_grid_physics, 
+                lazy = True, tick_rate = self.tick_rate)
+
+    def preload_level(self):
+        """
+        Method used to start loading the current level in the background 
+        before the game is set up, so setting it up only has to swap the 
+        loaded level in. Returns the level loader, or None if the level 
+        can't be loaded in the background as it isn't read from the 
+        level cache.
+        """
+
+        if not self.use_level_cache:
+            return None
+        self.collect_frozen_objects()
+        self.level_loader = LevelLoader(
+            self.level, self.use_level_cache, self.use_grid_physics, 
+            lazy = True, tick_rate = self.tick_rate).start()
+        return self.level_loader
+
+    def collect_frozen_objects(self):
+        """
+        Method used to let the garbage collector check the objects that 
+        were frozen after swapping in levels loaded in the background 
+        again, and free the ones that are no longer used, such as the 
+        last level of a previous game. This is only done when a level is 
+        loaded straight away or behind the loading screen, as the game 
+        is already paused for it.
+        """
+
+        if gc.get_freeze_count():
+            gc.unfreeze()
+            gc.collect()
+
+    @property
+    def checkpoint_index(self):
+        """
+        Property used to get the place of the checkpoint the player 
+        respawns at in the level's checkpoints, or -1 for where the 
+        player started the level, or to set the checkpoint from it.
+        """
+
+        return self.checkpoint_indices.get(self.checkpoint, -1)
+
+    @checkpoint_index.setter
+    def checkpoint_index(self, index):
+        if index >= 0:
+            self.checkpoint = self.level_checkpoints[index]
+        else:
+            self.checkpoint = self.start_checkpoint
+
+    @property
+    def jumps_since_ground(self):
+        """
+        Property used to get how many times the player has jumped since 
+        they were last on the ground, for physics engines that allow 
+        more than one jump, or to set it.
+        """
+
+        return getattr(self.physics_engine, "jumps_since_ground", 0)
+
+    @jumps_since_ground.setter
+    def jumps_since_ground(self, jumps):
+        if hasattr(self.physics_engine, "jumps_since_ground"):
+            self.physics_engine.jumps_since_ground = jumps
+
+    def capture_state(self):
+        """
+        Method used to store the state of the world that changes while a 
+        level is played as one array of numbers. This is the player, the 
+        enemies, the moving platforms, the coins and checkpoints that are 
+        left, the bullets, the score and the deaths.
+        """
+
+        player = self.player_sprite
+        patrol = self.enemy_patrol
+        pool = self.bullet_pool
+
+        # Stores the numbers that aren't already in arrays, starting 
+        # with the simulation and the player, where the checkpoint is 
+        # stored by its place in the level's checkpoints and the 
+        # textures by their place in the character's textures.
+        values = [getattr(self, name) 
+                  for name, _ in SIMULATION_STATE_ATTRIBUTES]
+        values += [getattr(player, name) 
+                   for name, _ in PLAYER_STATE_ATTRIBUTES]
+        for enemy in patrol.sprites:
+            values += (enemy.facing_direction, enemy.cur_texture, 
+                       enemy.should_update_walk, enemy.texture_index)
+        for platform in self.scene[LAYER_NAME_MOVING_PLATFORMS]:
+            values += (platform.center_x, platform.center_y, 
+                       platform.change_x, platform.change_y)
+        values += [bool(coin.sprite_lists) for coin in self.level_coins]
+        values += [bool(checkpoint.sprite_lists) 
+                   for checkpoint in self.level_checkpoints]
+
+        # Adds the arrays of the enemy patrol and the bullet pool.
+        return numpy.concatenate((
+            numpy.array(values, dtype = float), 
+            patrol.x, patrol.change_x, patrol.health, patrol.alive, 
+            pool.x, pool.y, pool.change_x, pool.age, pool.alive))
+
+    def restore_state(self, state):
+        """
+        Method used to put the world back to a state stored by 
+        capture_state on the current level, without loading anything.
+        """
+
+        player = self.player_sprite
+        patrol = self.enemy_patrol
+        pool = self.bullet_pool
+        platforms = self.scene[LAYER_NAME_MOVING_PLATFORMS]
+        enemy_count = len(patrol.sprites)
+        bullet_count = pool.size
+
+        # Checks the state was captured on the current level.
+        value_count = (len(SIMULATION_STATE_ATTRIBUTES) 
+                       + len(PLAYER_STATE_ATTRIBUTES) 
+                       + enemy_count * 4 + len(platforms) * 4 
+                       + len(self.level_coins) + len(self.level_checkpoints))
+        if len(state) != value_count + enemy_count * 4 + bullet_count * 5:
+            raise ValueError("The state was not captured on this level")
+        values = iter(state[:value_count].tolist())
+        arrays = state[value_count:]
+
+        # Restores the simulation and the player.
+        for name, value_type in SIMULATION_STATE_ATTRIBUTES:
+            setattr(self, name, value_type(next(values)))
+        for name, value_type in PLAYER_STATE_ATTRIBUTES:
+            setattr(player, name, value_type(next(values)))
+
+        # Restores the animation of the enemies and the moving 
+        # platforms.
+        for enemy in patrol.sprites:
+            enemy.facing_direction = int(next(values))
+            enemy.cur_texture = int(next(values))
+            enemy.should_update_walk = int(next(values))
+            enemy.texture_index = int(next(values))
+        for platform in platforms:
+            platform.position = (next(values), next(values))
+            platform.change_x = next(values)
+            platform.change_y = next(values)
+
+        # Puts back the coins and checkpoints that were left, keeping 
+        # the order they were in when the level was loaded.
+        for layer_name, level_sprites in (
+                (LAYER_NAME_COINS, self.level_coins), 
+                (LAYER_NAME_CHECKPOINTS, self.level_checkpoints)):
+            left = [sprite for sprite in level_sprites if next(values)]
+            self.restore_layer(layer_name, left)
+
+        # Restores the enemy patrol, moving the enemy sprites to match 
+        # and putting back the enemies that were alive.
+        (patrol.x[:], patrol.change_x[:], patrol.health[:], 
+         patrol.alive[:]) = arrays[:enemy_count * 4].reshape(4, enemy_count)
+        for enemy, x, change_x, health in zip(
+                patrol.sprites, patrol.x.tolist(), 
+                patrol.change_x.tolist(), patrol.health.tolist()):
+            enemy.center_x = x
+            enemy.change_x = change_x
+            enemy.health = health
+        self.restore_layer(LAYER_NAME_ENEMIES, [
+            enemy for enemy, alive in zip(patrol.sprites, patrol.alive) 
+            if alive])
+
+        # Restores the bullet pool, keeping the bullets that are alive 
+        # in the bullet layer at their positions and removing the rest.
+        bullets = arrays[enemy_count * 4:].reshape(5, bullet_count)
+        was_alive = pool.alive.copy()
+        (pool.x[:], pool.y[:], pool.change_x[:], pool.age[:], 
+         pool.alive[:]) = bullets
+        for index in numpy.flatnonzero(was_alive != pool.alive).tolist():
+            if pool.alive[index]:
+                pool.sprite_list.append(pool.sprites[index])
+            else:
+                pool.sprite_list.remove(pool.sprites[index])
+        for index in numpy.flatnonzero(pool.alive).tolist():
+            pool.sprites[index].position = (float(pool.x[index]), 
+                                            float(pool.y[index]))
+
+        # Looks up the triggers the player touches where they were put 
+        # back, so the ones touched before going back aren't counted as 
+        # started or stopped being touched.
+        self.trigger_index.reset(player)
+
+    def restore_layer(self, layer_name, sprites):
+        """
+        Method used to make a layer of the scene hold the given sprites, 
+        in order, only changing it if it holds different sprites.
+        """
+
+        sprite_list = self.scene[layer_name]
+        if list(sprite_list) != sprites:
+            sprite_list.clear()
+            sprite_list.extend(sprites)
+
+    def rewind(self, ticks = REWIND_SPEED):
+        """
+        Method used to go back in time by a number of ticks, or to the 
+        oldest snapshot that is still stored, returning whether it went 
+        back at all.
+        """
+
+        oldest_tick = self.snapshots.oldest_tick()
+        if oldest_tick is None or self.tick <= oldest_tick:
+            return False
+        tick = max(self.tick - ticks, oldest_tick)
+        self.restore_state(self.snapshots.restore(tick))
+        self.snapshots.truncate(tick)
+        return True
+
+    def restart_level(self):
+        """
+        Method used to put the level back to how it was when it was 
+        loaded, without loading it again.
+        """
+
+        self.restore_state(self.start_state)
+        self.snapshots.clear()
+        if self.record_snapshots:
+            self.snapshots.record(self.tick, self.start_state)
+
+    def state_checksum(self):
+        """
+        Method used to get a checksum of the state of the world and the 
+        level, which is the same whenever the game is played the same 
+        way, so a played back recording can be checked against it.
+        """
+
+        state = numpy.append(self.capture_state(), self.level)
+        return zlib.crc32(state.tobytes())
+
+    def add_event(self, name, sprite):
+        """
+        Method used to store an event that happened during the current 
+        tick, along with where it happened.
+        """
+
+        self.events.append((name, sprite.center_x, sprite.center_y))
+
+    def get_input(self):
+        """
+        Method used to get the keys that are held as a bit mask of the 
+        input constants.
+        """
+
+        return ((INPUT_UP if self.up_pressed else 0) 
+                | (INPUT_DOWN if self.down_pressed else 0) 
+                | (INPUT_LEFT if self.left_pressed else 0) 
+                | (INPUT_RIGHT if self.right_pressed else 0) 
+                | (INPUT_SHOOT if self.shoot_pressed else 0))
+
+    def set_input(self, keys):
+        """
+        Method used to set the keys held for the next tick from a bit 
+        mask of the input constants and process them straight away, 
+        returning the events that happened, such as jumping. The player 
+        can only jump again once the up key has been released.
+        """
+
+        self.up_pressed = bool(keys & INPUT_UP)
+        self.down_pressed = bool(keys & INPUT_DOWN)
+        self.left_pressed = bool(keys & INPUT_LEFT)
+        self.right_pressed = bool(keys & INPUT_RIGHT)
+        self.shoot_pressed = bool(keys & INPUT_SHOOT)
+        if not self.up_pressed:
+            self.jump_needs_reset = False
+
+        self.events = []
+        self.process_keychange()
+        return self.events
+
+    def process_keychange(self):
+        """
+        Processes the key changes when the user presses different keys.
+        """
+
+        # Processes when the user presses the up key.
+        if self.up_pressed and not self.down_pressed:
+
+            # If the player is on a ladder while pressing up it changes 
+            # the y coordinate of the player making them move up the 
+            # ladder according to the movement speed using Arcade Python 
+            # Library.
+            if self.physics_engine.is_on_ladder():
+                self.player_sprite.change_y = self.movement_speed
+
+            # If the player is not on a ladder and there is a platform 
+            # beneath the player, if they press up it changes the y 
+            # coordinate of the player making them jump, according to 
+            # the jump speed and resets the jump while also storing the 
+            # jump event.
+            elif (
+                self.physics_engine.can_jump(y_distance=10)
+                and not self.jump_needs_reset
+            ):
+                self.player_sprite.change_y = self.jump_speed
+                self.jump_needs_reset = True
+                self.add_event(EVENT_JUMP, self.player_sprite)
+
+        # Processes when the user presses the down key.
+        elif self.down_pressed and not self.up_pressed:
+
+            # If the player is on a ladder while pressing down it 
+            # changes the y coordinate of the player making them move 
+            # down the ladder according to the movement speed using 
+            # Arcade Python Library.
+            if self.physics_engine.is_on_ladder():
+                self.player_sprite.change_y = -self.movement_speed
+
+        # Process when the user does not press the up or down keys when 
+        # on a ladder there will be no movement using Arcade Python 
+        # Library.
+        if self.physics_engine.is_on_ladder():
+            if not self.up_pressed and not self.down_pressed:
+                self.player_sprite.change_y = 0
+            elif self.up_pressed and self.down_pressed:
+                self.player_sprite.change_y = 0
+
+        # Process when the user presses right key.
+        if self.right_pressed and not self.left_pressed:
             # If they press right it changes the player x coordinate to 
             # the right according to the player movement speed.
-            self.player_sprite.change_x = PLAYER_MOVEMENT_SPEED
+            self.player_sprite.change_x = self.movement_speed
+
+        # Process when the user presses left key.
+        elif self.left_pressed and not self.right_pressed:
+            # If they press left it changes the player x coordinate to 
+            # the left according to the player movement speed.
+            self.player_sprite.change_x = -self.movement_speed
+
+        else:
+            # If the player doesn't press right or left the player 
+            # remains stationary along the x axis.
+            self.player_sprite.change_x = 0
+
+    def respawn_player(self):
+        """
+        Method used to reset the player to the last checkpoint after 
+        they die, increasing the death counter by 1.
+        """
+
+        self.player_sprite.change_x = 0
+        self.player_sprite.change_y = 0
+        self.player_sprite.center_x = self.checkpoint.center_x
+        self.player_sprite.center_y = self.checkpoint.center_y
+        self.death += 1
+        self.add_event(EVENT_DEATH, self.player_sprite)
+
+    def stream_chunks(self):
+        """
+        Method used to load the chunks of a streamed level near the 
+        player, and the chunks the bullets that are alive can hit a tile 
+        in, updating the walls of the grid physics engine and the tile 
+        grid of the bullets with the chunks that were loaded and 
+        removed.
+        """
+
+        player = self.player_sprite
+        streamer = self.streamer
+        pool = self.bullet_pool
+        bullet_chunks = streamer.chunks_under(
+            pool.x[pool.alive], pool.y[pool.alive], 
+            self.bullet_speed + GRID_PIXEL_SIZE)
+        if not streamer.update(player.center_x, player.center_y, 
+                               bullet_chunks):
+            return
+
+        # The Arcade Python Library physics engine uses the sprite list 
+        # of the platforms, which the streamer has already updated.
+        engine = self.physics_engine
+        for chunk, sprites in streamer.evicted:
+            platforms = sprites.get(LAYER_NAME_PLATFORMS, ())
+            if self.use_grid_physics:
+                engine.remove_sprites(engine.wall_cells, platforms)
+            pool.remove_tiles(platforms)
+        for chunk, sprites in streamer.loaded:
+            platforms = sprites.get(LAYER_NAME_PLATFORMS, ())
+            if self.use_grid_physics:
+                engine.add_sprites(engine.wall_cells, platforms)
+            pool.add_tiles(platforms)
+
+    def update(self):
+        """
+        Advances the game by one tick, updating the position and state 
+        of game objects, such as movement, game logic, collisions, and 
+        animations. Returns the list of events that happened during the 
+        tick.
+        """
+
+        # Clears the events from the previous tick, and stops updating 
+        # once the player has finished the last level.
+        self.events = []
+        if self.game_complete:
+            return self.events
+        self.tick += 1
+
+        # The frame profiler is given a lap after each part of the tick, 
+        # timing how long it took, starting with the time spent outside 
+        # of the game simulation before the tick.
+        profiler = self.tick_profiler
+        profiler.lap("other")
+
+        # Loads the chunks of a streamed level that the player has come 
+        # close to.
+        if self.streamer is not None:
+            self.stream_chunks()
+            profiler.lap("streaming")
+
+        # Updates player movement based on the physics engine and 
+        # detects collision using Arcade Python Library, and moves the 
+        # moving platforms to where the physics engine leaves them on 
+        # this tick.
+        self.physics_engine.update()
+        self.platform_motion.move(self.tick, middle = True)
+        profiler.lap("physics")
+
+        # Updates the player animation, if there is a platform under the 
+        # player the player should jump or not so the player would not 
+        # be able to jump infinitely using Arcade Python Library. 
+        if self.physics_engine.can_jump():
+            self.player_sprite.can_jump = False
+        else:
+            self.player_sprite.can_jump = True
+
+        # Updates the player animation, if the player is on a ladder and
+        # there is no platform on the player the variable tracking 
+        # whether the player is on the ladder or not to True and 
+        # processes the key change and vice versa using Arcade Python 
+        # Library. 
+        if (self.physics_engine.is_on_ladder() 
+        and not self.physics_engine.can_jump()):
+            self.player_sprite.is_on_ladder = True
+            self.process_keychange()
+        else:
+            self.player_sprite.is_on_ladder = False
+            self.process_keychange()
+
+        # Updates shooting animation and mechanics.
+        if self.can_shoot:
+
+            # If the shoot key is pressed, store the shooting event and 
+            # fire a bullet from the bullet pool.
+            if self.shoot_pressed:
+                self.add_event(EVENT_SHOOT, self.player_sprite)
+
+                # If the player is facing right, the bullet will travel 
+                # to the right based on bullet speed.
+                if self.player_sprite.facing_direction == RIGHT_FACING:
+                    change_x = self.bullet_speed
+
+                # If the player is facing left, the bullet will travel 
+                # to the left based on bullet speed.
+                else:
+                    change_x = -self.bullet_speed
+
+                # Fires the bullet from the player's x and y coordinate, 
+                # where it should spawn and travel from.
+                self.bullet_pool.fire(self.player_sprite.center_x, 
+                                      self.player_sprite.center_y, 
+                                      change_x)
+
+                # Resets the shot after shooting a bullet.
+                self.can_shoot = False
+
+        # If the player has shot create a timer based on how fast the 
+        # player can shoot constant before they are able to shoot again, 
+        # after the timer is done allow the player to shoot and reset 
+        # the timer.
+        else:
+            self.shoot_timer += 1
+            if self.shoot_timer >= self.shoot_ticks:
+                self.can_shoot = True
+                self.shoot_timer = 0
+        profiler.lap("player")
+
+        # Update the different object layer list animations such as the 
+        # player and enemy sprites, once for each base tick that has 
+        # passed, so they play at the same speed at any tick rate.
+        self.animation_time += self.tick_scale
+        while self.animation_time >= 1:
+            self.animation_time -= 1
+            self.scene.update_animation(
+                1 / BASE_TICK_RATE,
+                [
+                    LAYER_NAME_PLAYER,
+                    LAYER_NAME_ENEMIES,
+                ],
+            )
+        profiler.lap("animation")
+
+        # Moves the moving platforms and the enemies to where they are on 
+        # this tick, reversing the direction of travel of the enemies 
+        # that hit their set boundary, and moves the bullets in the 
+        # bullet pool.
+        self.platform_motion.move(self.tick)
+        profiler.lap("platforms")
+        self.enemy_patrol.update(self.tick)
+        profiler.lap("enemies")
+        self.bullet_pool.update()
+
+        # Checks if the bullets hit any objects, including enemy 
+        # sprites, platforms or moving platforms, checking every bullet 
+        # in the bullet pool at once.
+        enemies, enemy_bounds = self.enemy_patrol.bounds()
+        for bullet, hit_list in self.bullet_pool.collisions(
+            enemies, enemy_bounds, self.scene[LAYER_NAME_MOVING_PLATFORMS]):
+
+            # If the bullet hit those object layer lists, free the 
+            # bullet so it can be fired again.
+            self.bullet_pool.release([bullet])
+
+            # Checks if any of the bullet collisions hits enemy sprites, 
+            # if it does reduce the health points of the enemy sprites 
+            # based on bullet damage.
+            for collision in hit_list:
+                if self.scene[LAYER_NAME_ENEMIES] in collision.sprite_lists:
+                    health = self.enemy_patrol.damage(collision, 
+                                                      BULLET_DAMAGE)
+
+                    # If the enemy sprites have no more health points 
+                    # remove them from the enemy list layer and the 
+                    # scene of the game.
+                    if health <= 0:
+                        collision.remove_from_sprite_lists()
+
+                    # Stores the enemy sprite taking damage event.
+                    self.add_event(EVENT_HIT, collision)
+        profiler.lap("bullets")
+
+        # Checks if the player hits an enemy sprite, door or a don't 
+        # touch object, looking up the trigger tiles the player touches 
+        # in the trigger index.
+        player_collision_list = self.enemy_patrol.collisions(
+            self.player_sprite)
+        trigger_index = self.trigger_index
+        position = (self.player_sprite.center_x, 
+                    self.player_sprite.center_y)
+        triggers = trigger_index.update(self.player_sprite)
+
+        # Checks through the collisions. If the player hits an enemy 
+        # they are reset to the last checkpoint, storing the death event 
+        # and increasing their death counter by 1.
+        for collision in player_collision_list:
+            if self.scene[LAYER_NAME_ENEMIES] in collision.sprite_lists:
+                self.respawn_player()
+
+        # Checks through the trigger tiles the player touches, stopping 
+        # once the level has changed as the rest belong to the previous 
+        # level.
+        for trigger in triggers:
+            layer_name = trigger[1]
+            if self.trigger_index is not trigger_index:
+                break
+
+            # If the player hits a don't touch object they are reset to 
+            # the last checkpoint, the same as hitting an enemy.
+            if layer_name == LAYER_NAME_DONT_TOUCH:
+                self.respawn_player()
+
+            # If the player hits the door to the next level and has the 
+            # correct amount of coins, it takes them to the next level 
+            # by increasing the level counter and setting up the next 
+            # level. 
+            elif (layer_name == LAYER_NAME_DOOR 
+                  and self.score >= 3 and self.level < 3):
+                self.level += 1
+                profiler.lap("player collisions")
+                if self.call_on_main_thread is not None:
+                    self.call_on_main_thread(self.setup)
+                else:
+                    self.setup()
+                profiler.lap("level change")
+                self.add_event(EVENT_NEXT_LEVEL, self.player_sprite)
+
+            # If the player hits the door to the next level and has the 
+            # correct amount of coins, but is on level 3, the game is 
+            # complete.
+            elif (layer_name == LAYER_NAME_DOOR 
+                  and self.score >= 3 and self.level == 3):
+                self.game_complete = True
+                self.add_event(EVENT_GAME_COMPLETE, self.player_sprite)
+
+        profiler.lap("player collisions")
+
+        # Looks up the trigger tiles again if the player was moved to a 
+        # checkpoint or into the next level, as the coins and checkpoints 
+        # are picked up where the player ends up.
+        if (self.trigger_index is not trigger_index 
+                or position != (self.player_sprite.center_x, 
+                                self.player_sprite.center_y)):
+            triggers = self.trigger_index.update(self.player_sprite)
+
+        # Loops through the trigger tiles the player touches, and if 
+        # they touch any coins, removes the coins from the scene while 
+        # increasing player score by 1 and storing the coin collection 
+        # event. If they touch any checkpoints, stores the last one as 
+        # the checkpoint to respawn at and removes the checkpoints after 
+        # going past them.
+        for trigger in triggers:
+            layer_name, sprite = trigger[1:3]
+            if layer_name == LAYER_NAME_COINS:
+                sprite.remove_from_sprite_lists()
+                self.score += 1
+                self.add_event(EVENT_COIN, sprite)
+            elif layer_name == LAYER_NAME_CHECKPOINTS:
+                self.checkpoint = sprite
+                self.check_level = self.level
+                sprite.remove_from_sprite_lists()
+        profiler.lap("pickups")
+
+        # Records the snapshot of the world after this tick.
+        if self.record_snapshots:
+            self.snapshots.record(self.tick, self.capture_state())
+            profiler.lap("snapshots")
+
+        # Starts loading the next level in the background once the rest 
+        # of the tick is done, so the tick a level is swapped in doesn't 
+        # have to take turns with the loader thread, and otherwise uses 
+        # some of the tick to prepare the next level once it has loaded, 
+        # which is left to the main thread when the simulation is 
+        # advanced on a worker thread.
+        if self.level_loader is not None:
+            if self.level_loader.thread is None:
+                self.level_loader.start()
+            elif self.call_on_main_thread is None:
+                self.level_loader.prepare()
+            profiler.lap("preload")
+
+        return self.events
+
+    def moving_layers(self):
+        """
+        Method used to get the sprites of each layer that moves, 
+        including the ones that aren't in their layer at the moment, 
+        such as the bullets that are free and the coins that were 
+        collected, always in the same order while a level is played.
+        """
+
+        return {
+            LAYER_NAME_PLAYER: [self.player_sprite],
+            LAYER_NAME_ENEMIES: self.enemy_patrol.sprites,
+            LAYER_NAME_BULLETS: self.bullet_pool.sprites,
+            LAYER_NAME_MOVING_PLATFORMS: 
+                list(self.scene[LAYER_NAME_MOVING_PLATFORMS]),
+            LAYER_NAME_COINS: self.level_coins,
+            LAYER_NAME_CHECKPOINTS: self.level_checkpoints,
+        }
+
+    def run(self, ticks):
+        """
+        Advances the game by the given number of ticks as fast as 
+        possible, returning every event that happened along the way.
+        """
+
+        events = []
+        for i in range(ticks):
+            events.extend(self.update())
+        return events
+
+    def play_inputs(self, inputs):
+        """
+        Method used to advance the game by one tick for each of the bit 
+        masks of held keys as fast as possible, such as the keys of an 
+        input recording, returning every event that happened.
+        """
+
+        events = []
+        for keys in inputs:
+            events.extend(self.set_input(keys))
+            events.extend(self.update())
+        return events
+
+
+class SoundManager:
+    """
+    Class used to play the sound effects and the background music. The 
+    sound effects are decoded once when the game starts, and are played 
+    through a fixed number of voices, so rapid fire can't pile up more 
+    and more sounds. When every voice is in use, a sound steals the 
+    voice of the oldest sound with the lowest priority that isn't 
+    higher than its own, or isn't played at all. Sounds played again 
+    too soon and sounds of events far off the screen are skipped. The 
+    music plays on its own channel, which keeps playing through level 
+    changes and new games.
+    """
+
+    # Stores the sound manager that has been created, and whether sounds 
+    # should be played at all.
+    current = None
+    enabled = True
+
+    # __init__() function to decode the sound effects and create the 
+    # voices they are played through.
+    def __init__(self, voice_count = SOUND_VOICE_COUNT):
+
+        # Dictionaries to store the decoded sound of every event, which 
+        # are loaded by the asset manager so events sharing a file share 
+        # the sound, and the time each event last played a sound.
+        assets = AssetManager.get()
+        self.sounds = {}
+        for name, (file_name, volume, priority, cooldown) in (
+                SOUND_EFFECTS.items()):
+            self.sounds[name] = assets.sound(file_name)
+        self.last_played = {}
+
+        # Lists to store the voices, and for each voice, the event whose 
+        # sound it plays, the priority of the sound, when it started and 
+        # when it ends.
+        self.voices = [pyglet.media.Player() for i in range(voice_count)]
+        self.voice_names = [None] * voice_count
+        self.voice_priorities = [0] * voice_count
+        self.voice_starts = [0.0] * voice_count
+        self.voice_ends = [0.0] * voice_count
+
+        # Stores the part of the level shown on the screen, as the left, 
+        # bottom, right and top edges, or None to hear every event.
+        self.view = None
+
+        # Stores the music and the player it is played by once started.
+        self.music = None
+        self.music_player = None
+
+        # Counts what happened to the sounds that were asked to play, 
+        # and the seconds of processor time spent on them.
+        self.requested = 0
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+        self.cooled_down = 0
+        self.culled = 0
+        self.play_time = 0.0
+
+    @classmethod
+    def get(cls):
+        """
+        Method used to get the sound manager, creating it the first 
+        time, or None if sounds are turned off.
+        """
+
+        if not cls.enabled:
+            return None
+        if cls.current is None:
+            cls.current = cls()
+        return cls.current
+
+    def set_view(self, left, bottom, width, height):
+        """
+        Method used to set the part of the level shown on the screen, 
+        so events that happen far outside of it aren't heard.
+        """
+
+        self.view = (left - SOUND_CULL_MARGIN, bottom - SOUND_CULL_MARGIN, 
+                     left + width + SOUND_CULL_MARGIN, 
+                     bottom + height + SOUND_CULL_MARGIN)
+
+    def active_voices(self):
+        """
+        Method used to count the voices that are playing a sound.
+        """
+
+        now = time.perf_counter()
+        return sum(1 for end in self.voice_ends if end > now)
+
+    def play(self, name, x = None, y = None):
+        """
+        Method used to play the sound effect of an event, which happened 
+        at the given x and y coordinates if they are given, timing how 
+        long it takes. Returns whether the sound was played.
+        """
+
+        start = time.perf_counter()
+        played = self.start_sound(name, x, y, start)
+        self.requested += 1
+        self.play_time += time.perf_counter() - start
+        return played
+
+    def start_sound(self, name, x, y, start):
+        """
+        Method used to play the sound effect of an event through one of 
+        the voices, unless the sound is skipped or every voice is playing 
+        a sound with a higher priority.
+        """
+
+        sound = self.sounds.get(name)
+        if sound is None:
+            return False
+        file_name, volume, priority, cooldown = SOUND_EFFECTS[name]
+
+        # Skips the sound if the event happened far off the screen, or 
+        # the same sound was played too recently.
+        if self.view is not None and x is not None:
+            left, bottom, right, top = self.view
+            if not (left <= x <= right and bottom <= y <= top):
+                self.culled += 1
+                return False
+        if start - self.last_played.get(name, -cooldown) < cooldown:
+            self.cooled_down += 1
+            return False
+
+        # Finds a voice that isn't playing, or otherwise the voice 
+        # playing the oldest sound with the lowest priority.
+        voice = min(
+            range(len(self.voices)), 
+            key = lambda index: (self.voice_ends[index] > start, 
+                                 self.voice_priorities[index], 
+                                 self.voice_starts[index]))
+        if self.voice_ends[voice] > start:
+            if self.voice_priorities[voice] > priority:
+                self.dropped += 1
+                return False
+            self.stolen += 1
+
+        # Plays the sound from the start if the voice still has it, 
+        # which is quicker than stopping whatever the voice was playing 
+        # and giving it the sound again.
+        player = self.voices[voice]
+        if self.voice_names[voice] == name and player.source is not None:
+            player.seek(0.0)
+        else:
+            if player.source is not None:
+                player.next_source()
+            player.volume = volume
+            player.queue(sound.source)
+            self.voice_names[voice] = name
+        player.play()
+        self.voice_priorities[voice] = priority
+        self.voice_starts[voice] = start
+        self.voice_ends[voice] = start + sound.source.duration
+        self.last_played[name] = start
+        self.played += 1
+        return True
+
+    def play_music(self):
+        """
+        Method used to start the background music, which loops, unless 
+        it is already playing.
+        """
+
+        if self.music_player is None:
+            self.music = AssetManager.get().sound(
+                MUSIC_FILE, streaming = True)
+            self.music_player = self.music.play(MUSIC_VOLUME, loop = True)
+
+    def metrics(self):
+        """
+        Method used to get the number of voices playing and what 
+        happened to the sounds asked to play so far, along with the 
+        average milliseconds spent on each of them.
+        """
+
+        return {
+            "voices": self.active_voices(),
+            "requested": self.requested,
+            "played": self.played,
+            "stolen": self.stolen,
+            "dropped": self.dropped,
+            "cooled down": self.cooled_down,
+            "culled": self.culled,
+            "play ms": self.play_time * 1000 / max(self.requested, 1),
+        }
+
+
+class HeadsUpDisplay:
+    """
+    Class used to draw the text shown on top of the game, such as the 
+    score and the deaths, keeping each piece of text laid out between 
+    frames and only laying it out again when the value it shows changes. 
+    Every piece of text has a shadow, and all of the shadows and text 
+    are drawn at once as one batch.
+    """
+
+    # __init__() function to create the batch the text is drawn from, 
+    # with the shadows drawn before the text.
+    def __init__(self):
+
+        self.batch = pyglet.graphics.Batch()
+        self.shadow_group = pyglet.graphics.Group(order = 0)
+        self.text_group = pyglet.graphics.Group(order = 1)
+
+        # Stores the shadow label, the text label, the template and the 
+        # value shown of every piece of text by its name.
+        self.widgets = {}
+
+    def add_text(self, name, x, y, template = "{}", 
+                 font_size = HUD_FONT_SIZE):
+        """
+        Method used to add a piece of text, which shows a value in a 
+        template, with its shadow at the given x and y coordinates.
+        """
+
+        labels = []
+        for offset, color, group in (
+                (0, (0, 0, 0, 255), self.shadow_group), 
+                (HUD_SHADOW_OFFSET, (255, 255, 255, 255), self.text_group)):
+            labels.append(pyglet.text.Label(
+                "", font_name = HUD_FONT_NAME, font_size = font_size, 
+                color = color, x = x + offset, y = y + offset, 
+                batch = self.batch, group = group))
+        self.widgets[name] = [labels[0], labels[1], template, None]
+
+    def set_value(self, name, value):
+        """
+        Method used to change the value a piece of text shows, laying it 
+        out again only if the value is different.
+        """
+
+        widget = self.widgets[name]
+        if widget[3] != value:
+            widget[3] = value
+            text = widget[2].format(value) if value is not None else ""
+            widget[0].text = text
+            widget[1].text = text
+
+    def draw(self, ctx):
+        """
+        Method used to draw every piece of text and its shadow.
+        """
+
+        with ctx.pyglet_rendering():
+            self.batch.draw()
+
+
+class SpriteInterpolation:
+    """
+    Class used to draw the moving sprites between where they were on the 
+    previous tick and where they are on the latest tick, by how far the 
+    time since the latest tick is through the next one, so they move 
+    smoothly however often the screen is drawn compared to the tick rate. 
+    The sprites are only moved while the game is drawn, and are put back 
+    where the game simulation left them straight afterwards.
+    """
+
+    # __init__() function to create the lists of the sprites and where 
+    # they were before the latest tick, and where the sprites that were 
+    # moved for drawing are in the game simulation.
+    def __init__(self):
+
+        self.scene = None
+        self.previous = []
+        self.moved = []
+
+    def capture(self, simulation):
+        """
+        Method used to store where the player, the enemies, the moving 
+        platforms and the bullets that are alive are before a tick.
+        """
+
+        scene = simulation.scene
+        pool = simulation.bullet_pool
+        sprites = [simulation.player_sprite]
+        sprites += scene[LAYER_NAME_ENEMIES]
+        sprites += scene[LAYER_NAME_MOVING_PLATFORMS]
+        sprites += [pool.sprites[index] 
+                    for index in numpy.flatnonzero(pool.alive).tolist()]
+        self.scene = scene
+        self.previous = [(sprite, sprite.center_x, sprite.center_y) 
+                         for sprite in sprites]
+
+    def forget(self):
+        """
+        Method used to forget where the sprites were, so they are drawn 
+        where they are until the next tick, such as after the level was 
+        restarted.
+        """
+
+        self.scene = None
+        self.previous = []
+
+    def apply(self, simulation, fraction):
+        """
+        Method used to move the sprites that moved on the latest tick to 
+        the given fraction of the way from where they were before it. 
+        Sprites that moved further than the snap distance, such as the 
+        player respawning, and every sprite after the level changed, are 
+        drawn where they are.
+        """
+
+        if simulation.scene is not self.scene:
+            return
+        for sprite, previous_x, previous_y in self.previous:
+            x, y = sprite.position
+            change_x = x - previous_x
+            change_y = y - previous_y
+            if (not change_x and not change_y) or (
+                    abs(change_x) > INTERPOLATION_SNAP_DISTANCE 
+                    or abs(change_y) > INTERPOLATION_SNAP_DISTANCE):
+                continue
+            self.moved.append((sprite, x, y))
+            sprite.position = (previous_x + change_x * fraction, 
+                               previous_y + change_y * fraction)
+
+    def restore(self):
+        """
+        Method used to put the sprites moved for drawing back where they 
+        are in the game simulation.
+        """
+
+        for sprite, x, y in self.moved:
+            sprite.position = (x, y)
+        self.moved = []
+
+
+class RenderState:
+    """
+    Class used to store a copy of the layers that move at the end of a 
+    tick, and where their sprites were before it, along with the score 
+    and the deaths, so the tick can be drawn while the game simulation 
+    advances the next ones on a worker thread. The copy is only read 
+    once it has been written, with two of them used in turn.
+    """
+
+    # __init__() function to create an empty render state.
+    def __init__(self):
+
+        self.scene = None
+        self.previous_scene = None
+        self.score = 0
+        self.death = 0
+        self.layers = {}
+        self.previous = {}
+
+    def capture_previous(self, simulation):
+        """
+        Method used to store where the sprites of the layers that move 
+        are before the last tick of a frame.
+        """
+
+        self.previous_scene = simulation.scene
+        self.previous = {
+            name: [(sprite.center_x, sprite.center_y) for sprite in sprites] 
+            for name, sprites in simulation.moving_layers().items()}
+
+    def capture(self, simulation):
+        """
+        Method used to store where the sprites of the layers that move 
+        are, their textures, whether they are shown and their scale, 
+        along with the score and the deaths.
+        """
+
+        self.scene = simulation.scene
+        self.score = simulation.score
+        self.death = simulation.death
+        self.layers = {
+            name: [(sprite.center_x, sprite.center_y, sprite.texture, 
+                    sprite.visible and bool(sprite.sprite_lists), 
+                    sprite.scale) 
+                   for sprite in sprites] 
+            for name, sprites in simulation.moving_layers().items()}
+
+
+class RenderSprites:
+    """
+    Class used to store the sprites the main thread draws the layers that 
+    move from while the game simulation is advanced on a worker thread, 
+    with one sprite for each sprite of a render state, which are moved 
+    to where the render state says before drawing. Only the sprites that 
+    are shown are kept in the sprite lists, as hidden sprites are still 
+    drawn by Arcade Python Library.
+    """
+
+    # __init__() function to create a sprite list for each layer that 
+    # moves, which stay empty until the sprites are moved.
+    def __init__(self, state):
+
+        self.scene = state.scene
+        self.sprites = {}
+        self.sprite_lists = {}
+        for name, entries in state.layers.items():
+            self.sprites[name] = [
+                arcade.Sprite(texture = texture, scale = scale) 
+                for x, y, texture, shown, scale in entries]
+            self.sprite_lists[name] = arcade.SpriteList()
+
+    def matches(self, state):
+        """
+        Method used to check whether the sprites were made for the layers 
+        of a render state.
+        """
+
+        return state.scene is self.scene and all(
+            len(self.sprites[name]) == len(entries) 
+            for name, entries in state.layers.items())
+
+    def apply(self, state, fraction = 1):
+        """
+        Method used to move the sprites to the given fraction of the way 
+        from where they were before the last tick of a render state to 
+        where they are, in the same way as SpriteInterpolation, and give 
+        them their textures and add them to or remove them from their 
+        sprite lists.
+        """
 
-        # Process when the user presses left key.
-        elif self.left_pressed and not self.right_pressed:
-            # If they press left it changes the player x coordinate to 
-            # the left according to the player movement speed.
-            self.player_sprite.change_x = -PLAYER_MOVEMENT_SPEED
+        interpolate = state.previous_scene is state.scene and fraction != 1
+        for name, entries in state.layers.items():
+            sprites = self.sprites[name]
+            sprite_list = self.sprite_lists[name]
+            previous = state.previous.get(name) if interpolate else None
+            for i, (x, y, texture, shown, _) in enumerate(entries):
+                sprite = sprites[i]
+                if bool(sprite.sprite_lists) != shown:
+                    if shown:
+                        sprite_list.append(sprite)
+                    else:
+                        sprite_list.remove(sprite)
+                if not shown:
+                    continue
+                if sprite.texture is not texture:
+                    sprite.texture = texture
+                if previous is not None:
+                    previous_x, previous_y = previous[i]
+                    if (abs(x - previous_x) <= INTERPOLATION_SNAP_DISTANCE 
+                            and abs(y - previous_y) 
+                            <= INTERPOLATION_SNAP_DISTANCE):
+                        x = previous_x + (x - previous_x) * fraction
+                        y = previous_y + (y - previous_y) * fraction
+                sprite.position = (x, y)
+
+
+class SimulationWorker:
+    """
+    Class used to advance the game simulation on a worker thread for the 
+    ticks of a frame while the main thread draws the ticks of the frame 
+    before. Once its ticks are done, the worker thread writes the render 
+    state that isn't being drawn and swaps it with the one that is, so 
+    the main thread always draws a whole tick without waiting for a lock. 
+    Setting up a level creates OpenGL objects, which can only be done on 
+    the main thread, so the worker thread hands it to the main thread 
+    and waits, which runs it while waiting for the ticks to be done.
+    """
+
+    # __init__() function to start the worker thread, which waits for 
+    # the keys of the ticks to advance the game simulation by, and store 
+    # the render states with the current state of the game in them.
+    def __init__(self, simulation):
+
+        self.simulation = simulation
+        self.inputs = queue.SimpleQueue()
+        self.results = queue.SimpleQueue()
+        self.running = False
+
+        # The parts of the ticks aren't timed on the worker thread, as 
+        # the frame profiler times the parts of the frame on the main 
+        # thread. The time each batch of ticks takes is added to the 
+        # frame profiler as one part once it is done instead.
+        simulation.tick_profiler = FrameProfiler(enabled = False)
+        self.batch_time = 0
+        self.front = RenderState()
+        self.back = RenderState()
+        self.capture()
+        self.add_textures()
+        self.thread = threading.Thread(
+            target = self.run, name = "Simulation", daemon = True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Method used by the worker thread to advance the game simulation 
+        by one tick for each of the keys it is given, passing back the 
+        events that happened, or the error that was raised.
+        """
+
+        while True:
+            inputs = self.inputs.get()
+            if inputs is None:
+                return
+            try:
+                self.results.put((None, self.advance(inputs)))
+            except Exception as error:
+                self.results.put((None, error))
+
+    def advance(self, inputs):
+        """
+        Method used on the worker thread to advance the game simulation 
+        by one tick for each of the keys, stopping once the game is 
+        complete, and then write the render state that isn't being drawn 
+        and swap it in.
+        """
+
+        simulation = self.simulation
+        start = time.perf_counter()
+        events = []
+        for i, keys in enumerate(inputs):
+            if i == len(inputs) - 1 and INTERPOLATE_SPRITES:
+                self.back.capture_previous(simulation)
+            events += simulation.set_input(keys)
+            events += simulation.update()
+            if simulation.game_complete:
+                break
+        self.back.capture(simulation)
+        self.front, self.back = self.back, self.front
+        self.batch_time = time.perf_counter() - start
+        return events
+
+    def start(self, inputs):
+        """
+        Method used on the main thread to start advancing the game 
+        simulation by one tick for each of the keys.
+        """
+
+        self.simulation.call_on_main_thread = self.call_on_main_thread
+        self.running = True
+        self.inputs.put(inputs)
+
+    def call_on_main_thread(self, function):
+        """
+        Method used on the worker thread to run a function on the main 
+        thread, waiting for it to finish.
+        """
+
+        call = concurrent.futures.Future()
+        self.results.put((function, call))
+        return call.result()
+
+    def finish(self):
+        """
+        Method used on the main thread to wait for the ticks that were 
+        started to be done, running the functions handed to it by the 
+        worker thread meanwhile, and add the time they took to the frame 
+        profiler. Returns the events that happened.
+        """
+
+        if not self.running:
+            return []
+        while True:
+            function, result = self.results.get()
+            if function is None:
+                break
+            try:
+                result.set_result(function())
+            except Exception as error:
+                result.set_exception(error)
+        self.running = False
+        self.simulation.call_on_main_thread = None
+        if isinstance(result, Exception):
+            raise result
+        self.simulation.profiler.add("simulation", self.batch_time)
+        return result
+
+    def capture(self):
+        """
+        Method used on the main thread to write the render state that 
+        isn't being drawn and swap it in while the worker thread is idle, 
+        after the game simulation was changed on the main thread, such as 
+        by rewinding it.
+        """
+
+        self.back.capture(self.simulation)
+        self.back.previous_scene = None
+        self.front, self.back = self.back, self.front
+
+    def add_textures(self):
+        """
+        Method used on the main thread to add every texture of the 
+        animations of the sprites that move to the texture atlas, as 
+        changing the texture of a sprite to one that isn't in the atlas 
+        adds it with OpenGL, which the worker thread can't use.
+        """
+
+        atlas = arcade.get_window().ctx.default_atlas
+        animation_sets = {}
+        for sprites in self.simulation.moving_layers().values():
+            for sprite in sprites:
+                animations = getattr(sprite, "animations", None)
+                if animations is not None:
+                    animation_sets[id(animations)] = animations
+        for animations in animation_sets.values():
+            for texture in animations.textures:
+                if not atlas.has_texture(texture):
+                    atlas.add(texture)
+
+    def close(self):
+        """
+        Method used to wait for the ticks that were started and stop the 
+        worker thread, timing the parts of the ticks with the frame 
+        profiler again.
+        """
+
+        events = self.finish()
+        self.inputs.put(None)
+        self.simulation.tick_profiler = self.simulation.profiler
+        return events
+
+
+class GameView(arcade.View):
+    """
+    Class used to store methods that manages the main game. Methods 
+    include passing user input to the game simulation, playing sounds 
+    for what happened in the game and drawing items on the screen.
+    """
+
+    # Game initializer which handles actions that should only be taken 
+    # when the game first starts, starting on a level and either 
+    # recording the keys held every tick or playing back a recording.
+    def __init__(self, level = 1, record = False, replay = None):
+
+        super().__init__()
+
+        # Method returns the pathname to the path of the program and 
+        # sets it to start with the program.
+        file_path = os.path.dirname(os.path.abspath(__file__))
+        os.chdir(file_path)
 
+        # Stores the game simulation, which holds the game state and 
+        # the game logic such as movement and collisions, set up in the 
+        # same way as the recording when one is played back.
+        if replay is not None:
+            self.simulation = GameSimulation(
+                replay.level, use_grid_physics = replay.use_grid_physics, 
+                tick_rate = replay.tick_rate)
         else:
-            # If the player doesn't press right or left the player 
-            # remains stationary along the x axis.
-            self.player_sprite.change_x = 0
+            self.simulation = GameSimulation(level)
+
+        # Stores the keys the user is holding as a bit mask, and the 
+        # keys pressed since the last tick, so a key tapped between two 
+        # ticks is still held for one tick.
+        self.held_keys = 0
+        self.tapped_keys = 0
+
+        # Stores the time since the latest tick that the game simulation 
+        # hasn't been advanced by yet, how long the latest frame took, 
+        # and where the moving sprites were before the latest tick, so 
+        # they can be drawn between the last two ticks.
+        self.tick_time = 0
+        self.frame_time = 1 / BASE_TICK_RATE
+        self.interpolation = SpriteInterpolation()
+
+        # Stores the worker thread that advances the game simulation 
+        # while the previous ticks are drawn when it is pipelined, the 
+        # render state being drawn and the sprites it is drawn with, and 
+        # whether the level should be restarted once the worker thread 
+        # has finished its ticks.
+        self.worker = None
+        self.render_state = None
+        self.render_sprites = None
+        self.restart_pending = False
+
+        # Stores the input recording that is being recorded or played 
+        # back, whether it is played back, and whether the game ended 
+        # the same way as the recording once it has been played back.
+        self.record = record
+        self.input_recording = replay
+        self.replaying = replay is not None
+        self.replay_matches = None
+
+        # Stores our camera which is used for scrolling the screen.
+        self.camera = None
+
+        # Stores our camera which is used to draw GUI elements.
+        self.gui_camera = None
+
+        # Stores the layers of the scene that never move, baked into 
+        # chunk textures, and the same for the next level while it is 
+        # loaded in the background.
+        self.static_layers = None
+        self.next_static_layers = None
+
+        # Tracks if the user is holding the key that rewinds the game.
+        self.rewinding = False
+
+        # Tracks if the frame profiler overlay is shown, and stores its 
+        # text.
+        self.show_profiler = False
+        self.profiler_text = None
+
+        # Stores the text shown on top of the game, which are the score, 
+        # the deaths and whether a recording is being played back.
+        self.hud = HeadsUpDisplay()
+        self.hud.add_text("score", 10, 10, "Skulls: {}/3")
+        self.hud.add_text("deaths", 10, 50, "Deaths: {}")
+        self.hud.add_text("replay", 10, 90)
+
+        # Stores the sound manager that plays the sound effects and the 
+        # music for the game, which is shared by every game view.
+        self.sounds = SoundManager.get()
+    
+    def loading_view(self):
+        """
+        Method used to start loading the assets and the first level of 
+        the game in the background, returning the loading screen that 
+        shows the game once they have loaded.
+        """
+
+        level_loader = None
+        if AssetManager.background_loading:
+            level_loader = self.simulation.preload_level()
+        return LoadingView(lambda: self, 
+                           AssetManager.get().request_game_assets(), 
+                           level_loader)
+
+    def setup(self):
+        """
+        Sets up the game to begin playing and stores things that may 
+        need to be repeated throughout the game without restarting the 
+        program.
+        """
+
+        # Sets up the level in the game simulation, and starts recording 
+        # the keys from the start of the level.
+        self.simulation.setup()
+        if self.replaying:
+            self.simulation.tick = self.input_recording.start_tick
+        elif self.record:
+            self.input_recording = InputRecording(
+                self.simulation.level, self.simulation.use_grid_physics, 
+                self.simulation.tick, self.simulation.tick_rate)
+
+        # Sets up the music and cameras for the level.
+        self.setup_level_view()
+
+        # Starts the first tick from here, with no sprites to draw 
+        # between ticks yet.
+        self.tick_time = 0
+        self.interpolation.forget()
+
+        # Starts timing frames from here, so setting up the game isn't 
+        # counted as part of the first frame.
+        self.simulation.profiler.reset()
+
+    def setup_level_view(self):
+        """
+        Sets up the parts of the game that are only needed to show a 
+        level, which are the background music and the cameras.
+        """
+
+        # Starts the background music for the game, which loops and 
+        # keeps playing when the player moves to the next level or 
+        # starts a new game.
+        if self.sounds:
+            self.sounds.play_music()
+
+        # Set up the cameras for the game using Arcade Python Library
+        # by passing in the desired width and heights for them.
+        self.camera = arcade.Camera(self.window.width, self.window.height)
+        self.gui_camera = arcade.Camera(self.window.width, self.window.height)
+
+        # Bakes the layers of the level that never move into chunk 
+        # textures, so they don't need to be drawn sprite by sprite, 
+        # using the chunks that were baked while the level was loaded in 
+        # the background if there are any. The layers of a streamed 
+        # level only hold the chunks near the player, so they are drawn 
+        # sprite by sprite instead.
+        self.static_layers = None
+        if BAKE_STATIC_LAYERS and self.simulation.streamer is None:
+            if (self.next_static_layers is not None and 
+                    self.next_static_layers.scene is self.simulation.scene):
+                self.static_layers = self.next_static_layers
+            else:
+                self.static_layers = BakedStaticLayers(
+                    self.window.ctx, self.simulation.scene)
+            self.next_static_layers = None
+
+        # Advances the game simulation on a worker thread while the 
+        # previous ticks are drawn when it is turned on, as long as the 
+        # layers that never move are baked, as the worker thread only 
+        # leaves those layers as they are.
+        if PIPELINE_SIMULATION and self.static_layers is not None:
+            if self.worker is None:
+                self.worker = SimulationWorker(self.simulation)
+            else:
+                self.worker.capture()
+                self.worker.add_textures()
+            self.keep_render_state()
+        elif self.worker is not None:
+            self.worker.close()
+            self.worker = None
+
+    def on_show(self):
+        """
+        Shows and calls on the setup for the game. 
+        """
+
+        self.setup()
+
+    def on_draw(self):
+        """
+        Renders and draws the screen, used to draw everything displayed 
+        in the game.
+        """
+
+        # Adds the time since the game was updated to the idle time of 
+        # the frame in the frame profiler.
+        profiler = self.simulation.profiler
+        profiler.lap("idle")
+
+        # Moves the moving sprites between where they were on the last 
+        # two ticks, by how far the time since the latest tick is through 
+        # the next one, and keeps the camera centered on where the 
+        # player is drawn. While the game simulation is pipelined, the 
+        # sprites drawn are the ones of the render state instead, as the 
+        # worker thread is moving the sprites of the game simulation.
+        fraction = 1
+        if INTERPOLATE_SPRITES:
+            fraction = self.tick_time * self.simulation.tick_rate
+        if self.worker is not None:
+            self.render_sprites.apply(self.render_state, fraction)
+            player_sprite = self.render_sprites.sprites[
+                LAYER_NAME_PLAYER][0]
+        else:
+            if INTERPOLATE_SPRITES:
+                self.interpolation.apply(self.simulation, fraction)
+            player_sprite = self.simulation.player_sprite
+        self.center_camera_to_player(frame_time = self.frame_time, 
+                                     sprite = player_sprite)
+        profiler.lap("camera")
+
+        # Activates the camera for the game.
+        self.camera.use()
+
+        # Draws the game scene, using the baked chunks for the layers 
+        # that never move if they are turned on, and puts the moving 
+        # sprites back where they are in the game simulation.
+        if self.worker is not None:
+            self.static_layers.draw(self.camera, 
+                                    self.render_sprites.sprite_lists)
+        elif self.static_layers:
+            self.static_layers.draw(self.camera)
+        else:
+            self.simulation.scene.draw()
+        self.interpolation.restore()
+        profiler.lap("draw scene")
+
+        # Activates the GUI camera for the game.
+        self.gui_camera.use()
+
+        # Draws the score, the deaths and whether a recording is being 
+        # played back, and once it has run out, whether the game ended 
+        # the same way as when it was recorded. The text stays in the 
+        # same place on the screen, and is only laid out again when it 
+        # changes.
+        if self.replaying:
+            replay_text = "Replay"
+        elif self.replay_matches is True:
+            replay_text = "Replay matches"
+        elif self.replay_matches is False:
+            replay_text = "Replay differs"
+        else:
+            replay_text = None
+        state = self.render_state if self.worker else self.simulation
+        self.hud.set_value("score", state.score)
+        self.hud.set_value("deaths", state.death)
+        self.hud.set_value("replay", replay_text)
+        self.hud.draw(self.window.ctx)
+        profiler.lap("draw hud")
+
+        # Draws the timings of each part of the latest frames when the 
+        # overlay is turned on.
+        if self.show_profiler:
+            self.draw_profiler()
+            profiler.lap("draw profiler")
+
+    def draw_profiler(self):
+        """
+        Method used to draw the 50th and 95th percentile and the worst 
+        time in milliseconds of each part of the latest frames, and the 
+        number of sound voices playing and the average milliseconds 
+        spent on each sound, only updating the text every few frames.
+        """
+
+        profiler = self.simulation.profiler
+        if (self.profiler_text is None 
+                or profiler.frames % PROFILER_OVERLAY_INTERVAL == 0):
+            lines = [f"{'part':<18}{'p50':>7}{'p95':>7}{'max':>7}"]
+            summary = profiler.summary(PROFILER_OVERLAY_FRAMES)
+            for phase, times in summary.items():
+                lines.append(f"{phase:<18}{times['p50']:>7.2f}"
+                             f"{times['p95']:>7.2f}{times['max']:>7.2f}")
+            if self.sounds:
+                metrics = self.sounds.metrics()
+                lines.append(f"{'sound voices':<18}{metrics['voices']:>7}"
+                             f"{metrics['play ms']:>7.2f}")
+            self.profiler_text = arcade.Text(
+                "\n".join(lines), 10, self.window.height - 10, 
+                arcade.csscolor.WHITE, 12, width = 400, multiline = True, 
+                font_name = "Courier New", anchor_y = "top")
+        arcade.draw_lrtb_rectangle_filled(
+            0, 420, self.window.height, 
+            self.window.height - self.profiler_text.content_height - 20, 
+            (0, 0, 0, 160))
+        self.profiler_text.draw()
+
+    def handle_events(self, events):
+        """
+        Reacts to the events that happened in the game simulation, such 
+        as playing sound effects and changing views.
+        """
+
+        # Tells the sound manager which part of the level is on the 
+        # screen, so the sounds of events far off the screen are skipped.
+        if self.sounds:
+            left, bottom = self.camera.position
+            self.sounds.set_view(
+                left, bottom, self.camera.viewport_width, 
+                self.camera.viewport_height)
+
+        for name, x, y in events:
+
+            # Plays the sound effect for the event, if it has one.
+            if name in SOUND_EFFECTS:
+                if self.sounds:
+                    self.sounds.play(name, x, y)
+
+            # If the player moved to the next level, set up the music 
+            # and cameras for the new level.
+            elif name == EVENT_NEXT_LEVEL:
+                self.setup_level_view()
+
+            # If the player finished the last level, it shows the end of 
+            # game view screen using Arcade Python Library.
+            elif name == EVENT_GAME_COMPLETE:
+                end_game = EndGame()
+                self.window.show_view(end_game)
 
     def on_key_press(self, key, modifiers):
         """
         Processes key presses.
         """
         
-        # If the user presses any of the keys it sets the variable that 
-        # tracks if the key is pressed to True.
+        # If the user presses any of the keys it sets the bit that 
+        # tracks if the key is pressed, which the game simulation is 
+        # given at the start of the next tick.
         if key == arcade.key.UP or key == arcade.key.W:
-            self.up_pressed = True
+            self.press_keys(INPUT_UP)
         elif key == arcade.key.DOWN or key == arcade.key.S:
-            self.down_pressed = True
+            self.press_keys(INPUT_DOWN)
         elif key == arcade.key.LEFT or key == arcade.key.A:
-            self.left_pressed = True
+            self.press_keys(INPUT_LEFT)
         elif key == arcade.key.RIGHT or key == arcade.key.D:
-            self.right_pressed = True
+            self.press_keys(INPUT_RIGHT)
         
         if key == arcade.key.Q:
-            self.shoot_pressed = True
-
-        # Processes the key changes when the user presses the keys.
-        self.process_keychange()
+            self.press_keys(INPUT_SHOOT)
+
+        # Holding R rewinds the game and backspace restarts the level 
+        # from the snapshots the game simulation records.
+        if key == arcade.key.R and self.simulation.record_snapshots:
+            self.rewinding = True
+        elif key == arcade.key.BACKSPACE and self.simulation.record_snapshots:
+            if self.worker is not None:
+                self.restart_pending = True
+            else:
+                self.restart_level()
+
+        # F3 shows or hides the timings of each part of the frame.
+        if key == arcade.key.F3:
+            self.show_profiler = not self.show_profiler
+            self.profiler_text = None
 
     def on_key_release(self, key, modifiers):
         """
@@ -933,35 +6377,206 @@ class GameView(arcade.View):
         """
 
         # If the user releases any of the keys after being pressed, it 
-        # sets the variable that tracks if the key is pressed to False.
+        # clears the bit that tracks if the key is pressed.
         if key == arcade.key.UP or key == arcade.key.W:
-            self.up_pressed = False
-            self.jump_needs_reset = False
+            self.held_keys &= ~INPUT_UP
         elif key == arcade.key.DOWN or key == arcade.key.S:
-            self.down_pressed = False
+            self.held_keys &= ~INPUT_DOWN
         elif key == arcade.key.LEFT or key == arcade.key.A:
-            self.left_pressed = False
+            self.held_keys &= ~INPUT_LEFT
         elif key == arcade.key.RIGHT or key == arcade.key.D:
-            self.right_pressed = False
+            self.held_keys &= ~INPUT_RIGHT
 
         if key == arcade.key.Q:
-            self.shoot_pressed = False
+            self.held_keys &= ~INPUT_SHOOT
 
-        # Processes the key changes when the user presses and releases 
-        # the keys.
-        self.process_keychange()
+        if key == arcade.key.R:
+            self.rewinding = False
+
+    def restart_level(self):
+        """
+        Method used to restart the level from the snapshot of its start, 
+        forgetting the keys recorded after it.
+        """
+
+        self.simulation.restart_level()
+        self.forget_recorded_keys()
+        self.interpolation.forget()
+
+    def press_keys(self, keys):
+        """
+        Method used to mark keys as held and as pressed since the last 
+        tick.
+        """
+
+        self.held_keys |= keys
+        self.tapped_keys |= keys
 
-    def center_camera_to_player(self, speed = 0.2):
+    def next_keys(self, ticks_ahead = 0):
         """
-        Method to keep viewport camera centered on the player.
+        Method used to get the keys held during the next tick, or the 
+        given number of ticks after it, which come from the recording 
+        while it is played back and otherwise from the keys the user 
+        pressed, recording them if the game is being recorded. Returns 
+        None if the recording runs out before a tick after the next one, 
+        as the recording is checked once the game simulation is there.
+        """
+
+        if self.replaying:
+            keys = self.input_recording.keys_at(
+                self.simulation.tick + ticks_ahead)
+            if keys is not None:
+                return keys
+            if ticks_ahead:
+                return None
+
+            # Hands the game back to the user once the recording has run 
+            # out, checking that it ended the same way as when it was 
+            # recorded.
+            self.replaying = False
+            self.replay_matches = self.input_recording.matches(
+                self.simulation)
+
+        keys = self.held_keys | self.tapped_keys
+        self.tapped_keys = 0
+        if self.record:
+            self.input_recording.record(keys)
+        return keys
+
+    def forget_recorded_keys(self):
+        """
+        Method used to forget the recorded keys of the ticks after the 
+        current one, after the game has been rewound or restarted.
+        """
+
+        if self.record:
+            self.input_recording.truncate(self.simulation.tick)
+
+    def save_recording(self, file_name):
+        """
+        Method used to save the keys recorded so far to a file.
+        """
+
+        self.input_recording.save(file_name, self.simulation)
+
+    def advance(self):
+        """
+        Method used to advance the game simulation by one tick and handle 
+        the events that happened, or step back through the recorded 
+        snapshots while the rewind key is held, storing where the moving 
+        sprites were first. Returns whether the game view is still shown.
+        """
+
+        profiler = self.simulation.profiler
+        if INTERPOLATE_SPRITES:
+            self.interpolation.capture(self.simulation)
+        if self.rewinding:
+            self.simulation.rewind()
+            self.forget_recorded_keys()
+            profiler.lap("rewind")
+        else:
+            events = self.simulation.set_input(self.next_keys())
+            profiler.lap("keys")
+            events += self.simulation.update()
+            self.handle_events(events)
+            profiler.lap("events")
+        return not self.simulation.game_complete
+
+    def advance_pipelined(self, ticks):
+        """
+        Method used to wait for the worker thread to finish the ticks of 
+        the previous frame and handle the events that happened, and then 
+        start it on the given number of ticks with the keys held, keeping 
+        the render state of the finished ticks to draw. Rewinding and 
+        restarting the level are done on the main thread in between. 
+        Returns whether the game view is still shown.
+        """
+
+        profiler = self.simulation.profiler
+        worker = self.worker
+        events = worker.finish()
+        profiler.lap("wait")
+        self.handle_events(events)
+        profiler.lap("events")
+        if self.simulation.game_complete:
+            return False
+
+        # Stops if the level that was moved to isn't pipelined, leaving 
+        # the ticks to the main thread from the next frame.
+        if self.worker is not worker:
+            return True
+
+        # Rewinds or restarts the level on the main thread, and otherwise 
+        # starts the worker thread on the keys of the ticks, up to the 
+        # end of the recording when one is played back.
+        if self.restart_pending:
+            self.restart_level()
+            self.restart_pending = False
+            worker.capture()
+        if self.rewinding:
+            for i in range(ticks):
+                self.simulation.rewind()
+                self.forget_recorded_keys()
+            worker.capture()
+            self.keep_render_state()
+            profiler.lap("rewind")
+        else:
+            level_loader = self.simulation.level_loader
+            if level_loader is not None and level_loader.thread is not None:
+                level_loader.prepare()
+                profiler.lap("preload")
+            inputs = bytearray()
+            for i in range(ticks):
+                keys = self.next_keys(i)
+                if keys is None:
+                    break
+                inputs.append(keys)
+            self.keep_render_state()
+            if inputs:
+                worker.start(inputs)
+        return True
+
+    def keep_render_state(self):
+        """
+        Method used to keep the render state of the ticks the worker 
+        thread has finished to draw, which it won't write to until it has 
+        been started again and finished, making the sprites to draw it 
+        with when the level has changed.
+        """
+
+        self.render_state = self.worker.front
+        if (self.render_sprites is None 
+                or not self.render_sprites.matches(self.render_state)):
+            self.render_sprites = RenderSprites(self.render_state)
+
+    def on_hide_view(self):
+        """
+        Stops the worker thread advancing the game simulation when the 
+        game view is no longer shown.
+        """
+
+        if self.worker is not None:
+            self.worker.close()
+            self.worker = None
+
+    def center_camera_to_player(self, speed = 0.2, 
+                                frame_time = 1 / BASE_TICK_RATE, 
+                                sprite = None):
+        """
+        Method to keep viewport camera centered on the player, or the 
+        sprite the player is drawn with, moving the camera the given 
+        fraction of the way there for each base tick the frame took, so 
+        it follows the player at the same speed however often the screen 
+        is drawn.
         """
 
         # Calculates the screen center x and y coordinates in relation 
         # to the player. 
+        player_sprite = sprite or self.simulation.player_sprite
         screen_center_x = (self.camera.scale * 
-        (self.player_sprite.center_x - (self.camera.viewport_width / 2)))
+        (player_sprite.center_x - (self.camera.viewport_width / 2)))
         screen_center_y = (self.camera.scale * 
-        (self.player_sprite.center_y - (self.camera.viewport_height / 2)))
+        (player_sprite.center_y - (self.camera.viewport_height / 2)))
         
         # If the player moves up, down, left, right past the margin for 
         # where the camera is centered it sets it on the player.
@@ -976,267 +6591,154 @@ class GameView(arcade.View):
         # Sets the goal position of the camera of where it should move 
         # to based on the position provided, which is the 
         # player_centered variable, and moves to that position based on 
-        # the speed using Arcade Python Library.
+        # the speed using Arcade Python Library, scaled to how long the 
+        # frame took.
+        speed = 1 - (1 - speed) ** (frame_time * BASE_TICK_RATE)
         self.camera.move_to(player_centered, speed)
 
     def on_update(self, delta_time):
         """
-        Updates the position and state of game objects, such as 
-        movement, game logic, movement, collisions, and animations.
+        Advances the game simulation by the ticks that fit in the time 
+        since the last frame, reacting to what happened, and bakes the 
+        chunks of the level that are needed soon.
         """
 
-        # Updates player movement based on the physics engine and 
-        # detects collision using Arcade Python Library.
-        self.physics_engine.update()
-
-        # Updates the player animation, if there is a platform under the 
-        # player the player should jump or not so the player would not 
-        # be able to jump infinitely using Arcade Python Library. 
-        if self.physics_engine.can_jump():
-            self.player_sprite.can_jump = False
-        else:
-            self.player_sprite.can_jump = True
-
-        # Updates the player animation, if the player is on a ladder and
-        # there is no platform on the player the variable tracking 
-        # whether the player is on the ladder or not to True and 
-        # processes the key change and vice versa using Arcade Python 
-        # Library. 
-        if (self.physics_engine.is_on_ladder() 
-        and not self.physics_engine.can_jump()):
-            self.player_sprite.is_on_ladder = True
-            self.process_keychange()
-        else:
-            self.player_sprite.is_on_ladder = False
-            self.process_keychange()
-
-        # Updates shooting animation and mechanics.
-        if self.can_shoot:
-
-            # If the shoot key is pressed, play the shooting sound and 
-            # create a bullet based on image provided and scale it 
-            # according to bullet scaling constant using Arcade Python
-            # Library.
-            if self.shoot_pressed:
-                shoot_volume = 0.1
-                arcade.play_sound(self.shoot_sound, shoot_volume)
-                bullet = arcade.Sprite(
-                    f"{ASSET_PATH}/bullet/bullet.png",
-                    SPRITE_SCALING_LASER,
-                )
-
-                # If the player is facing right, the bullet will travel 
-                # to the right based on bullet speed.
-                if self.player_sprite.facing_direction == RIGHT_FACING:
-                    bullet.change_x = BULLET_SPEED
-
-                # If the player is facing left, the bullet will travel 
-                # to the left based on bullet speed.
-                else:
-                    bullet.change_x = -BULLET_SPEED
-
-                # Calculates the bullet x and y coordinate, where it 
-                # should spawn and travel from.
-                bullet.center_x = self.player_sprite.center_x 
-                bullet.center_y = self.player_sprite.center_y 
-
-                # Adding the bullets to the bullet list to be added to 
-                # the game scene using Arcade Python Library.
-                self.scene.add_sprite(LAYER_NAME_BULLETS, bullet)
-
-                # Resets the shot after shooting a bullet.
-                self.can_shoot = False
-
-        # If the player has shot create a timer based on how fast the 
-        # player can shoot constant before they are able to shoot again, 
-        # after the timer is done allow the player to shoot and reset 
-        # the timer.
-        else:
-            self.shoot_timer += 1
-            if self.shoot_timer == SHOOT_SPEED:
-                self.can_shoot = True
-                self.shoot_timer = 0
-
-        # Update the different object layer list animations such as the 
-        # player and enemy sprites.
-        self.scene.update_animation(
-            delta_time,
-            [
-                LAYER_NAME_PLAYER,
-                LAYER_NAME_ENEMIES,
-            ],
-        )
-
-        # Update the different object layer list movements, such as 
-        # moving platforms, enemies, and bullets.
-        self.scene.update(
-            [
-                LAYER_NAME_MOVING_PLATFORMS, 
-                LAYER_NAME_ENEMIES, 
-                LAYER_NAME_BULLETS
-            ]
-        )
-
-        # Checks if the enemy sprite hits the set boundaryfor movement 
-        # and reverses the direction of travel.
-        for enemy in self.scene[LAYER_NAME_ENEMIES]:
-            if (
-                enemy.boundary_right
-                and enemy.right > enemy.boundary_right
-                and enemy.change_x > 0
-            ):
-                enemy.change_x *= -1
-
-            if (
-                enemy.boundary_left
-                and enemy.left < enemy.boundary_left
-                and enemy.change_x < 0
-            ):
-                enemy.change_x *= -1
-        
-        # Checks if the bullets hits any objects, including enemy 
-        # sprites, platforms or moving platforms and stores it in a 
-        # list using Arcade Python Library.
-        for bullet in self.scene[LAYER_NAME_BULLETS]:
-            hit_list = arcade.check_for_collision_with_lists(
-                bullet,
-                [
-                    self.scene[LAYER_NAME_ENEMIES],
-                    self.scene[LAYER_NAME_PLATFORMS],
-                    self.scene[LAYER_NAME_MOVING_PLATFORMS],
-                ],
-            )
-
-            # If the bullets hit those object layer lists, remove the 
-            # bullets from the scene
-            if hit_list:
-                bullet.remove_from_sprite_lists()
-
-                # Checks if any of the bullet collisions hits enemy 
-                # sprites, if it does reduce the health points of the 
-                # enemy sprites based on bullet damage.
-                for collision in hit_list:
-                    if (
-                        self.scene[LAYER_NAME_ENEMIES]
-                        in collision.sprite_lists
-                    ):
-                        collision.health -= BULLET_DAMAGE
-
-                        # If the enemy sprites have no more health 
-                        # points remove them from the enemy list layer 
-                        # and the scene of the game.
-                        if collision.health <= 0:
-                            collision.remove_from_sprite_lists()
-
-                        # Plays the enemy sprite taking damage sound 
-                        # effect using Arcade Python Library.
-                        arcade.play_sound(self.hit_sound)
-
+        # Ends the previous frame in the frame profiler, which times each 
+        # part of the frame.
+        profiler = self.simulation.profiler
+        profiler.end_frame(self.simulation.tick)
+
+        # Advances the game simulation by one tick for each tick length 
+        # of time since the latest tick, keeping the time left over for 
+        # the next frame, stopping if the game view is no longer shown. 
+        # When the game falls behind by more ticks than it runs for one 
+        # frame, such as after a slow frame, the time it can't catch up 
+        # on is dropped, so the game slows down instead of falling 
+        # further behind.
+        self.frame_time = delta_time
+        tick_length = 1 / self.simulation.tick_rate
+        self.tick_time += delta_time
+        ticks = 0
+        while self.tick_time >= tick_length:
+            if ticks == MAX_TICKS_PER_FRAME:
+                self.tick_time = 0
+                break
+            self.tick_time -= tick_length
+            ticks += 1
+        if self.worker is not None:
+            if not self.advance_pipelined(ticks):
                 return
+        else:
+            for i in range(ticks):
+                if not self.advance():
+                    return
+
+        # Bakes a few of the chunks of the level that haven't been baked 
+        # yet, and of the next level once it has been loaded in the 
+        # background, so they are ready before they are needed.
+        if self.static_layers:
+            self.static_layers.bake_pending()
+        level_loader = self.simulation.level_loader
+        if (BAKE_STATIC_LAYERS and level_loader is not None 
+                and level_loader.streamer is None 
+                and level_loader.is_prepared()):
+            if (self.next_static_layers is None or 
+                    self.next_static_layers.scene is not level_loader.scene):
+                self.next_static_layers = BakedStaticLayers(
+                    self.window.ctx, level_loader.scene)
+            self.next_static_layers.bake_pending()
+        profiler.lap("baking")
+
+
+def open_headless_window():
+    """
+    Function used to open a hidden window, which gives the sprite lists 
+    an OpenGL context so the game simulation can be run without showing 
+    anything. On machines without a display, set the ARCADE_HEADLESS 
+    environment variable before running.
+    """
 
-        # Checks if the player hits an enemy sprite, door or a don't 
-        # touch object and stores it in a list using Arcade Python
-        # Library.
-        player_collision_list = arcade.check_for_collision_with_lists(
-            self.player_sprite,
-            [
-                self.scene[LAYER_NAME_ENEMIES],
-                self.scene[LAYER_NAME_DOOR],
-                self.scene[LAYER_NAME_DONT_TOUCH],
-            ],
-        )
-
-        # Checks through the collisions.
-        for collision in player_collision_list:
-            
-            # If the player hits an enemy they are reset to the last 
-            # checkpoint, playing the game over sound effect and 
-            # increasing their death counter by 1 using Arcade Python
-            # Library.
-            if self.scene[LAYER_NAME_ENEMIES] in collision.sprite_lists:
-                self.player_sprite.change_x = 0	
-                self.player_sprite.change_y = 0	
-                self.player_sprite.center_x = self.checkpoint.center_x		
-                self.player_sprite.center_y = self.checkpoint.center_y	
-                arcade.play_sound(self.game_over)
-                self.death += 1
-
-            # If the player hits a don't touch object they are reset to 
-            # the last checkpoint, playing the game over sound effect 
-            # and increasing their death counter by 1 using Arcade 
-            # Python Library.
-            elif self.scene[LAYER_NAME_DONT_TOUCH] in collision.sprite_lists:	
-                self.player_sprite.change_x = 0	
-                self.player_sprite.change_y = 0	
-                self.player_sprite.center_x = self.checkpoint.center_x		
-                self.player_sprite.center_y = self.checkpoint.center_y
-                self.death += 1	
-                arcade.play_sound(self.game_over)
-
-            # If the player hits the door to the next level and has the 
-            # correct amount of coins, it takes them to the next level 
-            # by increasing the level counter and setting up the next 
-            # level. 
-            elif ((self.scene[LAYER_NAME_DOOR] in collision.sprite_lists) 
-            and self.score >= 3 and self.level < 3):
-                self.level += 1
-                self.setup()
-
-            # If the player hits the door to the next level and has the 
-            # correct amount of coins, but is on level 3, it shows the 
-            # end of game view screen using Arcade Python Library.
-            elif ((self.scene[LAYER_NAME_DOOR] in collision.sprite_lists) 
-                   and self.score >= 3 and self.level == 3):
-                end_game = EndGame()
-                self.window.show_view(end_game)
-
-        # List to check if the player hits any coins, and loops through 
-        # the list, if they do, remove the coins from the scene while 
-        # increasing player score by 1 and playing the coin collection 
-        # sound effect using Arcade Python Library.
-        coin_hit_list = arcade.check_for_collision_with_list(
-            self.player_sprite, self.scene[LAYER_NAME_COINS])
-        for coin in coin_hit_list:
-            coin.remove_from_sprite_lists()
-            coin_volume = 1.2
-            arcade.play_sound(self.collect_coin_sound, coin_volume)
-            self.score += 1
-
-        # List to check if the player hits any checkpoints using Arcade
-        # Python Library.
-        checkpoint_hit_list = arcade.check_for_collision_with_list(
-            self.player_sprite, self.scene[LAYER_NAME_CHECKPOINTS]
-        )
-
-        # Loops through the checkpoint hit list, and stores the 
-        # checkpoint coordinates.
-        for i in checkpoint_hit_list:
-            self.checkpoint = i
-            self.check_level = self.level
-
-        # Removes the checkpoint after going past it.
-        for checkpoint in checkpoint_hit_list:
-            checkpoint.remove_from_sprite_lists()
-
-        # Keep viewport camera centered on player.
-        self.center_camera_to_player()
+    return arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, 
+                         visible = False)
 
 def main():
     """
     Function to run the game.
     """
 
+    # Stores when the game was launched, to time how long it takes to 
+    # show its first frame.
+    launch_time = time.perf_counter()
+
+    # Reads the command line options, which can start the game straight 
+    # on a level, record the keys held every tick to a file or play 
+    # back a recording.
+    parser = argparse.ArgumentParser(description = SCREEN_TITLE)
+    parser.add_argument("--level", type = int, default = None, 
+                        help = "start on a level, skipping the menu")
+    parser.add_argument("--record", metavar = "FILE", 
+                        help = "record the keys held every tick to a file")
+    parser.add_argument("--replay", metavar = "FILE", 
+                        help = "play back the keys recorded to a file")
+    parser.add_argument("--profile", metavar = "FILE", 
+                        help = "save the timings of each part of the "
+                        "frame to a CSV or JSON file")
+    parser.add_argument("--first-frame", action = "store_true", 
+                        help = "print how long the first frame and the "
+                        "first frame after loading took to show, and quit")
+    arguments = parser.parse_args()
+
     # Creates an arcade.Window in which to display the views and game.
     window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
 
-    # Creates the MaineMenu object, and calls the .setup().
-    menu_view = MainMenu()
-
-    # This displays the view. 
-    window.show_view(menu_view)
-
-    # Runs the game and views.
+    # Prints how long it took to show the first frame, which is the 
+    # loading screen, and the first frame of the view shown after it, 
+    # and quits. Each frame is timed once it has been shown on the 
+    # window. A headless window draws the view that was shown before 
+    # each update, so there the first frame of the next view is the 
+    # second one shown while it is the current view.
+    if arguments.first_frame:
+        flip = window.flip
+        frame_times = []
+        frame_views = []
+
+        def timed_flip():
+            flip()
+            frame_times.append((time.perf_counter() - launch_time) * 1000)
+            frame_views.append(window.current_view)
+            if not isinstance(frame_views[-1], LoadingView) and (
+                    not window.headless or frame_views[-2:-1] == 
+                    frame_views[-1:]):
+                print(f"first frame after {frame_times[0]:.1f} ms, "
+                      f"loaded after {frame_times[-1]:.1f} ms")
+                window.close()
+
+        window.flip = timed_flip
+
+    # Shows the loading screen, which shows the MainMenu once its image 
+    # has loaded, or starts the game straight away when recording or 
+    # playing back once the first level has loaded.
+    game_view = None
+    if arguments.replay:
+        game_view = GameView(
+            replay = InputRecording.load(arguments.replay))
+    elif arguments.record or arguments.level or arguments.profile:
+        game_view = GameView(arguments.level or 1, 
+                             record = bool(arguments.record))
+    assets = AssetManager.get()
+    if game_view is not None:
+        window.show_view(game_view.loading_view())
+    else:
+        window.show_view(LoadingView(
+            MainMenu, [assets.request_texture("views/start.png")]))
+
+    # Runs the game and views, saving the recorded keys and the frame 
+    # timings once the window is closed.
     arcade.run()
+    if arguments.record:
+        game_view.save_recording(arguments.record)
+    if arguments.profile:
+        game_view.simulation.profiler.save(arguments.profile)
 
 # Checks if the pythom module file is the main program, preventing parts 
 # of the code from being run when modules are imported.
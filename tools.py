@@ -0,0 +1,1729 @@
+# Command line tools used to build the caches the game loads from and to
+# measure how long parts of the game take.
+import argparse
+import copy
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree
+import arcade
+import numpy
+import bots
+import game
+
+# Constant that stores the levels that ship with the game.
+LEVELS = (1, 2, 3)
+
+# Constants used for the benchmark suite, including the level made by
+# repeating level 3 side by side and how many times it is repeated, and
+# how much slower than the baseline a benchmark can get, both as a
+# fraction and in milliseconds, before it counts as a regression.
+SCALED_LEVEL = 30
+SCALED_LEVEL_REPEAT = 10
+BENCHMARK_THRESHOLD = 0.25
+BENCHMARK_MIN_DIFFERENCE = 0.05
+BENCHMARK_GROUPS = ("load", "play", "enemies", "bullets", "map")
+
+
+def time_call(function, repeat):
+    """
+    Function used to time a function a number of times, returning the
+    fastest and the average time in milliseconds.
+    """
+
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), sum(times) / len(times)
+
+
+def forget_loaded_assets():
+    """
+    Function used to forget every texture, animation set and hit box
+    loaded so far, which is the state of the game when it is launched.
+    """
+
+    arcade.cleanup_texture_cache()
+    game.AssetManager.current = None
+    game.BakedAtlas.current = None
+    game.AnimationSet.registry.clear()
+    game.HitBoxCache.current = None
+
+
+def spawn_enemies(simulation, count, generator):
+    """
+    Function used to spawn extra guardian enemies high above the player
+    so they don't collide with them, each patrolling its own boundaries.
+    """
+
+    tile_map = simulation.tile_map
+    map_width = tile_map.width * tile_map.tile_width * tile_map.scaling
+    map_height = tile_map.height * tile_map.tile_height * tile_map.scaling
+    for i in range(count):
+        enemy = game.GuardianEnemy()
+        enemy.center_x = generator.uniform(0, map_width)
+        enemy.center_y = generator.uniform(map_height / 2, map_height)
+        enemy.boundary_left = enemy.center_x - generator.uniform(50, 500)
+        enemy.boundary_right = enemy.center_x + generator.uniform(50, 500)
+        enemy.change_x = generator.choice((-2, 2))
+        simulation.scene.add_sprite(game.LAYER_NAME_ENEMIES, enemy)
+    simulation.enemy_patrol = game.EnemyPatrol(
+        simulation.scene[game.LAYER_NAME_ENEMIES], simulation.tick)
+
+
+def fire_bullets(simulation, count, generator):
+    """
+    Function used to fire bullets from random places in the level until
+    the given number of bullets are alive.
+    """
+
+    bullet_pool = simulation.bullet_pool
+    tile_map = simulation.tile_map
+    map_width = tile_map.width * tile_map.tile_width * tile_map.scaling
+    map_height = tile_map.height * tile_map.tile_height * tile_map.scaling
+    for i in range(count - int(bullet_pool.alive.sum())):
+        bullet_pool.fire(generator.uniform(0, map_width),
+                         generator.uniform(0, map_height),
+                         generator.choice((-1, 1)) * game.BULLET_SPEED)
+
+
+def random_inputs(ticks, seed):
+    """
+    Function used to make the keys of a game played with random keys
+    held for a third of a second at a time, as bit masks of the input
+    constants.
+    """
+
+    generator = random.Random(seed)
+    inputs = bytearray()
+    for tick in range(0, ticks, 20):
+        keys = 0
+        for key, chance in ((game.INPUT_UP, 0.3),
+                            (game.INPUT_DOWN, 0.1),
+                            (game.INPUT_LEFT, 0.3),
+                            (game.INPUT_RIGHT, 0.5),
+                            (game.INPUT_SHOOT, 0.5)):
+            if generator.random() < chance:
+                keys |= key
+        inputs += bytes((keys,)) * 20
+    return inputs[:ticks]
+
+
+def build_levels(arguments):
+    """
+    Function used to compile the level cache for every level and report
+    how long loading a level takes from the Tiled map compared to the
+    level cache.
+    """
+
+    # Compiles the level cache for every level, even if it is current.
+    for level in LEVELS:
+        start = time.perf_counter()
+        game.compile_level(game.level_file_name(level),
+                           game.level_cache_name(level))
+        print(f"Compiled level {level} in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if arguments.no_report:
+        return
+
+    # Loading a level needs an OpenGL context for the sprite lists.
+    game.open_headless_window()
+
+    def load(level, use_level_cache):
+        tile_map = game.load_level_map(level, game.LAYER_OPTIONS,
+                                       use_level_cache)
+        arcade.Scene.from_tilemap(tile_map)
+
+    # Loads every level once with an empty texture cache, which is what
+    # happens the first time a level is played, and then a number of
+    # times with the textures already loaded, which is what happens
+    # when a level is loaded again.
+    print(f"{'level':>5} {'source':>6} {'first ms':>9} {'best ms':>8} "
+          f"{'mean ms':>8}")
+    for level in LEVELS:
+        for use_level_cache in (False, True):
+            arcade.cleanup_texture_cache()
+            first, _ = time_call(lambda: load(level, use_level_cache), 1)
+            best, mean = time_call(lambda: load(level, use_level_cache),
+                                   arguments.repeat)
+            source = "cache" if use_level_cache else "tmx"
+            print(f"{level:>5} {source:>6} {first:>9.1f} {best:>8.1f} "
+                  f"{mean:>8.1f}")
+
+
+def bake_atlas(arguments):
+    """
+    Function used to bake the texture atlas and report how long loading
+    each level takes, and how many image files it opens, with and
+    without the atlas.
+    """
+
+    start = time.perf_counter()
+    image_count, page_count = game.bake_atlas()
+    print(f"Packed {image_count} images into {page_count} pages in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if arguments.no_report:
+        return
+
+    # Counts how many image files are opened by wrapping the function
+    # the Arcade Python Library uses to open them.
+    opened_files = []
+    open_image = game.PIL.Image.open
+
+    def counting_open(file_name, *args, **kwargs):
+        opened_files.append(file_name)
+        return open_image(file_name, *args, **kwargs)
+
+    game.PIL.Image.open = counting_open
+    game.open_headless_window()
+
+    # Loads every level, and the player, with an empty texture cache.
+    print(f"{'level':>5} {'atlas':>5} {'first ms':>9} {'files':>6}")
+    for level in LEVELS:
+        for use_atlas in (False, True):
+            arcade.cleanup_texture_cache()
+            game.BakedAtlas.current = None
+            game.BakedAtlas.enabled = use_atlas
+            game.AssetManager.current = None
+            game.AnimationSet.registry.clear()
+            opened_files.clear()
+
+            def load():
+                tile_map = game.load_level_map(level, game.LAYER_OPTIONS)
+                arcade.Scene.from_tilemap(tile_map)
+                game.PlayerCharacter()
+                game.GuardianEnemy()
+
+            first, _ = time_call(load, 1)
+            print(f"{level:>5} {str(use_atlas):>5} {first:>9.1f} "
+                  f"{len(opened_files):>6}")
+
+
+def measure_draw(arguments):
+    """
+    Function used to report how long drawing a level takes, and how many
+    draw calls it makes, when drawing every layer of the scene compared
+    to drawing the static layers from baked chunk textures.
+    """
+
+    window = game.open_headless_window()
+    simulation = game.GameSimulation(arguments.level)
+    simulation.preload_next_level = False
+    simulation.setup()
+    camera = arcade.Camera(window.width, window.height)
+
+    # Counts the draw calls by wrapping the function every sprite list
+    # and chunk uses to draw its geometry.
+    draw_calls = [0]
+    render = arcade.gl.Geometry.render
+
+    def counting_render(self, *args, **kwargs):
+        draw_calls[0] += 1
+        return render(self, *args, **kwargs)
+
+    arcade.gl.Geometry.render = counting_render
+
+    start = time.perf_counter()
+    static_layers = game.BakedStaticLayers(window.ctx, simulation.scene)
+    static_layers.bake_pending(time_budget = None)
+    window.ctx.finish()
+    print(f"Baked {static_layers.chunk_count} chunks in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Moves the camera across the whole level, drawing a frame at each
+    # position and waiting for the graphics card to finish it.
+    tile_map = simulation.tile_map
+    map_width = tile_map.width * tile_map.tile_width * tile_map.scaling
+    positions = [(x, arguments.camera_y) for x in
+                 range(0, int(map_width - window.width), 64)]
+
+    def draw(baked):
+        for position in positions:
+            window.clear()
+            camera.move_to(position, 1.0)
+            camera.use()
+            if baked:
+                static_layers.draw(camera)
+            else:
+                simulation.scene.draw()
+            window.ctx.finish()
+
+    print(f"{'mode':>6} {'frame ms':>9} {'draw calls':>11}")
+    for baked in (False, True):
+        draw(baked)
+        draw_calls[0] = 0
+        best, _ = time_call(lambda: draw(baked), arguments.repeat)
+        mode = "baked" if baked else "scene"
+        print(f"{mode:>6} {best / len(positions):>9.3f} "
+              f"{draw_calls[0] / (len(positions) * arguments.repeat):>11.1f}")
+
+
+def stress_bullets(arguments):
+    """
+    Function used to report how long a tick of the game takes while a
+    number of bullets are alive at once, firing new bullets each tick
+    from random places in the level to replace the ones that hit
+    something.
+    """
+
+    game.open_headless_window()
+    simulation = game.GameSimulation(arguments.level)
+    simulation.preload_next_level = False
+    simulation.setup()
+    bullet_pool = simulation.bullet_pool
+    generator = random.Random(arguments.seed)
+
+    times = []
+    live_counts = []
+    for tick in range(arguments.ticks):
+        fire_bullets(simulation, arguments.count, generator)
+        live_counts.append(int(bullet_pool.alive.sum()))
+        start = time.perf_counter()
+        simulation.update()
+        times.append((time.perf_counter() - start) * 1000)
+
+    times.sort()
+    print(f"{arguments.ticks} ticks with {min(live_counts)} to "
+          f"{max(live_counts)} bullets alive")
+    print(f"mean {sum(times) / len(times):.3f} ms, "
+          f"p95 {times[int(len(times) * 0.95)]:.3f} ms, "
+          f"max {times[-1]:.3f} ms")
+
+
+def stress_enemies(arguments):
+    """
+    Function used to report how long a tick of the game takes with a
+    number of extra guardian enemies patrolling the level.
+    """
+
+    game.open_headless_window()
+    simulation = game.GameSimulation(arguments.level)
+    simulation.preload_next_level = False
+    simulation.setup()
+    generator = random.Random(arguments.seed)
+
+    # Spawns the extra enemies.
+    start = time.perf_counter()
+    spawn_enemies(simulation, arguments.count, generator)
+    print(f"Spawned {arguments.count} enemies in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    times = []
+    for tick in range(arguments.ticks):
+        start = time.perf_counter()
+        simulation.update()
+        times.append((time.perf_counter() - start) * 1000)
+
+    times.sort()
+    print(f"{arguments.ticks} ticks with "
+          f"{len(simulation.scene[game.LAYER_NAME_ENEMIES])} enemies")
+    print(f"mean {sum(times) / len(times):.3f} ms, "
+          f"p95 {times[int(len(times) * 0.95)]:.3f} ms, "
+          f"max {times[-1]:.3f} ms")
+
+
+def measure_physics(arguments):
+    """
+    Function used to report how long the physics engine takes each tick
+    with the Arcade Python Library physics engine compared to the grid
+    physics engine, playing each level with the same random key presses,
+    and to check that the state of the world is the same with both
+    engines after every tick.
+    """
+
+    game.open_headless_window()
+    print(f"{'level':>5} {'engine':>6} {'tick ms':>8} {'physics ms':>11} "
+          f"{'same':>5}")
+    for level in LEVELS:
+        checksums = {}
+        for use_grid_physics in (False, True):
+            simulation = game.GameSimulation(
+                level, use_grid_physics = use_grid_physics)
+            simulation.preload_next_level = False
+            simulation.setup()
+            generator = random.Random(arguments.seed)
+
+            # Times every call to the physics engine by wrapping its
+            # methods.
+            physics_time = [0]
+            engine = simulation.physics_engine
+
+            def timed(method):
+                def timed_method(*args, **kwargs):
+                    start = time.perf_counter()
+                    result = method(*args, **kwargs)
+                    physics_time[0] += time.perf_counter() - start
+                    return result
+                return timed_method
+
+            engine.update = timed(engine.update)
+            engine.can_jump = timed(engine.can_jump)
+            engine.is_on_ladder = timed(engine.is_on_ladder)
+
+            # Stores the checksum of the state of the world after each
+            # tick, leaving it out of the tick time.
+            checksums[use_grid_physics] = []
+            total = 0
+            for tick in range(arguments.ticks):
+                if tick % 20 == 0:
+                    (simulation.left_pressed, simulation.right_pressed,
+                     simulation.up_pressed, simulation.down_pressed) = (
+                        generator.random() < chance
+                        for chance in (0.3, 0.5, 0.3, 0.1))
+                start = time.perf_counter()
+                simulation.update()
+                total += (time.perf_counter() - start) * 1000
+                checksums[use_grid_physics].append(
+                    simulation.state_checksum())
+
+            # The grid engine is checked against the Arcade Python
+            # Library one, which every tick has to match.
+            engine_name = "grid" if use_grid_physics else "arcade"
+            same = "-"
+            if use_grid_physics:
+                same = "yes" if checksums[True] == checksums[False] else "no"
+            print(f"{level:>5} {engine_name:>6} "
+                  f"{total / arguments.ticks:>8.3f} "
+                  f"{physics_time[0] * 1000 / arguments.ticks:>11.3f} "
+                  f"{same:>5}")
+
+
+def measure_motion(arguments):
+    """
+    Function used to check that looking up where the moving platforms
+    and patrolling enemies are on a tick gives the same positions as
+    stepping them there one tick at a time, and to report how long each
+    takes.
+    """
+
+    game.open_headless_window()
+    print(f"{'level':>5} {'movers':>6} {'periods':>9} {'same':>5} "
+          f"{'step ms':>9} {'lookup ms':>10}")
+    for level in LEVELS:
+        stepped = game.LevelLoader(level).load()
+        looked_up = game.LevelLoader(level).load()
+
+        # Steps the movers of one copy of the level every tick, the same
+        # way as when their paths don't repeat.
+        platforms = stepped.scene[game.LAYER_NAME_MOVING_PLATFORMS]
+        stepped.enemy_patrol.motion.periodic[:] = False
+        start = time.perf_counter()
+        for tick in range(1, arguments.ticks + 1):
+            for mover in platforms:
+                game.GridPhysicsEngine.move_platform(mover)
+                mover.update()
+            stepped.enemy_patrol.update(tick)
+        step_time = (time.perf_counter() - start) * 1000
+
+        # Looks up where the movers of the other copy are on the last
+        # tick.
+        start = time.perf_counter()
+        looked_up.platform_motion.move(arguments.ticks)
+        looked_up.enemy_patrol.update(arguments.ticks)
+        lookup_time = (time.perf_counter() - start) * 1000
+
+        movers = list(zip(
+            platforms, looked_up.scene[game.LAYER_NAME_MOVING_PLATFORMS]))
+        movers += list(zip(stepped.enemies, looked_up.enemies))
+        same = all(
+            (first.center_x, first.center_y, first.change_x,
+             first.change_y) == (second.center_x, second.center_y,
+                                 second.change_x, second.change_y)
+            for first, second in movers)
+        periods = numpy.concatenate(
+            [looked_up.platform_motion.periods,
+             looked_up.enemy_patrol.motion.periods])
+        period_range = f"{periods.min()}-{periods.max()}"
+        print(f"{level:>5} {len(movers):>6} {period_range:>9} "
+              f"{'yes' if same else 'no':>5} {step_time:>9.1f} "
+              f"{lookup_time:>10.3f}")
+
+
+def measure_triggers(arguments):
+    """
+    Function used to check that the trigger index finds the same coins,
+    checkpoints, doors and don't touch tiles as checking the player
+    against each trigger layer, with the player at random positions
+    around each level, and to report how long each takes.
+    """
+
+    game.open_headless_window()
+    print(f"{'level':>5} {'triggers':>8} {'touched':>8} {'same':>5} "
+          f"{'layers us':>10} {'index us':>9}")
+    for level in LEVELS:
+        loader = game.LevelLoader(level).load()
+        player = loader.player_sprite
+        trigger_index = loader.trigger_index
+        layers = [loader.scene[layer_name]
+                  for layer_name in game.TRIGGER_LAYERS]
+
+        # Puts the player at random positions, mostly next to a trigger
+        # so that most positions touch something.
+        generator = random.Random(arguments.seed)
+        positions = []
+        for i in range(arguments.count):
+            if generator.random() < 0.8:
+                trigger = generator.choice(trigger_index.triggers)
+                positions.append(
+                    (trigger[2].center_x + generator.uniform(-64, 64),
+                     trigger[2].center_y + generator.uniform(-64, 64)))
+            else:
+                positions.append(
+                    (generator.uniform(
+                        0, loader.tile_map.width * game.GRID_PIXEL_SIZE),
+                     generator.uniform(
+                        0, loader.tile_map.height * game.GRID_PIXEL_SIZE)))
+
+        layers_time = index_time = 0
+        same = True
+        touched = 0
+        for x, y in positions:
+            player.center_x = x
+            player.center_y = y
+            start = time.perf_counter()
+            hit_list = arcade.check_for_collision_with_lists(player, layers)
+            layers_time += time.perf_counter() - start
+            start = time.perf_counter()
+            triggers = trigger_index.update(player)
+            index_time += time.perf_counter() - start
+            same = same and (
+                set(hit_list) == {trigger[2] for trigger in triggers})
+            touched += bool(triggers)
+        print(f"{level:>5} {len(trigger_index.triggers):>8} "
+              f"{touched:>8} {'yes' if same else 'no':>5} "
+              f"{layers_time * 1e6 / arguments.count:>10.1f} "
+              f"{index_time * 1e6 / arguments.count:>9.1f}")
+
+
+def measure_spawns(arguments):
+    """
+    Function used to report how long spawning guardian enemies takes,
+    for the first enemy which loads the animation set and for the
+    enemies after it which share it.
+    """
+
+    game.open_headless_window()
+    arcade.cleanup_texture_cache()
+    game.AssetManager.current = None
+    game.AnimationSet.registry.clear()
+
+    first, _ = time_call(game.GuardianEnemy, 1)
+    start = time.perf_counter()
+    for i in range(arguments.count):
+        game.GuardianEnemy()
+    total = time.perf_counter() - start
+    print(f"First enemy {first:.2f} ms, then {arguments.count} enemies in "
+          f"{total * 1000:.1f} ms ({total * 1000000 / arguments.count:.1f} "
+          f"us each, {arguments.count / total:.0f} per second)")
+
+
+def measure_hit_boxes(arguments):
+    """
+    Function used to report how long setting up each level takes the
+    first time the game is launched, without the hit box cache, with an
+    empty hit box cache, and with the hit box cache file already saved,
+    along with how many hit boxes the warm start still had to calculate.
+    """
+
+    game.open_headless_window()
+    print(f"{'level':>5} {'no cache ms':>12} {'cold ms':>8} {'warm ms':>8} "
+          f"{'computed':>8}")
+    for level in LEVELS:
+        times = []
+        for mode in ("off", "cold", "warm"):
+
+            # Forgets every texture, animation set and hit box loaded so
+            # far, which is the state of the game when it is launched.
+            forget_loaded_assets()
+            game.HitBoxCache.enabled = mode != "off"
+            if mode == "cold" and os.path.exists(game.HIT_BOX_CACHE_NAME):
+                os.remove(game.HIT_BOX_CACHE_NAME)
+
+            simulation = game.GameSimulation(level)
+            simulation.preload_next_level = False
+            time_taken, _ = time_call(simulation.setup, 1)
+            times.append(time_taken)
+        computed = game.HitBoxCache.current.computed
+        print(f"{level:>5} {times[0]:>12.1f} {times[1]:>8.1f} "
+              f"{times[2]:>8.1f} {computed:>8}")
+    game.HitBoxCache.enabled = True
+
+
+def measure_transitions(arguments):
+    """
+    Function used to report how long the tick that moves the player to
+    the next level takes, with the next level loaded when the door is
+    reached compared to loaded in the background while the level before
+    it is played, and with the objects of the levels loaded in the
+    background frozen, along with the slowest tick while playing.
+    """
+
+    game.open_headless_window()
+    print(f"{'level':>5} {'preload':>7} {'freeze':>6} {'door ms':>8} "
+          f"{'worst tick ms':>14}")
+    freeze_loaded_levels = game.FREEZE_LOADED_LEVELS
+    try:
+        for preload, freeze in ((False, False), (True, False),
+                                (True, True)):
+            game.FREEZE_LOADED_LEVELS = freeze
+            simulation = game.GameSimulation(1)
+            simulation.preload_next_level = preload
+            simulation.setup()
+            while simulation.level < len(LEVELS):
+
+                # Plays the level for a while before walking into the
+                # door with enough coins.
+                slowest = 0
+                for tick in range(arguments.ticks):
+                    start = time.perf_counter()
+                    simulation.update()
+                    slowest = max(slowest, time.perf_counter() - start)
+                simulation.score = 3
+                door = simulation.scene[game.LAYER_NAME_DOOR][0]
+                simulation.player_sprite.position = door.position
+                door_time, _ = time_call(simulation.update, 1)
+                print(f"{simulation.level:>5} {str(preload):>7} "
+                      f"{str(freeze):>6} {door_time:>8.1f} "
+                      f"{slowest * 1000:>14.1f}")
+    finally:
+        game.FREEZE_LOADED_LEVELS = freeze_loaded_levels
+
+
+def launch_game(setup, options):
+    """
+    Function used to launch the game in a new process until it shows its
+    first frame once loading has finished, running the setup code first,
+    and return the times it printed, how long the process took and how
+    many files of the game it opened, not counting its code.
+    """
+
+    code = ("import os, sys, game; "
+            "opened = []; "
+            "sys.addaudithook(lambda event, arguments: event == 'open' and "
+            "isinstance(arguments[0], str) and opened.append(arguments[0])); "
+            f"{setup}; "
+            f"sys.argv = ['game.py', '--first-frame'] + {options}; "
+            "game.main(); "
+            "print('opened', len({name for name in opened if "
+            "os.path.abspath(name).startswith(game.GAME_PATH) and "
+            "not name.endswith(('.py', '.pyc'))}))")
+    begin = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd = game.GAME_PATH,
+        capture_output = True, text = True, check = True).stdout
+    process_time = (time.perf_counter() - begin) * 1000
+    words = output.split("first frame after ")[-1].split()
+    return float(words[0]), float(words[4]), process_time, int(words[7])
+
+
+def forget_cached_files():
+    """
+    Function used to drop the files of the game from the page cache of
+    the operating system, so the next launch has to read them from the
+    disk, as it does the first time the game is played after starting
+    the computer.
+    """
+
+    for directory, folders, names in os.walk(game.GAME_PATH,
+                                             followlinks = True):
+        for name in names:
+            file_descriptor = os.open(os.path.join(directory, name),
+                                      os.O_RDONLY)
+            try:
+                os.fsync(file_descriptor)
+                os.posix_fadvise(file_descriptor, 0, 0,
+                                 os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(file_descriptor)
+
+
+def measure_startup(arguments):
+    """
+    Function used to report how long the game takes to show its first
+    frame and its first frame once loading has finished, when starting
+    on the menu and straight on a level, with the assets and the level
+    loaded in the background behind the loading screen compared to
+    loaded straight away. Each launch is a new process, so the times
+    include importing the game, and the time until the process has quit
+    is reported as well.
+    """
+
+    print(f"{'start':>8} {'background':>10} {'first frame ms':>15} "
+          f"{'loaded ms':>10} {'process ms':>11}")
+    for start in ("menu", f"level {arguments.level}"):
+        options = [] if start == "menu" else ["--level", str(arguments.level)]
+        for background in (False, True):
+            setup = f"game.AssetManager.background_loading = {background}"
+            first_frames = []
+            loaded = []
+            process_times = []
+            for i in range(arguments.repeat):
+                first_frame, load_time, process_time, _ = launch_game(
+                    setup, options)
+                first_frames.append(first_frame)
+                loaded.append(load_time)
+                process_times.append(process_time)
+            print(f"{start:>8} {str(background):>10} "
+                  f"{statistics.median(first_frames):>15.1f} "
+                  f"{statistics.median(loaded):>10.1f} "
+                  f"{statistics.median(process_times):>11.1f}")
+
+
+def measure_pipeline(arguments):
+    """
+    Function used to report the frame times of a level with thousands of
+    extra enemies and hundreds of bullets alive, advancing the game
+    simulation on the main thread compared to on a worker thread while
+    the previous ticks are drawn, and to check that the game plays the
+    same either way.
+    """
+
+    window = game.open_headless_window()
+    pipeline_simulation = game.PIPELINE_SIMULATION
+    print(f"{'pipelined':>9} {'update ms':>10} {'draw ms':>8} "
+          f"{'frame ms':>9} {'p95 ms':>7} {'same':>5}")
+    checksums = []
+    try:
+        for pipelined in (False, True):
+            game.PIPELINE_SIMULATION = pipelined
+            view = game.GameView(arguments.level)
+            window.show_view(view)
+            generator = random.Random(arguments.seed)
+            spawn_enemies(view.simulation, arguments.enemies, generator)
+
+            # Fires the bullets at the start of each tick, on whichever
+            # thread advances the game simulation.
+            simulation = view.simulation
+            update = simulation.update
+
+            def update_with_bullets():
+                fire_bullets(simulation, arguments.bullets, generator)
+                return update()
+
+            simulation.update = update_with_bullets
+
+            # Times updating and drawing each frame, where updating a
+            # pipelined frame waits for the ticks of the frame before,
+            # then waits for the last ticks to finish.
+            update_times = []
+            draw_times = []
+            for keys in random_inputs(arguments.ticks, arguments.seed):
+                view.held_keys = keys
+                start = time.perf_counter()
+                view.on_update(1 / 60)
+                middle = time.perf_counter()
+                view.on_draw()
+                window.ctx.finish()
+                end = time.perf_counter()
+                update_times.append((middle - start) * 1000)
+                draw_times.append((end - middle) * 1000)
+            view.on_hide_view()
+            checksums.append(simulation.state_checksum())
+            frame_times = sorted(update + draw for update, draw
+                                 in zip(update_times, draw_times))
+            print(f"{str(pipelined):>9} "
+                  f"{statistics.median(update_times):>10.2f} "
+                  f"{statistics.median(draw_times):>8.2f} "
+                  f"{statistics.median(frame_times):>9.2f} "
+                  f"{frame_times[int(len(frame_times) * 0.95)]:>7.2f} "
+                  f"{str(checksums[-1] == checksums[0]):>5}")
+    finally:
+        game.PIPELINE_SIMULATION = pipeline_simulation
+
+
+def build_asset_pack(arguments):
+    """
+    Function used to build the asset pack and report how long the game
+    takes to start, and how many of its files it opens, reading loose
+    files compared to reading the pack, both with the files of the game
+    dropped from the page cache first and with them already cached.
+    """
+
+    start = time.perf_counter()
+    file_count, byte_count = game.build_asset_pack()
+    print(f"Packed {file_count} files, {byte_count / 1024 / 1024:.1f} MB, "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if arguments.no_report:
+        return
+
+    options = ["--level", str(arguments.level)]
+    print(f"{'pack':>5} {'cache':>5} {'first frame ms':>15} "
+          f"{'loaded ms':>10} {'process ms':>11} {'files':>6}")
+    for use_pack in (False, True):
+        for cold in (True, False):
+            setup = f"game.AssetPack.enabled = {use_pack}"
+            results = []
+            for i in range(arguments.repeat):
+                if cold:
+                    forget_cached_files()
+                results.append(launch_game(setup, options))
+            first_frames, loaded, process_times, file_counts = zip(*results)
+            print(f"{str(use_pack):>5} {'cold' if cold else 'warm':>5} "
+                  f"{statistics.median(first_frames):>15.1f} "
+                  f"{statistics.median(loaded):>10.1f} "
+                  f"{statistics.median(process_times):>11.1f} "
+                  f"{max(file_counts):>6}")
+
+
+def measure_streaming(arguments):
+    """
+    Function used to play a level made from level 3 repeated side by
+    side with its tiles streamed in chunks and with every tile loaded at
+    once, checking that the game plays the same either way, and to
+    report how long the level takes to load, how many tile sprites are
+    kept and how long the ticks take.
+    """
+
+    game.open_headless_window()
+    write_scaled_level(3, arguments.repeat, SCALED_LEVEL)
+    if arguments.infinite:
+        write_infinite_level(SCALED_LEVEL)
+    stream_level_tiles = game.STREAM_LEVEL_TILES
+    try:
+        game.compile_level(game.level_file_name(SCALED_LEVEL),
+                           game.level_cache_name(SCALED_LEVEL))
+
+        # Sets up the level both ways, forgetting the textures first so
+        # both loads include them.
+        simulations = []
+        load_times = []
+        for stream in (False, True):
+            forget_loaded_assets()
+            game.STREAM_LEVEL_TILES = 0 if stream else math.inf
+            simulation = game.GameSimulation(SCALED_LEVEL)
+            simulation.preload_next_level = False
+            simulation.record_snapshots = False
+            load_time, _ = time_call(simulation.setup, 1)
+            simulations.append(simulation)
+            load_times.append(load_time)
+
+        def tile_sprites(simulation):
+            return sum(len(simulation.scene[layer_name])
+                       for layer_name in game.STREAMED_LAYER_NAMES
+                       if layer_name in simulation.scene.name_mapping)
+
+        # Plays both with the same random keys, moving the player to a
+        # random place in the level every few seconds so the chunks are
+        # loaded and removed all over the level. The ticks the player is
+        # moved on are timed apart from the rest, as those have to load
+        # every chunk around the new place at once.
+        tile_map = simulations[0].tile_map
+        map_width = tile_map.width * game.GRID_PIXEL_SIZE
+        map_height = tile_map.height * game.GRID_PIXEL_SIZE
+        generator = random.Random(arguments.seed)
+        most_sprites = [tile_sprites(simulation)
+                        for simulation in simulations]
+        tick_times = [[], []]
+        move_times = [[], []]
+        same = True
+        for tick, keys in enumerate(
+                random_inputs(arguments.ticks, arguments.seed)):
+            moved = tick % 200 == 199
+            if moved:
+                position = (generator.uniform(0, map_width),
+                            generator.uniform(0, map_height))
+                for simulation in simulations:
+                    simulation.player_sprite.position = position
+            for i, simulation in enumerate(simulations):
+                simulation.set_input(keys)
+                start = time.perf_counter()
+                simulation.update()
+                (move_times if moved else tick_times)[i].append(
+                    (time.perf_counter() - start) * 1000)
+                most_sprites[i] = max(most_sprites[i],
+                                      tile_sprites(simulation))
+            same = same and numpy.array_equal(
+                *(simulation.capture_state() for simulation in simulations))
+
+        print(f"level of {tile_map.width}x{tile_map.height} tiles, "
+              f"plays the same: {'yes' if same else 'no'}")
+        print(f"{'tiles':>8} {'load ms':>8} {'most sprites':>13} "
+              f"{'loaded':>7} {'removed':>8} {'mean ms':>8} {'worst ms':>9} "
+              f"{'moved ms':>9}")
+        for simulation, load_time, sprites, times, moves in zip(
+                simulations, load_times, most_sprites, tick_times,
+                move_times):
+            streamer = simulation.streamer
+            print(f"{'streamed' if streamer else 'all':>8} "
+                  f"{load_time:>8.1f} {sprites:>13} "
+                  f"{streamer.load_count if streamer else 0:>7} "
+                  f"{streamer.evict_count if streamer else 0:>8} "
+                  f"{statistics.mean(times):>8.3f} {max(times):>9.1f} "
+                  f"{max(moves, default = 0):>9.1f}")
+    finally:
+        game.STREAM_LEVEL_TILES = stream_level_tiles
+        for file_name in (game.level_file_name(SCALED_LEVEL),
+                          game.level_cache_name(SCALED_LEVEL)):
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def check_restores(level, tick_rate, ticks, seed):
+    """
+    Function used to check that restoring the snapshot of the world
+    from the middle of a game and playing the same keys again ends in
+    the same state as the first time, at the given tick rate.
+    """
+
+    simulation = game.GameSimulation(level, tick_rate = tick_rate)
+    simulation.preload_next_level = False
+    simulation.record_snapshots = False
+    simulation.setup()
+
+    # Captures the snapshot on an odd tick, so that at tick rates above
+    # the base tick rate it is taken partway through an animation frame.
+    inputs = random_inputs(ticks, seed)
+    middle = ticks // 2 | 1
+    simulation.play_inputs(inputs[:middle])
+    state = simulation.capture_state()
+    simulation.play_inputs(inputs[middle:])
+    checksum = simulation.state_checksum()
+    simulation.restore_state(state)
+    simulation.play_inputs(inputs[middle:])
+    return simulation.state_checksum() == checksum
+
+
+def measure_snapshots(arguments):
+    """
+    Function used to report how long capturing, recording and restoring
+    the snapshot of the world takes each tick, how many bytes each
+    snapshot takes in the ring buffer and how much play it can hold,
+    while the player moves around the level at random, after checking
+    that restoring a snapshot plays the same at different tick rates.
+    """
+
+    game.open_headless_window()
+    for tick_rate in (game.BASE_TICK_RATE // 2, game.BASE_TICK_RATE,
+                      game.BASE_TICK_RATE * 2):
+        same = check_restores(arguments.level, tick_rate, 320,
+                              arguments.seed)
+        print(f"restoring at {tick_rate} ticks a second plays the same: "
+              f"{'yes' if same else 'no'}")
+    simulation = game.GameSimulation(arguments.level)
+    simulation.preload_next_level = False
+    simulation.record_snapshots = False
+    simulation.setup()
+    snapshots = simulation.snapshots
+    generator = random.Random(arguments.seed)
+
+    capture_times = []
+    record_times = []
+    sizes = []
+    for tick in range(arguments.ticks):
+
+        # Holds a random set of keys for a third of a second at a time.
+        if tick % 20 == 0:
+            (simulation.left_pressed, simulation.right_pressed,
+             simulation.up_pressed, simulation.shoot_pressed) = (
+                generator.random() < 0.4 for i in range(4))
+        simulation.update()
+        start = time.perf_counter()
+        state = simulation.capture_state()
+        middle = time.perf_counter()
+        snapshots.record(simulation.tick, state)
+        end = time.perf_counter()
+        capture_times.append((middle - start) * 1000)
+        record_times.append((end - middle) * 1000)
+        sizes.append(snapshots.records[-1][2])
+
+    # Restores random ticks that are still stored, putting the world
+    # back to the newest tick afterwards.
+    newest_state = snapshots.restore(snapshots.newest_tick())
+    restore_times = []
+    for i in range(arguments.ticks // 10):
+        tick = generator.randint(snapshots.oldest_tick(),
+                                 snapshots.newest_tick())
+        start = time.perf_counter()
+        simulation.restore_state(snapshots.restore(tick))
+        restore_times.append((time.perf_counter() - start) * 1000)
+    simulation.restore_state(newest_state)
+
+    print(f"{len(state)} numbers per snapshot, "
+          f"{len(state) * 8} bytes uncompressed")
+    for name, times in (("capture", capture_times),
+                        ("record", record_times),
+                        ("restore", restore_times)):
+        times.sort()
+        print(f"{name:>7} mean {sum(times) / len(times):.3f} ms, "
+              f"p99 {times[int(len(times) * 0.99)]:.3f} ms")
+    mean_size = sum(sizes) / len(sizes)
+    print(f"{mean_size:.0f} bytes per tick, {game.SNAPSHOT_BUFFER_SIZE} "
+          f"byte buffer holds about "
+          f"{game.SNAPSHOT_BUFFER_SIZE / mean_size / 60:.0f} s of play")
+
+
+def measure_sounds(arguments):
+    """
+    Function used to report how long starting sounds takes each tick and
+    how many are playing at once, firing several shots and hits every
+    tick at random places around the screen, first by playing every
+    sound with the Arcade Python Library, then through the sound
+    manager. The ticks are run at the speed of the game so the sounds
+    have time to finish.
+    """
+
+    game.open_headless_window()
+    shoot_sound = arcade.load_sound(f"{game.ASSET_PATH}/sound/shoot.wav")
+    hit_sound = arcade.load_sound(f"{game.ASSET_PATH}/sound/dead.wav")
+    sounds = game.SoundManager()
+    sounds.set_view(0, 0, game.SCREEN_WIDTH, game.SCREEN_HEIGHT)
+
+    for name in ("arcade", "manager"):
+        generator = random.Random(arguments.seed)
+        times = []
+        ends = []
+        most_playing = 0
+        for tick in range(arguments.ticks):
+            start = time.perf_counter()
+            for shot in range(arguments.shots):
+                x = generator.uniform(-1, 2) * game.SCREEN_WIDTH
+                y = generator.uniform(0, 1) * game.SCREEN_HEIGHT
+                if name == "arcade":
+                    arcade.play_sound(shoot_sound, 0.1)
+                    arcade.play_sound(hit_sound)
+                    ends.append(start + shoot_sound.get_length())
+                    ends.append(start + hit_sound.get_length())
+                else:
+                    sounds.play(game.EVENT_SHOOT, x, y)
+                    sounds.play(game.EVENT_HIT, x, y)
+            times.append((time.perf_counter() - start) * 1000)
+
+            # Counts the sounds that haven't finished, by their lengths
+            # as players without a window don't report when they end,
+            # then waits for the next tick.
+            if name == "arcade":
+                now = time.perf_counter()
+                playing = sum(1 for end in ends if end > now)
+            else:
+                playing = sounds.active_voices()
+            most_playing = max(most_playing, playing)
+            time.sleep(max(0, 1 / 60 - (time.perf_counter() - start)))
+
+        times.sort()
+        print(f"{name:>7} mean {sum(times) / len(times):.3f} ms, "
+              f"p99 {times[int(len(times) * 0.99)]:.3f} ms per tick, "
+              f"at most {most_playing} sounds playing")
+    print(", ".join(f"{key} {round(value, 3)}"
+                    for key, value in sounds.metrics().items()))
+
+
+def record_inputs(arguments):
+    """
+    Function used to record a game played with random keys held for a
+    third of a second at a time to a file, which can be played back as
+    a repeatable workload by the replay command.
+    """
+
+    game.open_headless_window()
+    simulation = game.GameSimulation(arguments.level)
+    simulation.setup()
+    recording = game.InputRecording(arguments.level,
+                                    simulation.use_grid_physics,
+                                    simulation.tick, simulation.tick_rate)
+    for keys in random_inputs(arguments.ticks, arguments.seed):
+        recording.record(keys)
+        simulation.set_input(keys)
+        simulation.update()
+    recording.save(arguments.file, simulation)
+    print(f"Recorded {arguments.ticks} ticks of level {arguments.level} "
+          f"to {arguments.file} in {os.path.getsize(arguments.file)} "
+          f"bytes")
+
+
+def replay_inputs(arguments):
+    """
+    Function used to play back an input recording a number of times as
+    fast as possible without drawing anything, reporting how long it
+    takes and whether every play back ended in the same state as the
+    recording.
+    """
+
+    game.open_headless_window()
+    recording = game.InputRecording.load(arguments.file)
+    print(f"{len(recording.inputs)} ticks of level {recording.level}")
+    print(f"{'run':>3} {'setup ms':>9} {'play ms':>8} {'ticks/s':>8} "
+          f"{'matches':>8}")
+    for run in range(arguments.repeat):
+        start = time.perf_counter()
+        simulation = recording.create_simulation()
+        simulation.record_snapshots = arguments.snapshots
+        middle = time.perf_counter()
+        simulation.play_inputs(recording.inputs)
+        end = time.perf_counter()
+        print(f"{run + 1:>3} {(middle - start) * 1000:>9.1f} "
+              f"{(end - middle) * 1000:>8.1f} "
+              f"{len(recording.inputs) / (end - middle):>8.0f} "
+              f"{str(recording.matches(simulation)):>8}")
+
+
+def measure_observations(arguments):
+    """
+    Function used to report how long getting the tile grid around the
+    player takes each tick while the player moves around the level at
+    random, compared to drawing the game and reading the screen back.
+    """
+
+    window = game.open_headless_window()
+    simulation = game.GameSimulation(arguments.level)
+    simulation.preload_next_level = False
+    simulation.setup()
+    observer = bots.TileObserver(
+        simulation, arguments.width, arguments.height,
+        downsample = arguments.downsample)
+    inputs = random_inputs(arguments.ticks, arguments.seed)
+
+    times = []
+    for keys in inputs:
+        simulation.set_input(keys)
+        simulation.update()
+        start = time.perf_counter()
+        observation = observer.observe()
+        times.append((time.perf_counter() - start) * 1000000)
+
+    # Draws the game and reads the screen back a few times.
+    view = game.GameView(arguments.level)
+    window.show_view(view)
+    readback_times = []
+    for frame in range(20):
+        view.on_update(1 / 60)
+        view.on_draw()
+        start = time.perf_counter()
+        arcade.get_image(0, 0, window.width, window.height)
+        readback_times.append((time.perf_counter() - start) * 1000000)
+
+    print(f"observation shape {observation.shape}, "
+          f"{observation.nbytes} bytes")
+    for name, times in (("observe", times),
+                        ("readback", readback_times)):
+        times.sort()
+        print(f"{name:>8} mean {sum(times) / len(times):.0f} us, "
+              f"p99 {times[int(len(times) * 0.99)]:.0f} us")
+
+
+def measure_bots(arguments):
+    """
+    Function used to report how many environment steps a second bots
+    playing with random actions get through, with the environments
+    spread over more and more processes, up to one for each core, after
+    checking that the reward of each step is the sum of the rewards of
+    the events that happened during it.
+    """
+
+    process_counts = arguments.processes
+    if not process_counts:
+        process_counts = [1]
+        while process_counts[-1] * 2 <= (os.cpu_count() or 1):
+            process_counts.append(process_counts[-1] * 2)
+
+    # Plays one environment holding each action for several ticks, and
+    # checks the reward of each step against the events it returned.
+    # Every few steps the player is put on a random skull, enemy or
+    # don't touch tile, so that the steps have rewards to check, once
+    # the player has a checkpoint to respawn at.
+    generator = numpy.random.default_rng(arguments.seed)
+    event_rewards = {
+        game.EVENT_COIN: bots.REWARD_SKULL,
+        game.EVENT_DEATH: bots.REWARD_DEATH,
+        game.EVENT_NEXT_LEVEL: bots.REWARD_DOOR,
+        game.EVENT_GAME_COMPLETE: bots.REWARD_DOOR,
+    }
+    game.open_headless_window()
+    environment = bots.GameEnvironment(
+        level = arguments.level,
+        action_repeat = max(arguments.action_repeat, 4))
+    environment.reset()
+    same = True
+    rewarded = 0
+    for step in range(arguments.steps):
+        simulation = environment.simulation
+        targets = [sprite for layer_name in (
+                       game.LAYER_NAME_COINS, game.LAYER_NAME_ENEMIES,
+                       game.LAYER_NAME_DONT_TOUCH)
+                   for sprite in simulation.scene[layer_name]]
+        if (step % 10 == 0 and targets
+                and simulation.checkpoint is not None):
+            target = targets[generator.integers(len(targets))]
+            simulation.player_sprite.position = target.position
+        observation, reward, done, info = environment.step(
+            generator.integers(bots.ACTION_COUNT))
+        same = same and reward == sum(
+            event_rewards.get(name, 0.0) for name in info["events"])
+        rewarded += reward != 0
+        if done:
+            environment.reset()
+    print(f"rewards match events: {'yes' if same else 'no'} "
+          f"({rewarded} of {arguments.steps} steps rewarded, "
+          f"{environment.action_repeat} ticks a step)")
+
+    generator = numpy.random.default_rng(arguments.seed)
+    print(f"{os.cpu_count()} cores, {arguments.envs} environments")
+    print(f"{'processes':>9} {'start s':>8} {'steps/s':>8} {'speedup':>8}")
+    first_rate = None
+    for process_count in process_counts:
+        start = time.perf_counter()
+        environments = bots.VectorEnvironment(
+            arguments.envs, process_count, level = arguments.level,
+            action_repeat = arguments.action_repeat)
+        try:
+            environments.reset()
+            middle = time.perf_counter()
+            for step in range(arguments.steps):
+                environments.step(generator.integers(
+                    bots.ACTION_COUNT, size = arguments.envs))
+            end = time.perf_counter()
+        finally:
+            environments.close()
+        rate = arguments.envs * arguments.steps / (end - middle)
+        first_rate = first_rate or rate
+        print(f"{process_count:>9} {middle - start:>8.1f} {rate:>8.0f} "
+              f"{rate / first_rate:>8.2f}")
+
+
+def profile_ticks(arguments):
+    """
+    Function used to report the 50th, 95th and 99th percentile and the
+    worst time of each part of the tick, while playing back an input
+    recording, or while playing a level with random keys, and to save
+    the timings to a CSV or JSON file.
+    """
+
+    game.open_headless_window()
+    if arguments.replay:
+        recording = game.InputRecording.load(arguments.replay)
+        simulation = recording.create_simulation()
+        inputs = recording.inputs
+    else:
+        simulation = game.GameSimulation(arguments.level)
+        simulation.setup()
+        inputs = random_inputs(arguments.ticks, arguments.seed)
+
+    profiler = simulation.profiler
+    profiler.enabled = True
+    profiler.reset()
+    for keys in inputs:
+        simulation.set_input(keys)
+        profiler.lap("keys")
+        simulation.update()
+        profiler.end_frame(simulation.tick)
+
+    print(f"{'part':<18} {'mean':>7} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'max':>8} {'at tick':>7}")
+    for phase, times in profiler.summary().items():
+        print(f"{phase:<18} {times['mean']:>7.3f} {times['p50']:>7.3f} "
+              f"{times['p95']:>7.3f} {times['p99']:>7.3f} "
+              f"{times['max']:>8.3f} {times['max_tick']:>7}")
+    if arguments.output:
+        profiler.save(arguments.output)
+        print(f"Saved the timings to {arguments.output}")
+
+
+def write_scaled_level(level, repeat, scaled_level):
+    """
+    Function used to write a Tiled map made from a level repeated side
+    by side a number of times, moving the copies of its objects and
+    their patrol boundaries along with them.
+    """
+
+    tree = xml.etree.ElementTree.parse(game.level_file_name(level))
+    root = tree.getroot()
+    width = int(root.get("width"))
+    map_width = width * int(root.get("tilewidth"))
+    root.set("width", str(width * repeat))
+
+    # Repeats every row of every tile layer.
+    for layer in root.findall("layer"):
+        data = layer.find("data")
+        if data.get("encoding") != "csv":
+            raise ValueError("Only levels with CSV tile layers can be "
+                             "repeated")
+        layer.set("width", str(width * repeat))
+        rows = [row.strip().rstrip(",")
+                for row in data.text.strip().splitlines()]
+        data.text = "\n" + ",\n".join(
+            ",".join([row] * repeat) for row in rows) + "\n"
+
+    # Copies every object into each repeat of the level.
+    next_id = int(root.get("nextobjectid"))
+    for group in root.findall("objectgroup"):
+        objects = group.findall("object")
+        for repeat_index in range(1, repeat):
+            offset = repeat_index * map_width
+            for my_object in objects:
+                new_object = copy.deepcopy(my_object)
+                new_object.set("id", str(next_id))
+                new_object.set("x", str(float(my_object.get("x")) + offset))
+                next_id += 1
+                for tiled_property in new_object.iter("property"):
+                    if tiled_property.get("name") in ("boundary_left",
+                                                      "boundary_right"):
+                        tiled_property.set("value", str(
+                            float(tiled_property.get("value"))
+                            + offset * game.TILE_SCALING))
+                group.append(new_object)
+    root.set("nextobjectid", str(next_id))
+    tree.write(game.level_file_name(scaled_level), encoding = "UTF-8",
+               xml_declaration = True)
+
+
+def write_infinite_level(level, chunk_tiles = 16):
+    """
+    Function used to rewrite the Tiled map of a level as an infinite map
+    with its tile layers stored in chunks, placing the map so that it
+    starts a chunk up and to the left of the origin and moving the
+    objects with it, the same as Tiled does for a map drawn there.
+    """
+
+    tree = xml.etree.ElementTree.parse(game.level_file_name(level))
+    root = tree.getroot()
+    width = int(root.get("width"))
+    height = int(root.get("height"))
+    root.set("infinite", "1")
+
+    # Splits the rows of every tile layer into chunks, with the chunks
+    # along the right and bottom edges cut to the size of the map.
+    for layer in root.findall("layer"):
+        data = layer.find("data")
+        if data.get("encoding") != "csv":
+            raise ValueError("Only levels with CSV tile layers can be "
+                             "made infinite")
+        rows = [row.strip().rstrip(",").split(",")
+                for row in data.text.strip().splitlines()]
+        data.text = "\n"
+        for first_row in range(0, height, chunk_tiles):
+            for first_column in range(0, width, chunk_tiles):
+                chunk_rows = [
+                    row[first_column:first_column + chunk_tiles]
+                    for row in rows[first_row:first_row + chunk_tiles]]
+                chunk = xml.etree.ElementTree.SubElement(data, "chunk", {
+                    "x": str(first_column - chunk_tiles),
+                    "y": str(first_row - chunk_tiles),
+                    "width": str(len(chunk_rows[0])),
+                    "height": str(len(chunk_rows))})
+                chunk.text = "\n" + ",\n".join(
+                    ",".join(row) for row in chunk_rows) + "\n"
+
+    # Moves every object by the same amount as the tiles.
+    for my_object in root.iter("object"):
+        for name, size in (("x", "tilewidth"), ("y", "tileheight")):
+            my_object.set(name, str(float(my_object.get(name))
+                                    - chunk_tiles * int(root.get(size))))
+    tree.write(game.level_file_name(level), encoding = "UTF-8",
+               xml_declaration = True)
+
+
+def benchmark_load(level, repeat, cold):
+    """
+    Function used to time setting up a level in the game view, either
+    with every texture forgotten first, as when the game is launched, or
+    with them already loaded.
+    """
+
+    times = []
+    for i in range(repeat):
+        if cold:
+            forget_loaded_assets()
+        view = game.GameView(level)
+        start = time.perf_counter()
+        view.setup()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"ms": statistics.median(times), "min_ms": min(times),
+            "max_ms": max(times), "runs": repeat}
+
+
+def benchmark_play(window, view, inputs, before_tick = None):
+    """
+    Function used to time the game view updating and drawing each tick
+    while it is given the keys, waiting for the graphics card to finish
+    each frame, returning the update and the draw timings.
+    """
+
+    update_times = []
+    draw_times = []
+    for keys in inputs:
+        if before_tick is not None:
+            before_tick()
+        view.held_keys = keys
+        start = time.perf_counter()
+        view.on_update(1 / 60)
+        middle = time.perf_counter()
+        view.on_draw()
+        window.ctx.finish()
+        end = time.perf_counter()
+        update_times.append((middle - start) * 1000)
+        draw_times.append((end - middle) * 1000)
+
+    def summarise(times):
+        times = sorted(times)
+        return {"ms": statistics.median(times),
+                "mean_ms": sum(times) / len(times),
+                "p95_ms": times[int(len(times) * 0.95)],
+                "max_ms": times[-1], "ticks": len(times)}
+
+    return summarise(update_times), summarise(draw_times)
+
+
+def compare_benchmarks(results, baseline, threshold):
+    """
+    Function used to print how each benchmark compares to the baseline,
+    returning the names of the benchmarks that got slower than the
+    threshold allows.
+    """
+
+    regressions = []
+    print(f"{'benchmark':<24} {'baseline ms':>12} {'ms':>9} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<24} {'-':>12} {result['ms']:>9.3f} {'new':>8}")
+            continue
+        old = baseline[name]["ms"]
+        new = result["ms"]
+        change = new / old - 1 if old else 0
+        regressed = (change > threshold
+                     and new - old > BENCHMARK_MIN_DIFFERENCE)
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<24} {old:>12.3f} {new:>9.3f} {change:>+8.1%}"
+              f"{'  REGRESSED' if regressed else ''}")
+    return regressions
+
+
+def run_benchmarks(arguments):
+    """
+    Function used to run the benchmark suite, which times loading each
+    level, updating and drawing each level with scripted keys, and the
+    same with thousands of enemies, hundreds of bullets and a level ten
+    times as wide. The results are saved to a JSON file, and compared
+    against a baseline saved by an earlier run if one is given, failing
+    when a benchmark got slower than the threshold allows.
+    """
+
+    window = game.open_headless_window()
+    groups = arguments.only or BENCHMARK_GROUPS
+    results = {}
+
+    def add(name, result):
+        results[name] = result
+        print(f"{name:<24} {result['ms']:>9.3f} ms")
+
+    if "load" in groups:
+        for level in LEVELS:
+            add(f"load_cold_level_{level}",
+                benchmark_load(level, arguments.repeat, True))
+            add(f"load_warm_level_{level}",
+                benchmark_load(level, arguments.repeat, False))
+
+    if "play" in groups:
+        for level in LEVELS:
+            view = game.GameView(level)
+            view.setup()
+            update, draw = benchmark_play(
+                window, view, random_inputs(arguments.ticks, level))
+            add(f"update_level_{level}", update)
+            add(f"draw_level_{level}", draw)
+
+    if "enemies" in groups:
+        view = game.GameView(1)
+        view.setup()
+        spawn_enemies(view.simulation, 2000, random.Random(0))
+        update, draw = benchmark_play(
+            window, view, random_inputs(arguments.ticks, 0))
+        add("update_enemies_2000", update)
+        add("draw_enemies_2000", draw)
+
+    if "bullets" in groups:
+        view = game.GameView(1)
+        view.setup()
+        generator = random.Random(0)
+        update, draw = benchmark_play(
+            window, view, random_inputs(arguments.ticks, 0),
+            lambda: fire_bullets(view.simulation, 400, generator))
+        add("update_bullets_400", update)
+        add("draw_bullets_400", draw)
+
+    # Writes the level made from level 3 repeated side by side next to
+    # the other levels while it is used, removing it afterwards.
+    if "map" in groups:
+        write_scaled_level(3, SCALED_LEVEL_REPEAT, SCALED_LEVEL)
+        try:
+            game.compile_level(game.level_file_name(SCALED_LEVEL),
+                               game.level_cache_name(SCALED_LEVEL))
+            add("load_map_10x", benchmark_load(SCALED_LEVEL, 1, True))
+            view = game.GameView(SCALED_LEVEL)
+            view.setup()
+            update, draw = benchmark_play(
+                window, view, random_inputs(arguments.ticks, 3))
+            add("update_map_10x", update)
+            add("draw_map_10x", draw)
+        finally:
+            for file_name in (game.level_file_name(SCALED_LEVEL),
+                              game.level_cache_name(SCALED_LEVEL)):
+                if os.path.exists(file_name):
+                    os.remove(file_name)
+
+    # Saves the results along with the machine they were measured on.
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "arcade": arcade.version.VERSION,
+            "renderer": window.ctx.info.RENDERER,
+        },
+        "settings": {"ticks": arguments.ticks, "repeat": arguments.repeat},
+        "results": results,
+    }
+    with open(arguments.output, "w") as report_file:
+        json.dump(report, report_file, indent = 2)
+    print(f"Saved the results to {arguments.output}")
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["machine"] != report["machine"]:
+            print("The baseline was measured on a different machine")
+        if baseline["settings"] != report["settings"]:
+            print("The baseline was measured with different settings")
+        regressions = compare_benchmarks(results, baseline["results"],
+                                         arguments.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed: "
+                  f"{', '.join(regressions)}")
+            sys.exit(1)
+
+
+def main():
+    """
+    Function to run the command line tools.
+    """
+
+    parser = argparse.ArgumentParser(
+        description = "Tools used to build and measure the game.")
+    commands = parser.add_subparsers(dest = "command", required = True)
+
+    # Command to compile the level caches and report the load times.
+    levels_parser = commands.add_parser(
+        "levels", help = "compile the level caches and report load times")
+    levels_parser.add_argument("--repeat", type = int, default = 5)
+    levels_parser.add_argument("--no-report", action = "store_true")
+    levels_parser.set_defaults(function = build_levels)
+
+    # Command to bake the texture atlas and report the load times.
+    atlas_parser = commands.add_parser(
+        "atlas", help = "bake the texture atlas and report load times")
+    atlas_parser.add_argument("--no-report", action = "store_true")
+    atlas_parser.set_defaults(function = bake_atlas)
+
+    # Command to report the draw times with and without baked chunks.
+    draw_parser = commands.add_parser(
+        "draw", help = "report draw times with and without baked chunks")
+    draw_parser.add_argument("--level", type = int, default = 3)
+    draw_parser.add_argument("--camera-y", type = int, default = 0)
+    draw_parser.add_argument("--repeat", type = int, default = 5)
+    draw_parser.set_defaults(function = measure_draw)
+
+    # Command to report the tick times with many bullets alive.
+    bullets_parser = commands.add_parser(
+        "bullets", help = "report tick times with many bullets alive")
+    bullets_parser.add_argument("--level", type = int, default = 1)
+    bullets_parser.add_argument("--count", type = int, default = 400)
+    bullets_parser.add_argument("--ticks", type = int, default = 600)
+    bullets_parser.add_argument("--seed", type = int, default = 0)
+    bullets_parser.set_defaults(function = stress_bullets)
+
+    # Command to report the tick times with many enemies.
+    enemies_parser = commands.add_parser(
+        "enemies", help = "report tick times with many enemies")
+    enemies_parser.add_argument("--level", type = int, default = 1)
+    enemies_parser.add_argument("--count", type = int, default = 2000)
+    enemies_parser.add_argument("--ticks", type = int, default = 300)
+    enemies_parser.add_argument("--seed", type = int, default = 0)
+    enemies_parser.set_defaults(function = stress_enemies)
+
+    # Command to check and report the physics times of both physics
+    # engines.
+    physics_parser = commands.add_parser(
+        "physics",
+        help = "check and report physics times of both physics engines")
+    physics_parser.add_argument("--ticks", type = int, default = 3000)
+    physics_parser.add_argument("--seed", type = int, default = 0)
+    physics_parser.set_defaults(function = measure_physics)
+
+    # Command to check and time looking up the movers by tick.
+    motion_parser = commands.add_parser(
+        "motion", help = "check and time looking up movers by tick")
+    motion_parser.add_argument("--ticks", type = int, default = 10000)
+    motion_parser.set_defaults(function = measure_motion)
+
+    # Command to report how long spawning enemies takes.
+    spawn_parser = commands.add_parser(
+        "spawn", help = "report how long spawning enemies takes")
+    spawn_parser.add_argument("--count", type = int, default = 10000)
+    spawn_parser.set_defaults(function = measure_spawns)
+
+    # Command to check and time looking up the trigger tiles.
+    triggers_parser = commands.add_parser(
+        "triggers", help = "check and time looking up the trigger tiles")
+    triggers_parser.add_argument("--count", type = int, default = 10000)
+    triggers_parser.add_argument("--seed", type = int, default = 0)
+    triggers_parser.set_defaults(function = measure_triggers)
+
+    # Command to report how long the game takes to show its first frame.
+    startup_parser = commands.add_parser(
+        "startup", help = "report how long the game takes to show its "
+        "first frame with and without loading in the background")
+    startup_parser.add_argument("--level", type = int, default = 1)
+    startup_parser.add_argument("--repeat", type = int, default = 5)
+    startup_parser.set_defaults(function = measure_startup)
+
+    # Command to build the asset pack and compare starting the game from
+    # it to starting from the loose files.
+    pack_parser = commands.add_parser(
+        "pack", help = "build the asset pack and report startup times")
+    pack_parser.add_argument("--no-report", action = "store_true")
+    pack_parser.add_argument("--level", type = int, default = 1)
+    pack_parser.add_argument("--repeat", type = int, default = 5)
+    pack_parser.set_defaults(function = build_asset_pack)
+
+    # Command to compare the frame times with the game simulation
+    # advanced on a worker thread while the previous ticks are drawn.
+    pipeline_parser = commands.add_parser(
+        "pipeline", help = "report frame times with the game simulation "
+        "advanced on a worker thread")
+    pipeline_parser.add_argument("--level", type = int, default = 3)
+    pipeline_parser.add_argument("--enemies", type = int, default = 2000)
+    pipeline_parser.add_argument("--bullets", type = int, default = 400)
+    pipeline_parser.add_argument("--ticks", type = int, default = 600)
+    pipeline_parser.add_argument("--seed", type = int, default = 0)
+    pipeline_parser.set_defaults(function = measure_pipeline)
+
+    # Command to check and time streaming a large level in chunks.
+    stream_parser = commands.add_parser(
+        "stream", help = "check and time streaming a large level in chunks")
+    stream_parser.add_argument("--repeat", type = int, default = 40)
+    stream_parser.add_argument("--ticks", type = int, default = 3000)
+    stream_parser.add_argument("--seed", type = int, default = 0)
+    stream_parser.add_argument("--infinite", action = "store_true",
+                               help = "store the level as an infinite map")
+    stream_parser.set_defaults(function = measure_streaming)
+
+    # Command to report the level set up times with the hit box cache.
+    hit_boxes_parser = commands.add_parser(
+        "hitboxes", help = "report level set up times with the hit box "
+        "cache cold and warm")
+    hit_boxes_parser.set_defaults(function = measure_hit_boxes)
+
+    # Command to report level transition times with and without
+    # preloading.
+    transition_parser = commands.add_parser(
+        "transition", help = "report level transition times with and "
+        "without loading the next level in the background")
+    transition_parser.add_argument("--ticks", type = int, default = 300)
+    transition_parser.set_defaults(function = measure_transitions)
+
+    # Command to report the snapshot times and sizes.
+    snapshots_parser = commands.add_parser(
+        "snapshots", help = "report snapshot capture, record and restore "
+        "times and sizes")
+    snapshots_parser.add_argument("--level", type = int, default = 3)
+    snapshots_parser.add_argument("--ticks", type = int, default = 2000)
+    snapshots_parser.add_argument("--seed", type = int, default = 0)
+    snapshots_parser.set_defaults(function = measure_snapshots)
+
+    # Command to report how long starting sounds takes and how many
+    # play at once.
+    sounds_parser = commands.add_parser(
+        "sounds", help = "report sound start times and how many sounds "
+        "play at once, with and without the sound manager")
+    sounds_parser.add_argument("--ticks", type = int, default = 300)
+    sounds_parser.add_argument("--shots", type = int, default = 4)
+    sounds_parser.add_argument("--seed", type = int, default = 0)
+    sounds_parser.set_defaults(function = measure_sounds)
+
+    # Command to record a game played with random keys.
+    record_parser = commands.add_parser(
+        "record", help = "record a game played with random keys to a file")
+    record_parser.add_argument("file")
+    record_parser.add_argument("--level", type = int, default = 3)
+    record_parser.add_argument("--ticks", type = int, default = 3600)
+    record_parser.add_argument("--seed", type = int, default = 0)
+    record_parser.set_defaults(function = record_inputs)
+
+    # Command to play back an input recording as fast as possible.
+    replay_parser = commands.add_parser(
+        "replay", help = "play back an input recording without drawing "
+        "and check it ends the same way")
+    replay_parser.add_argument("file")
+    replay_parser.add_argument("--repeat", type = int, default = 3)
+    replay_parser.add_argument("--snapshots", action = "store_true")
+    replay_parser.set_defaults(function = replay_inputs)
+
+    # Command to report how long getting the tile grid around the
+    # player takes.
+    observe_parser = commands.add_parser(
+        "observe", help = "report how long getting the tile grid around "
+        "the player takes compared to reading the screen back")
+    observe_parser.add_argument("--level", type = int, default = 3)
+    observe_parser.add_argument("--ticks", type = int, default = 2000)
+    observe_parser.add_argument("--width", type = int, default = 32)
+    observe_parser.add_argument("--height", type = int, default = 16)
+    observe_parser.add_argument("--downsample", type = int, default = 1)
+    observe_parser.add_argument("--seed", type = int, default = 0)
+    observe_parser.set_defaults(function = measure_observations)
+
+    # Command to report how many environment steps a second bots get
+    # through over more and more processes.
+    bots_parser = commands.add_parser(
+        "bots", help = "report bot environment steps a second with the "
+        "environments spread over more and more processes")
+    bots_parser.add_argument("--envs", type = int, default = 16)
+    bots_parser.add_argument("--processes", type = int, nargs = "+")
+    bots_parser.add_argument("--level", type = int, default = 1)
+    bots_parser.add_argument("--steps", type = int, default = 500)
+    bots_parser.add_argument("--action-repeat", type = int, default = 1)
+    bots_parser.add_argument("--seed", type = int, default = 0)
+    bots_parser.set_defaults(function = measure_bots)
+
+    # Command to report the time of each part of the tick.
+    profile_parser = commands.add_parser(
+        "profile", help = "report and save the time of each part of the "
+        "tick")
+    profile_parser.add_argument("--replay", metavar = "FILE")
+    profile_parser.add_argument("--level", type = int, default = 3)
+    profile_parser.add_argument("--ticks", type = int, default = 3600)
+    profile_parser.add_argument("--seed", type = int, default = 0)
+    profile_parser.add_argument("--output", metavar = "FILE")
+    profile_parser.set_defaults(function = profile_ticks)
+
+    # Command to run the benchmark suite and compare it to a baseline.
+    benchmark_parser = commands.add_parser(
+        "benchmark", help = "run the benchmark suite, saving the results "
+        "and comparing them to a baseline")
+    benchmark_parser.add_argument("--output", default = "benchmark.json")
+    benchmark_parser.add_argument("--baseline", metavar = "FILE")
+    benchmark_parser.add_argument("--threshold", type = float,
+                                  default = BENCHMARK_THRESHOLD)
+    benchmark_parser.add_argument("--ticks", type = int, default = 600)
+    benchmark_parser.add_argument("--repeat", type = int, default = 3)
+    benchmark_parser.add_argument("--only", nargs = "+",
+                                  choices = BENCHMARK_GROUPS)
+    benchmark_parser.set_defaults(function = run_benchmarks)
+
+    arguments = parser.parse_args()
+    arguments.function(arguments)
+
+
+# Checks if the python module file is the main program, preventing parts
+# of the code from being run when modules are imported.
+if __name__ == "__main__":
+    main()